@@ -0,0 +1,249 @@
+"""
+This file contains the BulkImporter class, which imports every XML quiz file in a directory without the user interface, e.g. to add a whole question bank at once.
+The files are read and validated in a pool of processes, so many files are parsed at the same time, and each quiz's content hash is worked out there too.
+Quizzes that are already in the database (or earlier in the import) are found by their hash and skipped.
+Each quiz's similarity signature is worked out in the worker processes as well, and stored so near-duplicates can be found with duplicates.py.
+The subject and exam board names are loaded from the database once at the start, and only the new ones are added.
+All the database writes are done by this process, a batch of quizzes at a time in one transaction, and a summary report is given at the end instead of message boxes.
+Run it directly, e.g. "python bulkImport.py QuestionBank --processes 8".
+"""
+
+# This is used to catch XML parse errors.
+import xml.etree.ElementTree as et
+# Os is used to find the quiz files in the directory.
+import os
+# Time is used to time the import.
+import time
+# The process pool parses the files at the same time.
+import concurrent.futures
+# The database, quiz and quiz importer files from the application's base directory.
+import database
+import quiz
+import quizImporter
+import duplicates
+import referenceData
+
+def parseQuizFile(filename: str) -> tuple:
+    """
+    This is run in a worker process. It reads and validates every quiz in a file, and works out each quiz's hash.
+    Returns a tuple of the filename, the list of the valid quizzes as (metadata, list of Question objects, hash, similarity signature) tuples,
+    and the list of the errors as (quiz title, error message) tuples.
+    """
+    quizzes = []
+    errors = []
+    reader = quizImporter.QuizFileReader(filename)
+    events = iter(reader)
+    metadata = None
+    try:
+        for event, value in events:
+            if(event != "quiz"):
+                errors.append((None, value if event == "invalid" else "Invalid quiz XML file."))
+                reader.skipQuiz()
+                continue
+            metadata = value
+            try:
+                quizImporter.QuizImporter.validateMetadata(metadata)
+                hasher = quiz.QuizHash(metadata["title"], metadata["difficulty"])
+                signature = duplicates.MinHashSignature()
+                questions = []
+                for event, value in events:
+                    if(event == "end"):
+                        break
+                    if(event == "invalid"):
+                        raise quizImporter.QuizImportError("Import error", value)
+                    check = value.validate()
+                    if(check):
+                        raise quizImporter.QuizImportError("Question error", "Question \"" + str(value.question) + "\": " + check)
+                    hasher.addQuestion(value)
+                    signature.addQuestion(value)
+                    questions.append(value)
+                quizzes.append((metadata, questions, hasher.hexdigest(), signature))
+            except quizImporter.QuizImportError as e:
+                errors.append((metadata["title"], e.message))
+                reader.skipQuiz()
+            metadata = None
+    except (et.ParseError, UnicodeDecodeError, LookupError):
+        # The quizzes before the error in the file are still imported.
+        errors.append((metadata["title"] if metadata else None, "Invalid quiz XML file."))
+    except OSError as e:
+        errors.append((None, "The file couldn't be read: " + str(e)))
+    if(not quizzes and not errors):
+        errors.append((None, "Invalid quiz XML file."))
+    return filename, quizzes, errors
+
+class BulkImporter(object):
+    # A batch of quizzes is written to the database once it has this many questions, or this many quizzes.
+    batchQuestions = 5000
+    batchQuizzes = 500
+    # The number of files given to each worker process at a time, for each process.
+    filesInFlight = 4
+
+    def __init__(self, databaseManager, processes: int = None) -> None:
+        """databaseManager is the DatabaseManager object the quizzes are added to, and processes is the number of worker processes (the number of CPUs by default)."""
+        self.database = databaseManager
+        self.processes = processes or os.cpu_count() or 1
+        # The subjects and exam boards, loaded once at the start.
+        self.referenceData = referenceData.ReferenceData(databaseManager)
+        # The subjects and exam boards added by the batch being written, which are only added to the reference data once it has been saved.
+        # The casefolded name maps to the (ID, name).
+        self.batchSubjects = {}
+        self.batchExamBoards = {}
+        # The hashes of every quiz in the database, and of those imported so far.
+        self.hashes = set()
+        # The quizzes waiting to be written, as (filename, metadata, questions, hash, signature) tuples, and their number of questions.
+        self.pending = []
+        self.pendingQuestions = 0
+        # The totals for the summary report.
+        self.files = 0
+        self.quizzesImported = 0
+        self.questionsImported = 0
+        self.duplicates = 0
+        self.newSubjects = []
+        self.newExamBoards = []
+        # The errors, as (filename, quiz title, error message) tuples.
+        self.errors = []
+
+    def loadReferenceData(self) -> None:
+        """Loads the subject and exam board names and the quiz hashes from the database, once at the start of the import."""
+        self.referenceData.load()
+        self.hashes = set(i[0] for i in self.database.execute("SELECT `Hash` FROM `Quizzes`;") if i[0])
+
+    def findFiles(self, directory: str) -> list:
+        """Returns the paths of all the XML files in the directory and the directories inside it, in alphabetical order."""
+        files = []
+        for path, directories, filenames in os.walk(directory):
+            files += [os.path.join(path, i) for i in filenames if i.lower().endswith(".xml")]
+        return sorted(files)
+
+    def getReferenceID(self, name: str, referenceList, batchNames: dict) -> int:
+        """
+        Returns the ID of the subject or exam board with the given name (ignoring case), adding it to the database if it is new. Returns None if name is None.
+        referenceList is the ReferenceList of subjects or exam boards, and batchNames holds the names added by the batch being written.
+        """
+        if(name == None):
+            return None
+        id = referenceList.find(name)
+        if(id != None):
+            return id
+        if(name.casefold() not in batchNames):
+            batchNames[name.casefold()] = (referenceList.insertName(name), name)
+        return batchNames[name.casefold()][0]
+
+    def addResult(self, filename: str, quizzes: list, errors: list) -> None:
+        """Adds the parsed quizzes of a file to the pending batch, skipping any duplicates, and writes the batch once it is big enough."""
+        self.files += 1
+        self.errors += [(filename, title, message) for title, message in errors]
+        for metadata, questions, quizHash, signature in quizzes:
+            if(quizHash in self.hashes):
+                # An identical quiz is already in the database, or earlier in the import.
+                self.duplicates += 1
+                continue
+            self.hashes.add(quizHash)
+            self.pending.append((filename, metadata, questions, quizHash, signature))
+            self.pendingQuestions += len(questions)
+            if(self.pendingQuestions >= BulkImporter.batchQuestions or len(self.pending) >= BulkImporter.batchQuizzes):
+                self.writeBatch()
+
+    def writeBatch(self) -> None:
+        """
+        Writes the pending quizzes, their questions and their similarity signatures to the database in one transaction,
+        using one batched INSERT for the quizzes, one for the questions, and one for each of the signature tables.
+        """
+        if(not self.pending):
+            return
+        batch = self.pending
+        self.pending = []
+        self.pendingQuestions = 0
+        self.batchSubjects = {}
+        self.batchExamBoards = {}
+        try:
+            with self.database.transaction():
+                quizRows = []
+                for filename, metadata, questions, quizHash, signature in batch:
+                    subjectID = self.getReferenceID(metadata["subjectName"], self.referenceData.subjects, self.batchSubjects)
+                    examBoardID = self.getReferenceID(metadata["examBoardName"], self.referenceData.examBoards, self.batchExamBoards)
+                    quizRows.append((metadata["title"], float(subjectID) if subjectID != None else None, float(examBoardID) if examBoardID != None else None,
+                            float(len(questions)), ",".join(metadata["tags"]), float(metadata["difficulty"]), quizHash))
+                quizIDs = self.database.executeMany("INSERT INTO `Quizzes` (QuizName, SubjectID, ExamboardID, AmountOfQuestions, TagList, Difficulty, Hash) VALUES (?,?,?,?,?,?,?);",
+                        quizRows)
+                questions = []
+                for i in range(len(batch)):
+                    for j in batch[i][2]:
+                        # Give each question its quiz's ID.
+                        j.quizID = quizIDs[i]
+                        questions.append(j)
+                quiz.Question.addManyToDatabase(questions, self.database)
+                self.database.executeMany("INSERT INTO `QuizSignatures` (QuizID, Signature) VALUES (?,?);",
+                        [(float(quizIDs[i]), batch[i][4].encode()) for i in range(len(batch))])
+                # Quizzes without any questions have nothing to compare, so they aren't added to the bands.
+                bands = [(key, float(quizIDs[i])) for i in range(len(batch)) if not batch[i][4].isEmpty() for key in batch[i][4].getBandKeys()]
+                if(bands):
+                    self.database.executeMany("INSERT INTO `QuizSignatureBands` (BandKey, QuizID) VALUES (?,?);", bands)
+        except Exception as e:
+            # If the batch couldn't be written, none of it is saved, and each of its quizzes is reported as an error.
+            self.errors += [(i[0], i[1]["title"], "The quiz couldn't be saved: " + repr(e)) for i in batch]
+            for i in batch:
+                self.hashes.discard(i[3])
+            # The subjects and exam boards added by the batch have been rolled back, so they aren't added to the reference data.
+            return
+        # Now the batch has been saved, add its new subjects and exam boards to the reference data.
+        for id, name in self.batchSubjects.values():
+            self.referenceData.subjects.register(id, name)
+            self.newSubjects.append(name)
+        for id, name in self.batchExamBoards.values():
+            self.referenceData.examBoards.register(id, name)
+            self.newExamBoards.append(name)
+        self.quizzesImported += len(batch)
+        self.questionsImported += len(questions)
+
+    def importDirectory(self, directory: str) -> float:
+        """Imports every quiz file in the directory, and returns how long it took in seconds."""
+        startTime = time.perf_counter()
+        quiz.Quiz.ensureQuestionHashes(self.database)
+        # Makes sure the signature tables exist, and that every quiz already in the database has a signature.
+        duplicates.DuplicateIndex(self.database).indexMissingQuizzes()
+        self.loadReferenceData()
+        files = self.findFiles(directory)
+        with concurrent.futures.ProcessPoolExecutor(max_workers = self.processes) as executor:
+            # Only a few files are given to each process at a time, so the parsed quizzes don't build up in memory faster than they are written.
+            remaining = iter(files)
+            running = set()
+            while True:
+                while len(running) < self.processes * BulkImporter.filesInFlight:
+                    filename = next(remaining, None)
+                    if(filename == None):
+                        break
+                    running.add(executor.submit(parseQuizFile, filename))
+                if(not running):
+                    break
+                finished, running = concurrent.futures.wait(running, return_when = concurrent.futures.FIRST_COMPLETED)
+                for i in finished:
+                    self.addResult(*i.result())
+        self.writeBatch()
+        return time.perf_counter() - startTime
+
+    def getReport(self, duration: float, errorLimit: int = 50) -> str:
+        """Returns the summary of the import as text, including up to errorLimit of the errors."""
+        lines = ["Imported {} quizzes ({} questions) from {} files in {:.1f} s ({:.1f} quizzes per second)".format(self.quizzesImported, self.questionsImported,
+                self.files, duration, self.quizzesImported / duration if duration else 0),
+                "Duplicates skipped: " + str(self.duplicates),
+                "New subjects: " + (", ".join(self.newSubjects) if self.newSubjects else "none"),
+                "New exam boards: " + (", ".join(self.newExamBoards) if self.newExamBoards else "none"),
+                "Errors: " + str(len(self.errors))]
+        for filename, title, message in self.errors[:errorLimit]:
+            lines.append("    " + filename + (" (\"" + title + "\")" if title else "") + ": " + message)
+        if(len(self.errors) > errorLimit):
+            lines.append("    ... and " + str(len(self.errors) - errorLimit) + " more.")
+        return "\n".join(lines)
+
+if(__name__ == "__main__"):
+    import argparse
+    parser = argparse.ArgumentParser(description = "Imports every XML quiz file in a directory (and the directories inside it) into the database.")
+    parser.add_argument("directory", help = "the directory of quiz files")
+    parser.add_argument("--database", default = database.defaultDatabaseFilename(), help = "the database file to import into (default: the application's database)")
+    parser.add_argument("--processes", type = int, default = None, help = "the number of processes reading the files (default: the number of CPUs)")
+    arguments = parser.parse_args()
+    importDatabase = database.DatabaseManager(arguments.database)
+    importer = BulkImporter(importDatabase, arguments.processes)
+    print(importer.getReport(importer.importDirectory(arguments.directory)))
+    importDatabase.dispose(showReport = False)
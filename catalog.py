@@ -0,0 +1,320 @@
+"""
+This file contains the QuizCatalog class, which holds the list of quizzes shown on the quiz browser.
+The catalog keeps the quiz records and the current user's best attempts separately,
+so that changing user only reloads the best attempts rather than every quiz.
+The catalog also indexes the quizzes by subject, exam board and difficulty, so the quiz browser's filters are worked out with set intersections.
+The quizzes are stored by their IDs, so the other windows (e.g. the statistics window) can look up a quiz without going through the whole list,
+and single quizzes can be added, updated or removed when they are created, edited, imported or deleted, without reloading every quiz.
+The quiz records are stored as columns (arrays of numbers, and lists of interned names and tags) rather than a list for each quiz,
+so a catalog of a hundred thousand quizzes takes a fraction of the memory, and the quiz browser only makes rows for the quizzes it shows.
+"""
+
+# Collections is used for the dictionaries of sets that make up the filter indexes.
+import collections
+# Arrays store the number columns compactly, as plain numbers rather than a Python object for each value.
+import array
+# Sys is used to intern the names and tag lists, so quizzes with the same tags share one copy of the text.
+import sys
+
+class QuizCatalog(object):
+    # The columns of the Quizzes table that the quizzes are indexed by, which are used by the quiz browser's filters.
+    subjectColumn = 2
+    examBoardColumn = 3
+    difficultyColumn = 6
+    facetColumns = (subjectColumn, examBoardColumn, difficultyColumn)
+    # The number columns can't hold None, so a missing subject, exam board or difficulty is stored as this, as is the ID of a removed quiz.
+    noValue = -1
+    # The removed quizzes' places are only cleared out once there are at least this many of them, and they are at least half of the catalog.
+    minimumRemovedToCompact = 1000
+
+    def __init__(self, database) -> None:
+        """database is the DatabaseManager object that the catalog loads from."""
+        self.database = database
+        # The quiz records are stored by column rather than as a list for each quiz, which uses much less memory for big catalogs.
+        # The same position in each column is the same quiz, and positions are in the order the quizzes were added.
+        self.clearColumns()
+        # Whether the quiz records have been loaded yet.
+        self.loaded = False
+        # The user whose best attempts are currently loaded, None if no user has been loaded.
+        self.userID = None
+        # The current user's best attempt for each quiz they have done, the QuizID maps to the Results record.
+        self.bestAttempts = {}
+        # The filter indexes. For each indexed column, each value in that column maps to the set of IDs of the quizzes with that value.
+        self.facets = {i: collections.defaultdict(set) for i in QuizCatalog.facetColumns}
+
+    def clearColumns(self) -> None:
+        """Empties the columns of quiz records."""
+        self.ids = array.array("q")
+        self.names = []
+        self.subjects = array.array("q")
+        self.examBoards = array.array("q")
+        self.questionCounts = array.array("l")
+        self.tagLists = []
+        self.difficulties = array.array("b")
+        # The QuizID maps to the quiz's position in the columns.
+        self.positions = {}
+        # The number of places in the columns left by removed quizzes.
+        self.removed = 0
+
+    def toColumnValue(value) -> int: # This is not called on an object, but the class itself.
+        """Returns the value as it is stored in a number column, with None stored as QuizCatalog.noValue."""
+        return int(value) if value != None else QuizCatalog.noValue
+
+    def fromColumnValue(value: int) -> int: # This is not called on an object, but the class itself.
+        """Returns a value stored in a number column, with QuizCatalog.noValue turned back into None."""
+        return value if value != QuizCatalog.noValue else None
+
+    def setRecord(self, position: int, record: tuple) -> None:
+        """Stores a record from the Quizzes table at the given position in the columns. The record's hash isn't needed by the quiz browser, so it isn't kept."""
+        self.ids[position] = int(record[0])
+        self.names[position] = sys.intern(record[1])
+        self.subjects[position] = QuizCatalog.toColumnValue(record[2])
+        self.examBoards[position] = QuizCatalog.toColumnValue(record[3])
+        self.questionCounts[position] = QuizCatalog.toColumnValue(record[4])
+        self.tagLists[position] = sys.intern(record[5] or "")
+        self.difficulties[position] = QuizCatalog.toColumnValue(record[6])
+
+    def appendRecord(self, record: tuple) -> None:
+        """Adds a record from the Quizzes table to the end of the columns."""
+        for i in (self.ids, self.subjects, self.examBoards, self.questionCounts, self.difficulties):
+            i.append(QuizCatalog.noValue)
+        self.names.append(None)
+        self.tagLists.append(None)
+        self.positions[int(record[0])] = len(self.ids) - 1
+        self.setRecord(len(self.ids) - 1, record)
+
+    def getFacetValue(self, position: int, column: int) -> int:
+        """Returns the value of one of the indexed columns for the quiz at the given position."""
+        if(column == QuizCatalog.subjectColumn):
+            return QuizCatalog.fromColumnValue(self.subjects[position])
+        if(column == QuizCatalog.examBoardColumn):
+            return QuizCatalog.fromColumnValue(self.examBoards[position])
+        return QuizCatalog.fromColumnValue(self.difficulties[position])
+
+    def loadQuizzes(self) -> None:
+        """Loads all the quiz records from the database."""
+        self.clearColumns()
+        for i in self.database.execute("SELECT * FROM `Quizzes`;"):
+            self.appendRecord(i)
+        self.loaded = True
+        # Rebuild the filter indexes.
+        self.facets = {i: collections.defaultdict(set) for i in QuizCatalog.facetColumns}
+        for i in self.positions.keys():
+            self.indexQuiz(i)
+
+    def indexQuiz(self, quizID: int) -> None:
+        """
+        Adds a quiz to the filter indexes. The QuizID should be the key in self.positions rather than a value read from self.ids,
+        as each value read from an array is a new int object, and sharing the same object saves memory.
+        """
+        position = self.positions[quizID]
+        for i in QuizCatalog.facetColumns:
+            self.facets[i][self.getFacetValue(position, i)].add(quizID)
+
+    def unindexQuiz(self, quizID: int) -> None:
+        """Removes a quiz from the filter indexes."""
+        position = self.positions[quizID]
+        for i in QuizCatalog.facetColumns:
+            value = self.getFacetValue(position, i)
+            self.facets[i][value].discard(quizID)
+            if(not self.facets[i][value]):
+                # Remove values that no quizzes have any more, so they aren't counted.
+                del self.facets[i][value]
+
+    def loadQuiz(self, quizID: int) -> list:
+        """
+        Loads a single quiz record from the database, e.g. after it has been created, edited or imported, replacing the catalog's old copy of it.
+        Returns the record, or None if the quiz is no longer in the database (in which case it is removed from the catalog).
+        """
+        rows = self.database.execute("SELECT * FROM `Quizzes` WHERE `QuizID` = ?;", float(quizID))
+        if(not rows):
+            self.removeQuiz(quizID)
+            return None
+        record = rows[0]
+        quizID = int(record[0])
+        if(quizID in self.positions):
+            # An edited quiz keeps its place in the catalog.
+            self.unindexQuiz(quizID)
+            self.setRecord(self.positions[quizID], record)
+        else:
+            self.appendRecord(record)
+        self.indexQuiz(quizID)
+        return self.getQuiz(quizID)
+
+    def removeQuiz(self, quizID: int) -> None:
+        """Removes a quiz from the catalog, e.g. after it has been deleted."""
+        if(quizID in self.positions):
+            self.unindexQuiz(quizID)
+            position = self.positions.pop(quizID)
+            # The quiz's place is left empty, so the other quizzes keep their order and positions.
+            self.ids[position] = QuizCatalog.noValue
+            self.names[position] = self.tagLists[position] = None
+            self.removed += 1
+            if(self.removed >= QuizCatalog.minimumRemovedToCompact and self.removed * 2 >= len(self.ids)):
+                self.compact()
+        self.bestAttempts.pop(quizID, None)
+
+    def compact(self) -> None:
+        """Removes the empty places left by removed quizzes from the columns, keeping the other quizzes in the same order."""
+        kept = [i for i in range(len(self.ids)) if self.ids[i] != QuizCatalog.noValue]
+        self.ids = array.array("q", [self.ids[i] for i in kept])
+        self.names = [self.names[i] for i in kept]
+        self.subjects = array.array("q", [self.subjects[i] for i in kept])
+        self.examBoards = array.array("q", [self.examBoards[i] for i in kept])
+        self.questionCounts = array.array("l", [self.questionCounts[i] for i in kept])
+        self.tagLists = [self.tagLists[i] for i in kept]
+        self.difficulties = array.array("b", [self.difficulties[i] for i in kept])
+        # Each quiz's old position maps to its new one. The keys of self.positions are kept, as they are shared with the filter indexes.
+        newPositions = {kept[i]: i for i in range(len(kept))}
+        self.positions = {k: newPositions[v] for k, v in self.positions.items()}
+        self.removed = 0
+
+    def clearFacetValue(self, column: int, value: int) -> None:
+        """
+        Sets one of the indexed columns to None for every quiz with the given value in it, without reloading them,
+        e.g. after a subject or exam board has been deleted and its quizzes have been unbound from it in the database.
+        """
+        columnArray = self.subjects if column == QuizCatalog.subjectColumn else self.examBoards if column == QuizCatalog.examBoardColumn else self.difficulties
+        for i in list(self.facets[column].get(value, ())):
+            self.unindexQuiz(i)
+            columnArray[self.positions[i]] = QuizCatalog.noValue
+            self.indexQuiz(i)
+
+    def getQuiz(self, quizID: int) -> list:
+        """
+        Returns the record of the quiz with the given ID as a list, in the same order as the columns of the Quizzes table (without the hash),
+        or None if there isn't one. The list is made when this is called, so changing it doesn't change the catalog.
+        """
+        position = self.positions.get(quizID, None)
+        if(position == None):
+            return None
+        return [self.ids[position], self.names[position], QuizCatalog.fromColumnValue(self.subjects[position]),
+                QuizCatalog.fromColumnValue(self.examBoards[position]), QuizCatalog.fromColumnValue(self.questionCounts[position]),
+                self.tagLists[position], QuizCatalog.fromColumnValue(self.difficulties[position])]
+
+    def getQuizName(self, quizID: int, default: str = "Unknown quiz") -> str:
+        """Returns the name of the quiz with the given ID, or the default if there isn't one (e.g. it has been deleted)."""
+        position = self.positions.get(quizID, None)
+        return self.names[position] if position != None else default
+
+    def hasQuiz(self, quizID: int) -> bool:
+        """Returns whether the quiz with the given ID is in the catalog."""
+        return quizID in self.positions
+
+    def getQuizCount(self) -> int:
+        """Returns the number of quizzes in the catalog."""
+        return len(self.positions)
+
+    def iterQuizIDs(self):
+        """Goes through the IDs of the quizzes in the catalog, in the order they were added, e.g. "for quizID in catalog.iterQuizIDs():"."""
+        for i in self.ids:
+            if(i != QuizCatalog.noValue):
+                yield i
+
+    def getSearchEntries(self) -> list:
+        """Returns the (QuizID, name, tags) of every quiz, which is what the search index is built from."""
+        return [(k, self.names[v], self.tagLists[v]) for k, v in self.positions.items()]
+
+    def loadUser(self, userID: int) -> None:
+        """
+        Loads the best attempt of every quiz that the given user has done, using a single query.
+        The results are ordered so that the first result found for each quiz is its best attempt (highest score, then quickest time).
+        """
+        self.userID = userID
+        self.bestAttempts = {}
+        for i in self.database.execute("SELECT * FROM `Results` WHERE `UserID` = ? ORDER BY `QuizID`, `Score` DESC, `TotalDuration` ASC;", float(userID)):
+            if(i[2] not in self.bestAttempts):
+                # If this is the first result found for the quiz, it is the best attempt.
+                self.bestAttempts[i[2]] = i
+
+    def reload(self, userID: int) -> None:
+        """Reloads both the quiz records and the given user's best attempts."""
+        self.loadQuizzes()
+        self.loadUser(userID)
+
+    def ensureLoaded(self, userID: int) -> None:
+        """Loads only what isn't already in memory: the quiz records if they haven't been loaded, and the best attempts if the user has changed."""
+        if(not self.loaded):
+            self.loadQuizzes()
+        if(self.userID != userID):
+            self.loadUser(userID)
+
+    def recordResult(self, result: tuple) -> bool:
+        """
+        Updates the best attempt of a quiz with a result that has just been saved, without loading the results again.
+        result is the record as it is in the Results table. Returns True if it is the quiz's new best attempt.
+        """
+        if(result[1] != self.userID):
+            # The best attempts are only kept for the user that has been loaded.
+            return False
+        best = self.bestAttempts.get(result[2], None)
+        # The same order as loadUser: the highest score, then the quickest time.
+        if(best == None or result[3] > best[3] or (result[3] == best[3] and result[6] < best[6])):
+            self.bestAttempts[result[2]] = result
+            return True
+        return False
+
+    def getBestAttempt(self, quizID: int) -> tuple:
+        """Returns the current user's best attempt for a quiz, or None if they haven't attempted it."""
+        return self.bestAttempts.get(quizID, None)
+
+    def getRows(self, quizIDs: list) -> list:
+        """
+        Returns the given quizzes in the format used by the quiz browser: each quiz record as a list (see getQuiz),
+        with a list on the end containing the best attempt (or an empty list if the quiz hasn't been attempted).
+        The rows are only made for the quizzes being shown, and quizzes that are no longer in the catalog are left out.
+        """
+        rows = []
+        for i in quizIDs:
+            row = self.getRow(i)
+            if(row != None):
+                rows.append(row)
+        return rows
+
+    def getRow(self, quizID: int) -> list:
+        """Returns a single quiz in the format used by the quiz browser (see getRows), or None if the quiz is no longer in the catalog."""
+        quiz = self.getQuiz(quizID)
+        if(quiz == None):
+            return None
+        return quiz + [[self.bestAttempts[quizID]] if quizID in self.bestAttempts else []]
+
+    def getFacetCounts(self, column: int) -> dict:
+        """Returns a dictionary of each value in one of the indexed columns, mapped to the number of quizzes with that value."""
+        return {k: len(v) for k, v in self.facets[column].items()}
+
+    def quizPassesFilters(self, quizID: int, subjectID: int = None, examBoardID: int = None, minimumDifficulty: int = None, maximumDifficulty: int = None) -> bool:
+        """Returns whether a single quiz passes all of the given filters, which are the same as filterQuizIDs's. Quizzes not in the catalog never pass."""
+        position = self.positions.get(quizID, None)
+        if(position == None):
+            return False
+        if(subjectID != None and self.getFacetValue(position, QuizCatalog.subjectColumn) != subjectID):
+            return False
+        if(examBoardID != None and self.getFacetValue(position, QuizCatalog.examBoardColumn) != examBoardID):
+            return False
+        difficulty = self.getFacetValue(position, QuizCatalog.difficultyColumn)
+        if(minimumDifficulty != None and (difficulty == None or difficulty < minimumDifficulty)):
+            return False
+        if(maximumDifficulty != None and (difficulty == None or difficulty > maximumDifficulty)):
+            return False
+        return True
+
+    def filterQuizIDs(self, subjectID: int = None, examBoardID: int = None, minimumDifficulty: int = None, maximumDifficulty: int = None) -> set:
+        """
+        Returns the set of IDs of the quizzes that pass all of the given filters, or None if no filters have been given (meaning every quiz passes).
+        Filters that are None are not applied, and the difficulty filters are inclusive.
+        """
+        sets = []
+        if(subjectID != None):
+            sets.append(self.facets[QuizCatalog.subjectColumn].get(subjectID, set()))
+        if(examBoardID != None):
+            sets.append(self.facets[QuizCatalog.examBoardColumn].get(examBoardID, set()))
+        if(minimumDifficulty != None or maximumDifficulty != None):
+            # A difficulty range is the union of the sets for each difficulty within the range.
+            difficulties = self.facets[QuizCatalog.difficultyColumn]
+            sets.append(set().union(*[v for k, v in difficulties.items() if k != None
+                    and (minimumDifficulty == None or k >= minimumDifficulty) and (maximumDifficulty == None or k <= maximumDifficulty)]))
+        if(not sets):
+            return None
+        # Intersect the sets, starting with the smallest so that each intersection is as quick as possible.
+        sets.sort(key = len)
+        return sets[0].intersection(*sets[1:])
@@ -1,22 +1,205 @@
-"""This file contains the code for interacting with the database. Only one DatabaseManager object will be created by the application to interact with the database."""
+"""
+This file contains the code for interacting with the database. Only one DatabaseManager object will be created by the application to interact with the database.
+The DatabaseManager hands the SQL statements to a storage engine, which is either the Microsoft Access engine (the original database, needing pyodbc and Windows)
+or the SQLite engine (built into Python, so it works on any operating system).
+"""
 
 # Imports os.path to make a file path relative to this file.
 import os.path
-# This is the library that requires installation and doesn't come with python.
-# It handles database connections and executing SQL statements.
-import pyodbc
+# Regular expressions are used to translate the Access-specific parts of SQL statements for SQLite.
+import re
+# The lock stops two threads using the database connection at the same time.
+import threading
+# Datetime is needed to store and load the DateCompleted column in SQLite.
+import datetime
+# Contextlib is used to make the transaction method work with "with" statements.
+import contextlib
+# Time is used to time each statement.
+import time
+# SQLite comes with Python, and is used by the SQLite storage engine.
+import sqlite3
+# The profiler records how long each statement takes.
+import profiler
+# Quiz is used to work out the content hashes of migrated questions.
+import quiz
+try:
+    # This is the library that requires installation and doesn't come with python.
+    # It handles connections to the Microsoft Access database.
+    import pyodbc
+except ImportError:
+    # If pyodbc isn't installed (e.g. on Linux), only the SQLite engine can be used.
+    pyodbc = None
+
+class AccessEngine(object):
+    """The storage engine for the original Microsoft Access database file, which connects through pyodbc."""
+    def __init__(self, filepath: str) -> None:
+        if(pyodbc == None):
+            # The Access engine can't run without the pyodbc module.
+            raise ImportError("pyodbc is required to open a Microsoft Access database.")
+        # Connects to the database, using the pyodbc module and its Microsoft Access Driver.
+        self.dbcon = pyodbc.connect("Driver={Microsoft Access Driver (*.mdb, *.accdb)}; Dbq=" + filepath + ";")
+        # The cursor allows you to execute SQL commands on the database.
+        self.dbCursor = self.dbcon.cursor()
+
+    def execute(self, *command, commit: bool = True) -> object:
+        """
+        Executes a statement, and returns a list of rows if it was a SELECT statement, or the cursor if it wasn't.
+        If commit is False, the changes aren't saved until commit() is called.
+        """
+        value = self.dbCursor.execute(*command)
+        try:
+            # This tries to get the results from a select statement. If a non-select statement has been executed, this raises an exception.
+            return self.dbCursor.fetchall()
+        except:
+            # This catches the error thrown by the .fetchall() if the command yielded no output.
+            if(commit):
+                # The line below applies the statement's changes to the database file.
+                self.dbcon.commit()
+            # This value is returned from the .execute(*command) line, and usually is the amount of rows modified by a command.
+            return value
+
+    def executeMany(self, command: str, rows: list) -> list:
+        """Executes an INSERT statement once for each row of parameters, without committing, and returns the ID of each inserted record."""
+        ids = []
+        for i in rows:
+            self.dbCursor.execute(command, *i)
+            # Access needs a separate query to find the ID of each record.
+            ids.append(self.dbCursor.execute("SELECT @@IDENTITY;").fetchall()[0][0])
+        return ids
+
+    def commit(self) -> None:
+        """Saves the changes made since the last commit."""
+        self.dbcon.commit()
+
+    def rollback(self) -> None:
+        """Undoes the changes made since the last commit."""
+        self.dbcon.rollback()
+
+    def close(self) -> None:
+        """Closes the connection to the database file."""
+        self.dbcon.close()
+
+class SQLiteEngine(object):
+    """
+    The storage engine for SQLite database files. It runs in WAL (write-ahead logging) mode,
+    and translates the Access-specific SQL that the rest of the application uses, so the same statements work on both engines.
+    """
+    # The SQL that creates all of the application's tables, if they don't exist yet. The columns are in the same order as the Access database.
+    schema = [
+        "CREATE TABLE IF NOT EXISTS Users (UserID INTEGER PRIMARY KEY AUTOINCREMENT, Username TEXT, TimeConfig INTEGER, DefaultBoardID INTEGER);",
+        "CREATE TABLE IF NOT EXISTS Subjects (SubjectID INTEGER PRIMARY KEY AUTOINCREMENT, SubjectName TEXT);",
+        "CREATE TABLE IF NOT EXISTS Examboards (ExamboardID INTEGER PRIMARY KEY AUTOINCREMENT, EName TEXT);",
+        "CREATE TABLE IF NOT EXISTS Quizzes (QuizID INTEGER PRIMARY KEY AUTOINCREMENT, QuizName TEXT, SubjectID INTEGER, ExamboardID INTEGER, AmountOfQuestions INTEGER, TagList TEXT, Difficulty INTEGER, Hash TEXT);",
+        "CREATE TABLE IF NOT EXISTS Questions (QuestionID INTEGER PRIMARY KEY AUTOINCREMENT, QuizID INTEGER, Question TEXT, CorrectAnswer TEXT, Answer2 TEXT, Answer3 TEXT, Answer4 TEXT, Hint TEXT, Help TEXT, Hash TEXT);",
+        "CREATE TABLE IF NOT EXISTS Results (ResultID INTEGER PRIMARY KEY AUTOINCREMENT, UserID INTEGER, QuizID INTEGER, Score REAL, DateCompleted TIMESTAMP, AverageAnswerTime REAL, TotalDuration REAL);",
+        # Indexes for the columns that the application searches by.
+        "CREATE INDEX IF NOT EXISTS QuestionsQuizIndex ON Questions (QuizID);",
+        "CREATE INDEX IF NOT EXISTS QuizzesHashIndex ON Quizzes (Hash);",
+        "CREATE INDEX IF NOT EXISTS QuizzesNameIndex ON Quizzes (QuizName);",
+        "CREATE INDEX IF NOT EXISTS ResultsUserQuizIndex ON Results (UserID, QuizID);",
+        "CREATE INDEX IF NOT EXISTS ResultsUserDateIndex ON Results (UserID, DateCompleted);",
+    ]
+    # Regular expressions used to find the Access-specific SQL.
+    topRegex = re.compile(r"^(\s*SELECT\s+)TOP\s+(\d+)\s+(.*?)\s*;?\s*$", re.IGNORECASE | re.DOTALL)
+    identityRegex = re.compile(r"@@IDENTITY", re.IGNORECASE)
+
+    def __init__(self, filepath: str) -> None:
+        # Makes SQLite store datetimes as text and turn them back into datetimes when they are loaded, like Access does.
+        sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" "))
+        sqlite3.register_converter("TIMESTAMP", lambda b: datetime.datetime.fromisoformat(b.decode()))
+        # Connects to the database. check_same_thread is turned off as the application uses the database from more than one thread (access is locked by the DatabaseManager).
+        self.dbcon = sqlite3.connect(filepath, detect_types = sqlite3.PARSE_DECLTYPES, check_same_thread = False)
+        # Write-ahead logging lets reads carry on while a write is happening, and makes each commit much cheaper.
+        self.dbcon.execute("PRAGMA journal_mode=WAL;")
+        # With WAL, a "normal" sync level is still safe from corruption, and is a lot faster than "full".
+        self.dbcon.execute("PRAGMA synchronous=NORMAL;")
+        # Create the tables if this is a new database file.
+        for i in SQLiteEngine.schema:
+            self.dbcon.execute(i)
+        self.dbcon.commit()
+        # The cursor allows you to execute SQL commands on the database.
+        self.dbCursor = self.dbcon.cursor()
+        # Translated statements are remembered, as the application runs the same few statements over and over.
+        self.translations = {}
+
+    def translate(self, statement: str) -> str:
+        """Turns an Access SQL statement into the SQLite equivalent."""
+        if(statement in self.translations):
+            # If this statement has been translated before, use the saved translation.
+            return self.translations[statement]
+        translated = statement
+        # SQLite uses last_insert_rowid() instead of @@IDENTITY to get the ID of the last inserted record.
+        translated = SQLiteEngine.identityRegex.sub("last_insert_rowid()", translated)
+        # SQLite uses double quotes around names, rather than backticks.
+        translated = translated.replace("`", "\"")
+        # "SELECT TOP n ..." becomes "SELECT ... LIMIT n".
+        match = SQLiteEngine.topRegex.match(translated)
+        if(match):
+            translated = match.group(1) + match.group(3) + " LIMIT " + match.group(2) + ";"
+        # Remember the translation for next time.
+        self.translations[statement] = translated
+        return translated
+
+    def execute(self, *command, commit: bool = True) -> object:
+        """
+        Executes a statement, and returns a list of rows if it was a SELECT statement, or the number of affected rows if it wasn't.
+        If commit is False, the changes aren't saved until commit() is called.
+        """
+        self.dbCursor.execute(self.translate(command[0]), command[1:])
+        if(self.dbCursor.description != None):
+            # If the statement returns rows (i.e. it was a select statement), return them all.
+            return self.dbCursor.fetchall()
+        if(commit):
+            # Otherwise, apply the statement's changes to the database file.
+            self.dbcon.commit()
+        # Return the number of affected rows.
+        return self.dbCursor.rowcount
+
+    def executeMany(self, command: str, rows: list) -> list:
+        """Executes an INSERT statement once for each row of parameters, without committing, and returns the ID of each inserted record."""
+        statement = self.translate(command)
+        ids = []
+        for i in rows:
+            self.dbCursor.execute(statement, i)
+            # SQLite gives the ID of the inserted record straight away, so no extra query is needed.
+            ids.append(self.dbCursor.lastrowid)
+        return ids
+
+    def commit(self) -> None:
+        """Saves the changes made since the last commit."""
+        self.dbcon.commit()
+
+    def rollback(self) -> None:
+        """Undoes the changes made since the last commit."""
+        self.dbcon.rollback()
+
+    def close(self) -> None:
+        """Closes the connection to the database file."""
+        self.dbcon.close()
 
 class DatabaseManager(object):
+    # The file extensions that use the Access engine. Every other file is opened with the SQLite engine.
+    accessExtensions = (".accdb", ".mdb")
+    # If this is True, every statement and its parameters are printed to the console, for debugging.
+    logStatements = False
+
     def __init__(self, filename: str) -> None:
         # This works out the file path of the directory that this file is stored in, then it adds the filename of the database to the end.
         self.filepath = os.path.join(os.path.dirname(__file__), filename)
         # Logs the database location which was generated above.
         print("Database Path", self.filepath)
-        # Connects to the database, using the pyodbc module and its Microsoft Access Driver.
-        self.dbcon = pyodbc.connect("Driver={Microsoft Access Driver (*.mdb, *.accdb)}; Dbq=" + self.filepath + ";")
-        # The cursor allows you to execute SQL commands on the database.
-        self.dbCursor = self.dbcon.cursor()
-    
+        # Pick the storage engine based on the type of the database file.
+        if(self.filepath.lower().endswith(DatabaseManager.accessExtensions)):
+            self.engine = AccessEngine(self.filepath)
+        else:
+            self.engine = SQLiteEngine(self.filepath)
+        # Only one thread may use the connection at a time.
+        self.lock = threading.RLock()
+        # How many transactions are currently open, as transactions can be put inside each other. Statements are only committed when this is zero.
+        self.transactionDepth = 0
+        # Times every statement, so the report shows where the time is going.
+        self.profiler = profiler.StatementProfiler()
+
     def execute(self, *command) -> object:
         """
         This method completely handles executing SQL statements, including select statements.
@@ -26,23 +209,114 @@ class DatabaseManager(object):
         if a SELECT statement, then it returns a list.
         else, it returns the number of affected lines.
         """
-        # This executes the given SQL command given as many arguments as necessary.
-        print(" | ".join([str(i) for i in command]))
-        value = self.dbCursor.execute(*command)
-        # Returns the results of the command.
-        try:
-            # This tries to get the results from a select statement. If a non-select statement has been executed, this raises an exception.
-            return self.dbCursor.fetchall()
-        except:
-            # This catches the error thrown by the .fetchall() if the command yielded no output.
-            # The line below applies the statement's changes to the database file.
-            self.dbcon.commit()
-            # This value is returned from the .execute(*command) line, and usually is the amount of rows modified by a command.
-            return value
-    
-    def dispose(self) -> None:
-        """Run when this object needs to be destroyed, usually on application exit."""
+        if(DatabaseManager.logStatements):
+            print(" | ".join([str(i) for i in command]))
+        with self.lock:
+            # This executes the given SQL command given as many arguments as necessary, and times it.
+            # Changes are only committed straight away if there isn't a transaction open.
+            startTime = time.perf_counter()
+            result = self.engine.execute(*command, commit = self.transactionDepth == 0)
+            self.profiler.record(command[0], command[1:], time.perf_counter() - startTime, result)
+            # Returns the results of the command.
+            return result
+
+    def executeMany(self, command: str, rows: list) -> list:
+        """
+        This executes an INSERT statement once for each row of parameters, all in a single transaction.
+        Arguments:
+        The SQL command with question marks in place of the input data, and a list of rows, each containing the input data for one record.
+        Returns:
+        A list of the IDs of the inserted records, in the same order as the rows.
+        """
+        if(DatabaseManager.logStatements):
+            print(command + " | " + str(len(rows)) + " rows")
+        with self.transaction():
+            startTime = time.perf_counter()
+            ids = self.engine.executeMany(command, rows)
+            # The whole batch is recorded as one run of the statement.
+            self.profiler.record(command, (str(len(rows)) + " rows",), time.perf_counter() - startTime, ids)
+            return ids
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """
+        This is used with a "with" statement, e.g. "with database.transaction():", and all the statements executed in the with block are saved together.
+        If an error is raised in the with block, none of the changes are saved. Other threads have to wait for the transaction to finish before using the database.
+        Transactions can be put inside each other, and the changes are only saved when the outermost transaction finishes.
+        """
+        with self.lock:
+            self.transactionDepth += 1
+            try:
+                yield self
+            except:
+                self.transactionDepth -= 1
+                if(self.transactionDepth == 0):
+                    # Undo all the changes made in the transaction.
+                    self.engine.rollback()
+                raise
+            self.transactionDepth -= 1
+            if(self.transactionDepth == 0):
+                # Save all the changes made in the transaction.
+                self.engine.commit()
+
+    def getColumnNames(self, table: str) -> list:
+        """Returns the names of a table's columns, in the order that "SELECT *" returns them."""
+        with self.lock:
+            self.engine.execute("SELECT TOP 1 * FROM `" + table + "`;")
+            # Both engines' cursors describe the columns of the last select statement, with the name first.
+            return [i[0] for i in self.engine.dbCursor.description]
+
+    def getReport(self) -> str:
+        """Returns the statement timing report as text."""
+        with self.lock:
+            return self.profiler.getReport()
+
+    def dispose(self, showReport: bool = True) -> None:
+        """Run when this object needs to be destroyed, usually on application exit. If showReport is True, the statement timing report is printed."""
+        if(showReport):
+            # Print the statement timing report for the session.
+            print(self.getReport())
         # This closes the database connection, applying the changes that have been made in the transaction file to the master file.
-        self.dbcon.close()
+        self.engine.close()
         # Log this to the console, for debugging purposes.
         print("Database connection closed.")
+
+def defaultDatabaseFilename() -> str:
+    """Returns the database file the application should open: the Access database if pyodbc is installed, otherwise the SQLite database."""
+    if(pyodbc != None):
+        return "QuizAppDatabase.accdb"
+    return "QuizAppDatabase.db"
+
+def migrateDatabase(source: DatabaseManager, destination: DatabaseManager) -> dict:
+    """
+    Copies every table from one database to another, keeping all the IDs the same, e.g. to move the Access database into SQLite.
+    The destination tables should be empty. Only the source's own columns are copied, so an older database without the newer columns (e.g. the questions' Hash) can be migrated,
+    and the content hashes of the migrated questions are worked out afterwards.
+    Returns a dictionary of table names mapped to the number of records copied.
+    """
+    copied = {}
+    # The tables are copied in this order so that the records each table refers to are copied before it.
+    for table in ["Users", "Subjects", "Examboards", "Quizzes", "Questions", "Results"]:
+        rows = source.execute("SELECT * FROM `" + table + "`;")
+        if(rows):
+            # Builds an INSERT statement naming each of the source's columns with a question mark for each, and inserts all the records in one transaction.
+            columns = source.getColumnNames(table)
+            statement = "INSERT INTO `" + table + "` (" + ", ".join(["`" + i + "`" for i in columns]) + ") VALUES (" + ",".join(["?"] * len(columns)) + ");"
+            destination.executeMany(statement, rows)
+        copied[table] = len(rows)
+        print("Migrated " + str(len(rows)) + " records from " + table + ".")
+    # Questions copied from a database from before the content hashes were added don't have one yet.
+    quiz.Quiz.ensureQuestionHashes(destination)
+    return copied
+
+if(__name__ == "__main__"):
+    # Running this file directly migrates an Access database into an SQLite database, e.g. "python database.py QuizAppDatabase.accdb QuizAppDatabase.db"
+    import sys
+    if(len(sys.argv) != 3):
+        print("Usage: python database.py <source database> <destination database>")
+        sys.exit(1)
+    sourceDatabase = DatabaseManager(sys.argv[1])
+    destinationDatabase = DatabaseManager(sys.argv[2])
+    migrateDatabase(sourceDatabase, destinationDatabase)
+    sourceDatabase.dispose()
+    destinationDatabase.dispose()
@@ -0,0 +1,249 @@
+"""
+This file contains the MinHashSignature and DuplicateIndex classes, which find quizzes that are nearly the same as each other,
+e.g. a copy of a quiz with a few questions reworded, which the content hash doesn't catch as it only finds identical quizzes.
+Each quiz's text is split into shingles (overlapping runs of words), and the quiz's MinHash signature is worked out from them.
+The fraction of places where two signatures match is an estimate of how much of the two quizzes' shingles are the same (their Jaccard similarity).
+The signatures are split into bands, and each band is stored in the QuizSignatureBands table (the LSH index), so the quizzes that share a band with a new quiz,
+which are the only ones likely to be similar, are found with one indexed query instead of comparing against every quiz.
+Run it directly to find the groups of near-duplicate quizzes in the whole database, e.g. "python duplicates.py --threshold 0.7".
+"""
+
+# Random is used to make the hash functions, with a fixed seed so the signatures are the same every time.
+import random
+# Zlib's crc32 is used to turn each shingle into a number, as Python's own hash function changes every time the application runs.
+import zlib
+# Hashlib is used to make the key of each band.
+import hashlib
+# The question text is normalised in the same way as for the content hashes.
+import quiz
+
+def makeHashFunctions(count: int, prime: int, seed: int) -> list:
+    """Returns count hash functions, as (a, b) pairs for the function (a * x + b) mod prime, chosen at random from the given seed."""
+    generator = random.Random(seed)
+    return [(generator.randint(1, prime - 1), generator.randint(0, prime - 1)) for i in range(count)]
+
+class MinHashSignature(object):
+    """
+    The MinHash signature of a quiz, which is worked out a question at a time, so a quiz's questions don't all have to be in memory at once.
+    For each of the hash functions, the signature keeps the smallest hash of any of the quiz's shingles.
+    """
+    # The number of hash functions, which is the length of each signature.
+    numberOfHashes = 64
+    # The number of words in each shingle.
+    shingleLength = 3
+    # The hash functions are (a * x + b) mod prime, with a and b chosen at random using a fixed seed.
+    prime = 4294967311
+    hashFunctions = makeHashFunctions(numberOfHashes, prime, 3)
+
+    def __init__(self, values: list = None) -> None:
+        """values is a signature that has already been worked out, e.g. one loaded from the database, otherwise a new empty signature is made."""
+        self.values = values if values != None else [MinHashSignature.prime] * MinHashSignature.numberOfHashes
+
+    def getShingles(question: 'quiz.Question') -> set: # This is not called on an object, but the class itself.
+        """Returns the shingles of a question as a set of numbers: each run of words in its question and correct answer, and each of its wrong answers."""
+        words = (quiz.Question.normaliseText(question.question) + " " + quiz.Question.normaliseText(question.correctAnswer)).lower().split(" ")
+        length = MinHashSignature.shingleLength
+        shingles = [" ".join(words[i:i + length]) for i in range(max(1, len(words) - length + 1))]
+        # The wrong answers are added as whole shingles, marked so they can't match a run of words.
+        shingles += ["\x1e" + quiz.Question.normaliseText(i).lower() for i in question.otherAnswers]
+        return set([zlib.crc32(i.encode("utf-8")) for i in shingles])
+
+    def addQuestion(self, question: 'quiz.Question') -> None:
+        """Adds a question's shingles to the signature."""
+        shingles = MinHashSignature.getShingles(question)
+        prime = MinHashSignature.prime
+        self.values = [min(value, min([(a * i + b) % prime for i in shingles])) for value, (a, b) in zip(self.values, MinHashSignature.hashFunctions)]
+
+    def isEmpty(self) -> bool:
+        """Returns whether no questions have been added to the signature."""
+        return all([i == MinHashSignature.prime for i in self.values])
+
+    def getSimilarity(self, other: 'MinHashSignature') -> float:
+        """Returns the estimated similarity (between 0 and 1) of the two quizzes, which is the fraction of the signatures' values that are the same."""
+        return sum([1 for i, j in zip(self.values, other.values) if i == j]) / MinHashSignature.numberOfHashes
+
+    def getBandKeys(self) -> list:
+        """Returns the key of each band of the signature, which includes the band's number so the bands can all be stored in the same column."""
+        rows = DuplicateIndex.rowsPerBand
+        return [hashlib.md5((str(i) + ":" + ",".join([str(j) for j in self.values[i * rows:(i + 1) * rows]])).encode("ascii")).hexdigest()[:16]
+                for i in range(DuplicateIndex.numberOfBands)]
+
+    def encode(self) -> str:
+        """Returns the signature as text, so it can be stored in the database."""
+        return "".join(["{:09x}".format(i) for i in self.values])
+
+    def decode(text: str) -> 'MinHashSignature': # This is not called on an object, but the class itself.
+        """Returns the signature stored in the database as text."""
+        return MinHashSignature([int(text[i:i + 9], 16) for i in range(0, len(text), 9)])
+
+    def getQuizSignature(quizObject: 'quiz.Quiz') -> 'MinHashSignature': # This is not called on an object, but the class itself.
+        """Returns the signature of a quiz, going through its questions a few at a time."""
+        signature = MinHashSignature()
+        for i in quizObject.iterQuestions():
+            signature.addQuestion(i)
+        return signature
+
+class DuplicateIndex(object):
+    # The signature is split into this many bands of this many values. Two quizzes become candidates if any of their bands are the same,
+    # which with these numbers is very likely for quizzes that are at least 60% similar, and unlikely for quizzes less than 30% similar.
+    numberOfBands = 16
+    rowsPerBand = 4
+    # Quizzes at least this similar to another quiz are flagged as near-duplicates.
+    similarityThreshold = 0.6
+    # The statements that create the tables, using column types that both Access and SQLite understand.
+    schema = [
+        "CREATE TABLE `QuizSignatures` (`QuizID` INTEGER, `Signature` LONGTEXT);",
+        "CREATE INDEX `QuizSignaturesQuizIndex` ON `QuizSignatures` (`QuizID`);",
+        "CREATE TABLE `QuizSignatureBands` (`BandKey` VARCHAR(16), `QuizID` INTEGER);",
+        "CREATE INDEX `QuizSignatureBandsKeyIndex` ON `QuizSignatureBands` (`BandKey`);",
+        "CREATE INDEX `QuizSignatureBandsQuizIndex` ON `QuizSignatureBands` (`QuizID`);",
+    ]
+
+    def __init__(self, database) -> None:
+        """
+        database is the DatabaseManager object that the signatures are stored in.
+        Any quizzes without a signature are only indexed when the index is first searched, so opening an older database doesn't wait for it.
+        """
+        self.database = database
+        self.ensureTables()
+        # Whether the quizzes without a signature have been indexed yet.
+        self.indexedMissingQuizzes = False
+
+    def ensureTables(self) -> None:
+        """Creates the tables if they aren't in the database yet, e.g. the first time an older database is opened."""
+        try:
+            self.database.execute("SELECT TOP 1 * FROM `QuizSignatures`;")
+        except Exception:
+            with self.database.transaction():
+                for i in DuplicateIndex.schema:
+                    self.database.execute(i)
+
+    def indexMissingQuizzes(self) -> int:
+        """
+        Works out and stores the signatures of any quizzes that don't have one, e.g. the first time an older database is searched. Returns the number of quizzes indexed.
+        The quizzes are loaded a hundred at a time, and each hundred is stored in one transaction.
+        """
+        self.indexedMissingQuizzes = True
+        quizIDs = [i[0] for i in self.database.execute("SELECT `QuizID` FROM `Quizzes` WHERE `QuizID` NOT IN (SELECT `QuizID` FROM `QuizSignatures`);")]
+        if(quizIDs):
+            print("Working out the similarity signatures of " + str(len(quizIDs)) + " quizzes...")
+        for i in range(0, len(quizIDs), 100):
+            with self.database.transaction():
+                for j in quiz.Quiz.getQuizzes(quizIDs[i:i + 100], self.database):
+                    self.addQuiz(j.id, MinHashSignature.getQuizSignature(j))
+        return len(quizIDs)
+
+    def ensureIndexed(self) -> None:
+        """Indexes the quizzes without a signature, the first time this is run."""
+        if(not self.indexedMissingQuizzes):
+            self.indexMissingQuizzes()
+
+    def addQuiz(self, quizID: int, signature: MinHashSignature) -> None:
+        """Stores a quiz's signature and its bands, replacing any that are already stored for it. This should be run when a quiz is created, imported or edited."""
+        with self.database.transaction():
+            self.removeQuiz(quizID)
+            self.database.execute("INSERT INTO `QuizSignatures` (QuizID, Signature) VALUES (?,?);", float(quizID), signature.encode())
+            if(not signature.isEmpty()):
+                # A quiz without any questions has nothing to compare, so it isn't added to the bands.
+                self.database.executeMany("INSERT INTO `QuizSignatureBands` (BandKey, QuizID) VALUES (?,?);", [(i, float(quizID)) for i in signature.getBandKeys()])
+
+    def removeQuiz(self, quizID: int) -> None:
+        """Removes a quiz's signature, e.g. when it is deleted."""
+        with self.database.transaction():
+            self.database.execute("DELETE FROM `QuizSignatures` WHERE `QuizID` = ?;", float(quizID))
+            self.database.execute("DELETE FROM `QuizSignatureBands` WHERE `QuizID` = ?;", float(quizID))
+
+    def getSignatures(self, quizIDs: list) -> dict:
+        """Returns the stored signatures of the given quizzes, as a dictionary of the QuizID mapped to the MinHashSignature."""
+        signatures = {}
+        quizIDs = list(quizIDs)
+        # The quizzes are looked up a few hundred at a time, so the statements don't get too long.
+        for i in range(0, len(quizIDs), 500):
+            part = quizIDs[i:i + 500]
+            for j in self.database.execute("SELECT `QuizID`, `Signature` FROM `QuizSignatures` WHERE `QuizID` IN (" + ",".join(["?"] * len(part)) + ");",
+                    *[float(k) for k in part]):
+                signatures[j[0]] = MinHashSignature.decode(j[1])
+        return signatures
+
+    def findSimilar(self, signature: MinHashSignature, excludeID: int = None, threshold: float = None) -> list:
+        """
+        Returns the quizzes at least threshold similar to the given signature, as a list of (QuizID, similarity) with the most similar first.
+        Only the quizzes that share a band with the signature are compared. excludeID is a quiz to leave out, e.g. the quiz the signature belongs to.
+        """
+        threshold = threshold if threshold != None else DuplicateIndex.similarityThreshold
+        self.ensureIndexed()
+        if(signature.isEmpty()):
+            return []
+        keys = signature.getBandKeys()
+        candidates = set([i[0] for i in self.database.execute("SELECT DISTINCT `QuizID` FROM `QuizSignatureBands` WHERE `BandKey` IN (" + ",".join(["?"] * len(keys)) + ");",
+                *keys)])
+        candidates.discard(excludeID)
+        similar = [(k, signature.getSimilarity(v)) for k, v in self.getSignatures(candidates).items()]
+        return sorted([i for i in similar if i[1] >= threshold], key = lambda i: i[1], reverse = True)
+
+    def findClusters(self, threshold: float = None) -> list:
+        """
+        Returns the groups of near-duplicate quizzes in the whole database, as a list of lists of QuizIDs, with the biggest groups first.
+        Quizzes that share a band are compared, and any two at least threshold similar are put in the same group (along with anything similar to either of them).
+        Within each band, a quiz is compared with the quizzes of each group found in that band so far until one of them is similar enough,
+        and skips the groups it has already joined, so a band shared by lots of near-copies takes about one comparison for each of them
+        instead of one for every pair, while the groups are still exactly the same as comparing every pair (whatever order the quizzes are in).
+        """
+        threshold = threshold if threshold != None else DuplicateIndex.similarityThreshold
+        self.ensureIndexed()
+        # Each band key maps to the quizzes that have that band.
+        buckets = {}
+        for key, quizID in self.database.execute("SELECT `BandKey`, `QuizID` FROM `QuizSignatureBands`;"):
+            buckets.setdefault(key, []).append(quizID)
+        # Only the quizzes that share a band with another quiz need their signatures.
+        signatures = self.getSignatures(set([j for i in buckets.values() if len(i) > 1 for j in i]))
+        # The groups are found by joining the similar pairs together (a union-find), each quiz maps to another quiz in its group until reaching the group's root.
+        parents = {}
+        def findRoot(quizID):
+            while parents.get(quizID, quizID) != quizID:
+                # Point the quiz at its grandparent, so later searches are shorter.
+                parents[quizID] = parents.get(parents[quizID], parents[quizID])
+                quizID = parents[quizID]
+            return quizID
+        for i in buckets.values():
+            if(len(i) < 2):
+                continue
+            # The quizzes in this band so far, in a list for each group they are in.
+            bandGroups = []
+            for quizID in i:
+                joined = [quizID]
+                remaining = []
+                for members in bandGroups:
+                    memberRoot = findRoot(members[0])
+                    # The quiz joins the group if it is already in it from another band, or if it is similar to any of the group's quizzes.
+                    if(memberRoot == findRoot(quizID) or any(signatures[quizID].getSimilarity(signatures[j]) >= threshold for j in members)):
+                        if(memberRoot != findRoot(quizID)):
+                            parents[memberRoot] = findRoot(quizID)
+                        joined += members
+                    else:
+                        remaining.append(members)
+                bandGroups = remaining + [joined]
+        groups = {}
+        for i in parents.keys():
+            groups.setdefault(findRoot(i), []).append(i)
+        return sorted([sorted(set(i + [k])) for k, i in groups.items()], key = len, reverse = True)
+
+if(__name__ == "__main__"):
+    import argparse
+    import database
+    parser = argparse.ArgumentParser(description = "Finds the groups of near-duplicate quizzes in the database.")
+    parser.add_argument("--database", default = database.defaultDatabaseFilename(), help = "the database file (default: the application's database)")
+    parser.add_argument("--threshold", type = float, default = DuplicateIndex.similarityThreshold,
+            help = "how similar two quizzes must be to be grouped, between 0 and 1 (default: " + str(DuplicateIndex.similarityThreshold) + ")")
+    arguments = parser.parse_args()
+    indexDatabase = database.DatabaseManager(arguments.database)
+    quiz.Quiz.ensureQuestionHashes(indexDatabase)
+    index = DuplicateIndex(indexDatabase)
+    clusters = index.findClusters(arguments.threshold)
+    names = {i[0]: i[1] for i in indexDatabase.execute("SELECT `QuizID`, `QuizName` FROM `Quizzes`;")}
+    print(str(len(clusters)) + " groups of near-duplicate quizzes found.")
+    for i in clusters:
+        print("")
+        for j in i:
+            print("    " + str(j) + ": " + str(names.get(j, "Unknown quiz")))
+    indexDatabase.dispose(showReport = False)
@@ -49,6 +49,48 @@ class ListEditor(object):
         # Positioning the buttons.
         self.addNewButton.grid(row = 1, column = 0)
         self.removeButton.grid(row = 1, column = 1)
+    
+    def loadList(self, referenceList) -> None:
+        """
+        Fills the list with the names in the given ReferenceList (the subjects or the exam boards),
+        and keeps it up to date while the window is open, including changes made elsewhere, e.g. by importing a quiz.
+        """
+        self.referenceList = referenceList
+        # Creating the "mapping", which is a list which links each index of the list to the name's ID in the database.
+        # This is necessary because when the code checks what has been selected, it finds a list index rather than an ID.
+        self.mapping = []
+        for id, name in referenceList.names.items():
+            # For each name in the database, add it to the end of the list.
+            self.listView.insert(tk.END, name)
+            # And, add it to the mapping.
+            self.mapping.append(id)
+        self.parent.referenceData.listenWhileOpen(self.window, self.referenceDataChanged)
+    
+    def referenceDataChanged(self, referenceList, id: int, name: str, added: bool) -> None:
+        """This is run when a subject or exam board is added or removed, and updates the list if it is showing that kind of name."""
+        if(referenceList != self.referenceList):
+            return
+        if(added):
+            # Add the name to the end of the list on screen and add it to the mapping.
+            self.listView.insert(tk.END, name)
+            self.mapping.append(id)
+        elif(id in self.mapping):
+            # Remove the name from the list and from the mapping.
+            index = self.mapping.index(id)
+            self.listView.delete(index)
+            del self.mapping[index]
+    
+    def getSelectedID(self) -> int:
+        """Returns the ID of the name selected in the list, or None if nothing is selected."""
+        # Get the current list selection.
+        selection = self.listView.curselection()
+        if(not selection):
+            return None
+        index = selection[0]
+        # If it isn't a valid index, return None.
+        if(not(index >= 0 and index < len(self.mapping))):
+            return None
+        return self.mapping[index]
 
 class SubjectEditor(ListEditor):
     def __init__(self, toplevel: tk.Tk, parent) -> None:
@@ -60,14 +102,8 @@ class SubjectEditor(ListEditor):
         self.generateGUI(toplevel, parent)
         # Setting the title of the window.
         self.window.title("Subject List Editor")
-        # Creating the "subjectMapping", which is a list which links each index of the list to the SubjectID in the database.
-        # This is necessary because when the code checks what has been selected, it finds a list index rather than a subject ID.
-        self.subjectMapping = []
-        for i in self.parent.inverseSubjectDictionary.keys():
-            # For each subject in the database, add it to the end of the list.
-            self.listView.insert(tk.END, i)
-            # And, add it to the subject mapping.
-            self.subjectMapping.append(self.parent.inverseSubjectDictionary[i])
+        # Fill the list with the subjects.
+        self.loadList(self.parent.referenceData.subjects)
     
     def add(self) -> None:
         """
@@ -99,59 +135,26 @@ class SubjectEditor(ListEditor):
             # If running the regular expression changes the name string, it must have invalid characters and so the format check has failed. Show an error message to the user.
             tkmb.showerror("Name error", "Name contains invalid characters, it should only contain english letters, numbers, spaces, dashes, or full stops/periods.", parent = self.window)
             return
-        for i in self.parent.subjectDictionary.values():
-            # Check if the subject already exists in the database.
-            if(i.lower() == name.lower()):
-                # If the subject already exists, show an error to the user.
-                tkmb.showerror("Add subject error", "Subject already exists in the list.")
-                return
-        # If all the other checks pass, add the subject to the dictionary.
-        self.parent.database.execute("INSERT INTO `Subjects` (SubjectName) VALUES (?);", name)
-        # This gets the inserted record's id.
-        lastRecord = self.parent.database.execute("SELECT @@IDENTITY;")
-        id = lastRecord[0][0]
-        # Add the subject to the subject dictionaries.
-        self.parent.subjectDictionary[id] = name
-        self.parent.inverseSubjectDictionary[name] = id
-        # Then add the subject to the end of the list on screen and add it to the mapping.
-        self.listView.insert(tk.END, name)
-        self.subjectMapping.append(id)
-        if(self.parent.state == 2):
-            # Reload the quiz browser, if the user has logged in.
-            self.parent.unloadQuizBrowserScreen()
-            self.parent.loadQuizBrowserScreen()
+        # Check if the subject already exists in the database, ignoring case.
+        if(self.referenceList.find(name) != None):
+            # If the subject already exists, show an error to the user.
+            tkmb.showerror("Add subject error", "Subject already exists in the list.")
+            return
+        # If all the other checks pass, add the subject. This adds it to the list on screen, and updates the quiz browser.
+        self.referenceList.add(name)
     
     def remove(self) -> None:
         """
         This runs when the remove button is clicked.
         It removes the subject that is currently selected in the list.
         """
-        # Get the current list selection.
-        selection = self.listView.curselection()
-        if(not selection):
+        # Get the subject ID of the selected subject. If nothing is selected, return.
+        subjectID = self.getSelectedID()
+        if(subjectID == None):
             return
-        index = selection[0]
-        # If it isn't a valid index (e.g. nothing is selected), return.
-        if(not(index and index >= 0 and index < len(self.subjectMapping))):
-            return
-        # Get the subject ID from the subject-listview list.
-        subjectID = self.subjectMapping[index]
-        # Unbind all quizzes that are bound to the subject being deleted.
-        self.parent.database.execute("UPDATE `Quizzes` SET SubjectID = null WHERE SubjectID = ?;", float(subjectID))
-        # Then delete the subject itself.
-        self.parent.database.execute("DELETE FROM `Subjects` WHERE SubjectID = ?;", float(subjectID))
-        # Remove the subject from the list.
-        self.listView.delete(index)
-        # Remove the subject from the mapping.
-        del self.subjectMapping[index]
-        # Remove it from the subject dictionaries.
-        subjectName = self.parent.subjectDictionary[subjectID]
-        del self.parent.subjectDictionary[subjectID]
-        del self.parent.inverseSubjectDictionary[subjectName]
-        if(self.parent.state == 2):
-            # Reload the quiz browser
-            self.parent.unloadQuizBrowserScreen()
-            self.parent.loadQuizBrowserScreen()
+        # Remove the subject, which unbinds all the quizzes that are bound to it. This removes it from the list on screen,
+        # and the main window unbinds the quizzes in the catalog and updates the quiz browser.
+        self.referenceList.remove(subjectID)
 
 class ExamBoardEditor(ListEditor):
     def __init__(self, toplevel: tk.Tk, parent) -> None:
@@ -163,14 +166,8 @@ class ExamBoardEditor(ListEditor):
         self.generateGUI(toplevel, parent)
         # Setting the title of the window.
         self.window.title("Exam Board List Editor")
-        # Creating the "examBoardMapping", which is a list which links each index of the list to the ExamBoardID in the database.
-        # This is necessary because when the code checks what has been selected, it finds a list index rather than an exam board ID.
-        self.examBoardMapping = []
-        for i in self.parent.examboardDictionary.values():
-            # For every exam board in the database, add it to the on screen list.
-            self.listView.insert(tk.END, i)
-            # And, add it to the exam board mapping.
-            self.examBoardMapping.append(self.parent.inverseExamboardDictionary[i])
+        # Fill the list with the exam boards.
+        self.loadList(self.parent.referenceData.examBoards)
 
     def add(self) -> None:
         """
@@ -198,56 +195,23 @@ class ExamBoardEditor(ListEditor):
             # If running the regular expression changes the name string, it must have invalid characters and so the format check has failed. Show an error message to the user.
             tkmb.showerror("Name error", "Name contains invalid characters, it should only contain english letters, numbers, spaces, dashes, or full stops/periods.", parent = self.window)
             return
-        for i in self.parent.examboardDictionary.values():
-            # Check if the exam board already exists in the database.
-            if(i.lower() == name.lower()):
-                # If the exam board already exists, then show an error message.
-                tkmb.showerror("Add exam board error", "Exam board already exists in the list.")
-                return
-        # If all the other checks pass, add the exam board to the dictionary.
-        self.parent.database.execute("INSERT INTO `Examboards` (EName) VALUES (?);", name)
-        # This gets the inserted record's id.
-        lastRecord = self.parent.database.execute("SELECT @@IDENTITY;")
-        id = lastRecord[0][0]
-        # Add the exam board to the exam board dictionaries.
-        self.parent.examboardDictionary[id] = name
-        self.parent.inverseExamboardDictionary[name] = id
-        # Then add it to the end of the list and to the exam board mapping.
-        self.listView.insert(tk.END, name)
-        self.examBoardMapping.append(id)
-        if(self.parent.state == 2):
-            # Reload the quiz browser
-            self.parent.unloadQuizBrowserScreen()
-            self.parent.loadQuizBrowserScreen()
+        # Check if the exam board already exists in the database, ignoring case.
+        if(self.referenceList.find(name) != None):
+            # If the exam board already exists, then show an error message.
+            tkmb.showerror("Add exam board error", "Exam board already exists in the list.")
+            return
+        # If all the other checks pass, add the exam board. This adds it to the list on screen, and updates the quiz browser.
+        self.referenceList.add(name)
     
     def remove(self) -> None:
         """
         This runs when the remove button is clicked.
         It removes the exam board that is currently selected in the list.
         """
-        # Get the current list selection.
-        selection = self.listView.curselection()
-        if(not selection):
-            return
-        index = selection[0]
-        # If it isn't a valid index (e.g. nothing is selected), return.
-        if(not(index and index >= 0 and index < len(self.examBoardMapping))):
+        # Get the exam board ID of the selected exam board. If nothing is selected, return.
+        examBoardID = self.getSelectedID()
+        if(examBoardID == None):
             return
-        # Get the exam board ID from the exam board-listview list.
-        examBoardID = self.examBoardMapping[index]
-        # Unbind all quizzes that are bound to the exam board being deleted.
-        self.parent.database.execute("UPDATE `Quizzes` SET ExamboardID = null WHERE ExamboardID = ?;", float(examBoardID))
-        # Then delete the exam board itself.
-        self.parent.database.execute("DELETE FROM `Examboards` WHERE ExamboardID = ?;", float(examBoardID))
-        # Remove the exam board from the list.
-        self.listView.delete(index)
-        # Remove the exam board from the mapping.
-        del self.examBoardMapping[index]
-        # Remove it from the exam board dictionaries.
-        examBoardName = self.parent.examboardDictionary[examBoardID]
-        del self.parent.examboardDictionary[examBoardID]
-        del self.parent.inverseExamboardDictionary[examBoardName]
-        if(self.parent.state == 2):
-            # Reload the quiz browser
-            self.parent.unloadQuizBrowserScreen()
-            self.parent.loadQuizBrowserScreen()
+        # Remove the exam board, which unbinds all the quizzes that are bound to it. This removes it from the list on screen,
+        # and the main window unbinds the quizzes in the catalog and updates the quiz browser.
+        self.referenceList.remove(examBoardID)
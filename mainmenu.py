@@ -8,10 +8,6 @@ import tkinter.filedialog as tkfile
 import tkinter.messagebox as tkmb
 # Threading module is needed to add a delay to some code, to fix a bug that is documented in the "Developmental Testing" section.
 import threading
-# Difflib is used to compare how alike two strings are, used in the search bar.
-import difflib
-# Collections is used to sort the quizzes based off of their 'scores' based on how similar a quiz is to the search query.
-import collections
 # Time is used to track how long each search/filter takes.
 import time
 # The 'math' module is used for its floor and ceiling functions. I have renamed it 'maths' because it's better this way.
@@ -19,6 +15,18 @@ import math as maths
 
 # This imports the database file from the same directory as this file.
 import database
+# The catalog holds the quizzes and the current user's best attempts.
+import catalog
+# The search index is used to rank the quizzes for the search bar.
+import search
+# The rollups hold the running totals of each user's results for the statistics window.
+import rollups
+# The quiz cache keeps recently used quizzes in memory.
+import quizCache
+# The duplicate index finds quizzes that are nearly the same as each other.
+import duplicates
+# The reference data holds the subjects and exam boards.
+import referenceData
 
 class MainWindowStates:
     """
@@ -34,6 +42,14 @@ class MainMenu(object):
     # These variables are usually used in window titles.
     appName = "Quizzable"
     appVersion = "v1"
+    # The difficulty filter options are hard coded, because the user can't add their own difficulty levels.
+    # Each option is a tuple of the option's text, the minimum difficulty, and the maximum difficulty.
+    difficultyFilters = [("1", 1, 1), ("2", 2, 2), ("3", 3, 3), ("4", 4, 4), ("5", 5, 5),
+                        ("2 and above", 2, 5), ("3 and above", 3, 5), ("4 and above", 4, 5), ("2 and below", 1, 2), ("3 and below", 1, 3), ("4 and below", 1, 4)]
+    # The number of rows the quiz list moves by for each step of the mouse wheel.
+    wheelScrollRows = 3
+    # If more quizzes than this change at once (e.g. a big import), the filters are applied again rather than patching each quiz into the list of results.
+    maximumPatchedQuizzes = 50
     # If you haven't seen the following method notation before, you can put a colon after a parameter name to indicate what type it should be.
     # This type is not enforced, it is just to make it quickly understandable to anyone reading the code.
     # The return type can follow a "->" after the close bracket but before the colon. This also isn't strictly enforced by Python,
@@ -58,36 +74,51 @@ class MainMenu(object):
         # This gets changed once a user is selected.
         self.currentUser = None
         # This creates the database connection.
-        self.database = database.DatabaseManager("QuizAppDatabase.accdb")
+        self.database = database.DatabaseManager(database.defaultDatabaseFilename())
+        # This makes sure every question's content hash is stored, which older databases don't have. Once they are all stored, this is a single quick query.
+        import quiz
+        quiz.Quiz.ensureQuestionHashes(self.database)
+        # This holds the quizzes shown on the quiz browser, which are loaded once the user logs in.
+        self.catalog = catalog.QuizCatalog(self.database)
+        # This keeps the running totals of each user's results, which the statistics window shows.
+        self.rollups = rollups.StatisticsRollups(self.database)
+        # This keeps the most recently launched, edited or exported quizzes in memory.
+        self.quizCache = quizCache.QuizCache(self.database)
+        # This finds quizzes that are nearly the same as a quiz being created or imported.
+        # Any quizzes that haven't been added to it yet are added when it is first searched, rather than while the application starts.
+        self.duplicates = duplicates.DuplicateIndex(self.database)
         # This creates the menu bar at the top of the window.
         self.createTitleBarMenu()
         # This loads the login screen on the main window.
         self.loadLoginScreen()
         
-        # Exam boards are stored in a dictionary, where the database IDs map to each exam board's name.
-        self.examboardDictionary = {}
-        # This queries the database to get the names of the exam boards.
-        examboardQueryResults = self.database.execute("SELECT * FROM `Examboards`;")
-        if(examboardQueryResults):
-            # If exam boards have been found in the database:
-            for i in examboardQueryResults:
-                # Loop through each exam board in the database table, and add it to the exam board dictionary.
-                self.examboardDictionary[i[0]] = i[1]
-        
-        # Subjects are stored in a dictionary, where the database IDs map to each subject's name.
-        self.subjectDictionary = {}
-        # This queries the database to get the names of the subjects.
-        subjectQueryResults = self.database.execute("SELECT * FROM `Subjects`;")
-        if(subjectQueryResults):
-            # If subjects have been found in the database:
-            for i in subjectQueryResults:
-                # Loop through each subject in the database table, and add it to the subject dictionary.
-                self.subjectDictionary[i[0]] = i[1]
+        # The subjects and exam boards are loaded from the database once, and are added and removed through the reference data.
+        self.referenceData = referenceData.ReferenceData(self.database)
+        # Subjects and exam boards are stored in dictionaries, where the database IDs map to each name.
+        # These are the reference data's own dictionaries, so they are always up to date.
+        self.examboardDictionary = self.referenceData.examBoards.names
+        self.subjectDictionary = self.referenceData.subjects.names
         # Inverse dictionaries for backwards lookups, where the system needs to find a database ID from a subject or exam board name.
-        self.inverseSubjectDictionary = {v: k for k, v in self.subjectDictionary.items()}
-        self.inverseExamboardDictionary = {v: k for k, v in self.examboardDictionary.items()}
+        self.inverseSubjectDictionary = self.referenceData.subjects.ids
+        self.inverseExamboardDictionary = self.referenceData.examBoards.ids
+        # When a subject or exam board is added or removed, the quiz browser is updated.
+        self.referenceData.addListener(self.referenceDataChanged)
         # The quiz the user has currently selected, starts off as None (as no quiz is selected by default).
         self.currentlySelectedQuiz = None
+        # The IDs of all the quizzes that match the filters and search, in the order they are listed. Only the ones that fit in the list are put in the listboxes.
+        self.quizIDs = []
+        # The position in self.quizIDs of the first quiz shown in the list, and how many rows fit in the list.
+        self.listStart = 0
+        self.visibleRowCount = 10
+        # The search index over the quizzes' titles and tags, which is built when the quiz browser is shown.
+        self.searchIndex = None
+        # The background thread that runs the searches typed into the search bar.
+        self.searchWorker = search.SearchWorker()
+        self.searchWorker.start()
+        # The generation number of the search that the quiz browser is waiting on, None if it isn't waiting on one.
+        self.awaitedSearch = None
+        # Whether the main thread is currently checking for a search's results.
+        self.collectingSearchResults = False
     
     def createTitleBarMenu(self) -> None:
         """
@@ -125,6 +156,16 @@ class MainMenu(object):
         self.quizMenu.add_command(label = "Create a Quiz", command = self.createQuizButtonCommand)
         # The command to start the process of importing a quiz, firstly by opening the Windows open file dialog.
         self.quizMenu.add_command(label = "Import a Quiz", command = self.importQuizButtonCommand)
+        # The commands to export every quiz, or the quizzes shown on the quiz browser, into one file.
+        self.quizMenu.add_command(label = "Export All Quizzes", command = lambda: self.exportQuizBundleButtonCommand(False))
+        self.quizMenu.add_command(label = "Export Shown Quizzes", command = lambda: self.exportQuizBundleButtonCommand(True))
+        
+        # This is the tools drop-down, which has the database timing report.
+        self.toolsMenu = tk.Menu(self.menuBar, tearoff = 0)
+        # Shows how long the database statements have taken.
+        self.toolsMenu.add_command(label = "Database Report", command = self.showDatabaseReport)
+        # Clears the timings, so the report only covers what happens next.
+        self.toolsMenu.add_command(label = "Reset Database Report", command = self.database.profiler.reset)
         
         # Adding the above sub-menus to the main menu bar.
         # The "Quiz Management" drop-down which contains the create/import quiz command buttons.
@@ -133,6 +174,8 @@ class MainMenu(object):
         self.menuBar.add_cascade(label = "User", menu = self.userMenu)
         # The "Subjects & Exam Boards" drop-down, which has the command buttons to open the list editor windows.
         self.menuBar.add_cascade(label = "Subjects & Exam Boards", menu = self.subjectsAndExamBoardsMenu)
+        # The "Tools" drop-down, which has the database report.
+        self.menuBar.add_cascade(label = "Tools", menu = self.toolsMenu)
         # The "Statistics" button, which is next to the drop-down menus, which also launches the statistics window.
         self.menuBar.add_command(label = "Statistics", command = self.launchStatistics)
         
@@ -273,11 +316,12 @@ class MainMenu(object):
         self.quizBrowserSearchLabel = tk.Label(self.quizBrowserSearchFrame, text = "Search:")
         # "sticky = tk.E" below makes the search label go as far to the right within its column as it can.
         self.quizBrowserSearchLabel.grid(row = 0, column = 0, sticky = tk.E)
-        # The actual search bar. This will be tied to an event later which updates the search after each letter is typed.
-        self.quizBrowserSearchEntry = tk.Entry(self.quizBrowserSearchFrame, width = 10) # Width is the minimum width in characters.
-        # This binds any key press to launch the search algorithm 0.1 seconds after the user has pressed a key.
-        # It also starts it in another thread, to prevent the application lagging after every button press.
-        self.quizBrowserSearchEntry.bind("<Key>", lambda e: threading.Timer(0.1, self.applyFilters).start())
+        # The text in the search bar. Every time it changes, the search is updated.
+        # The search itself runs on the search worker thread, which only runs the latest search, so typing quickly doesn't start lots of searches.
+        self.quizBrowserSearchString = tk.StringVar()
+        self.quizBrowserSearchString.trace("w", lambda *args: self.applyFilters())
+        # The actual search bar.
+        self.quizBrowserSearchEntry = tk.Entry(self.quizBrowserSearchFrame, width = 10, textvariable = self.quizBrowserSearchString) # Width is the minimum width in characters.
         # "sticky = tk.W + tk.E" makes the element take as much horizontal space within its column as it can.
         self.quizBrowserSearchEntry.grid(row = 0, column = 1, sticky = tk.W + tk.E)
         # Positioning the frame over two columns in the whole window grid.
@@ -293,19 +337,23 @@ class MainMenu(object):
         self.statisticsViewButton.grid(row = 1, column = 3)
         # The quiz filters, as comboboxes. They default to having the text "Filter by ...", but after selecting another value they can't go back to "Filter by ..."
         # To remove the filter after selecting a value for the filter, the user must select the combobox and select "No filter".
-        self.filterByExamBoardCombo = ttk.Combobox(self.tk, state = "readonly", values = ["No filter"] + [i for i in self.examboardDictionary.values()])
-        self.filterBySubjectCombo = ttk.Combobox(self.tk, state = "readonly", values = ["No filter"] + [i for i in self.subjectDictionary.values()])
-        # The difficulty filter options are hard coded, because the user can't add their own difficulty levels.
-        self.filterByDifficultyCombo = ttk.Combobox(self.tk, state = "readonly", values = ["No filter", "1", "2", "3", "4", "5",
-                                                    "2 and above", "3 and above", "4 and above", "2 and below", "3 and below", "4 and below"])
+        # The options are filled in by updateFilterOptions, as each option shows the number of quizzes it matches.
+        self.filterByExamBoardCombo = ttk.Combobox(self.tk, state = "readonly")
+        self.filterBySubjectCombo = ttk.Combobox(self.tk, state = "readonly")
+        self.filterByDifficultyCombo = ttk.Combobox(self.tk, state = "readonly")
+        # The filters that are currently applied, None if the filter isn't set.
+        # The exam board and subject filters hold an ID, and the difficulty filter holds one of the MainMenu.difficultyFilters tuples.
+        self.examBoardFilter = None
+        self.subjectFilter = None
+        self.difficultyFilter = None
         # Setting the default values for the filters.
         self.filterByExamBoardCombo.set("Filter by exam board")
         self.filterBySubjectCombo.set("Filter by subject")
         self.filterByDifficultyCombo.set("Filter by difficulty")
         # Binding the comboboxes to update the list when an option in one of the dropdowns is selected.
-        self.filterByExamBoardCombo.bind("<<ComboboxSelected>>", self.applyFilters)
-        self.filterBySubjectCombo.bind("<<ComboboxSelected>>", self.applyFilters)
-        self.filterByDifficultyCombo.bind("<<ComboboxSelected>>", self.applyFilters)
+        self.filterByExamBoardCombo.bind("<<ComboboxSelected>>", self.selectFilter)
+        self.filterBySubjectCombo.bind("<<ComboboxSelected>>", self.selectFilter)
+        self.filterByDifficultyCombo.bind("<<ComboboxSelected>>", self.selectFilter)
         # Positioning of the filter comboboxes. All fit on the same row.
         self.filterByExamBoardCombo.grid(row = 1, column = 0, sticky = tk.W+tk.E+tk.N+tk.S) # Sticky just makes the element stretch in certain directions.
         self.filterBySubjectCombo.grid(row = 1, column = 1, sticky = tk.W+tk.E+tk.N+tk.S) # tk.N+tk.S means up and down (North and South), tk.W+tk.E means West and East
@@ -334,14 +382,15 @@ class MainMenu(object):
         self.quizListBoxScrollBar = tk.Scrollbar(self.quizListFrame, command = self.scrollbarCommand)
         self.quizListBoxScrollBar.grid(row = 1, column = 4, sticky = tk.N+tk.S)
         # The main Quizzes List is split up into four synchronised lists, due to the nature of the listbox in tkinter.
+        # The lists only ever hold the rows that fit on screen, and scrolling changes which rows they hold, so they don't scroll by themselves.
         # The Quiz Name goes in the first (biggest) column.
-        self.quizListBoxNames = tk.Listbox(self.quizListFrame, yscrollcommand = self.scrollOnList)
+        self.quizListBoxNames = tk.Listbox(self.quizListFrame)
         # The Subject goes in the second column.
-        self.quizListBoxSubject = tk.Listbox(self.quizListFrame, yscrollcommand = self.scrollOnList)
+        self.quizListBoxSubject = tk.Listbox(self.quizListFrame)
         # The Exam Board goes in the third column.
-        self.quizListBoxExamBoard = tk.Listbox(self.quizListFrame, yscrollcommand = self.scrollOnList)
+        self.quizListBoxExamBoard = tk.Listbox(self.quizListFrame)
         # The Best Attempt for each quiz goes in the fourth column.
-        self.quizListBoxBestAttempt = tk.Listbox(self.quizListFrame, yscrollcommand = self.scrollOnList)
+        self.quizListBoxBestAttempt = tk.Listbox(self.quizListFrame)
         # The positioning of the synchronized lists, all on the second row, and all taking as much space as possible in their grid cell using sticky = ...
         self.quizListBoxNames.grid(row = 1, column = 0, sticky = tk.W+tk.E+tk.N+tk.S)
         self.quizListBoxSubject.grid(row = 1, column = 1, sticky = tk.W+tk.E+tk.N+tk.S)
@@ -359,25 +408,120 @@ class MainMenu(object):
         self.quizListBoxSubject.bind("<Key>", lambda e: threading.Timer(0.1, self.selectQuiz).start())
         self.quizListBoxExamBoard.bind("<Key>", lambda e: threading.Timer(0.1, self.selectQuiz).start())
         self.quizListBoxBestAttempt.bind("<Key>", lambda e: threading.Timer(0.1, self.selectQuiz).start())
+        for i in (self.quizListBoxNames, self.quizListBoxSubject, self.quizListBoxExamBoard, self.quizListBoxBestAttempt):
+            # Scrolling with the mouse wheel moves the rows shown in the list. Windows and macOS send MouseWheel events, and Linux sends Button-4 and Button-5 events.
+            i.bind("<MouseWheel>", lambda e: self.scrollQuizList(self.listStart - MainMenu.wheelScrollRows * (1 if e.delta > 0 else -1)))
+            i.bind("<Button-4>", lambda e: self.scrollQuizList(self.listStart - MainMenu.wheelScrollRows))
+            i.bind("<Button-5>", lambda e: self.scrollQuizList(self.listStart + MainMenu.wheelScrollRows))
+            # The arrow keys move the selection, scrolling the list if the selection goes past the top or bottom of it.
+            i.bind("<Up>", lambda e: self.moveSelection(-1))
+            i.bind("<Down>", lambda e: self.moveSelection(1))
+        # When the list changes size, work out how many rows now fit in it.
+        self.quizListBoxNames.bind("<Configure>", self.resizeQuizList)
         
         # Refresh the list of quizzes, which in this case just populates the list for the first time.
-        self.refreshList()
+        # The catalog is only loaded from the database if it hasn't been loaded yet, or if the user has changed.
+        self.refreshList(reloadCatalog = False)
         # Position the frame on the window.
         self.quizListFrame.grid(row = 2, column = 0, columnspan = 3, rowspan = 2, sticky = tk.W+tk.E+tk.N+tk.S)
         # Then load the labels and buttons to the right of the main list, the "side panel".
         self.loadSidePanel()
     
-    def refreshList(self) -> None:
-        """This method loads all the quizzes from the database and finds each one's best attempt - ready to be filtered, and searched."""
+    def refreshList(self, reloadCatalog: bool = True) -> None:
+        """
+        This method loads all the quizzes from the database and finds each one's best attempt - ready to be filtered, and searched.
+        If reloadCatalog is False, only the parts of the catalog that haven't been loaded for the current user are fetched from the database.
+        """
         if(self.state != MainWindowStates.quizBrowser):
             # If the quiz browser isn't open, don't referesh the quiz list.
             return
-        # For each quiz in the database, put it in a list of result rows and then add each quiz's best attempt by the currently selected user to the end of each row (not affecting the database).
-        self.allQuizzes = [list(i) + [self.database.execute("SELECT * FROM `Results` WHERE `UserID` = ? AND `QuizID` = ? ORDER BY `Score` DESC, `TotalDuration` ASC;", float(self.currentUser.id), float(i[0]))]
-                                for i in self.database.execute("SELECT * FROM `Quizzes`;")]
+        if(reloadCatalog):
+            # Load all the quizzes, and the current user's best attempts in a single query.
+            self.catalog.reload(self.currentUser.id)
+        else:
+            # Only load what has changed, e.g. only the best attempts after switching user.
+            self.catalog.ensureLoaded(self.currentUser.id)
+        # Build the search index over the titles and tags of all the quizzes, which is used by the search bar.
+        self.searchIndex = search.SearchIndex(self.catalog.getSearchEntries())
+        # Update the numbers of quizzes shown next to each filter option.
+        self.updateFilterOptions()
         # With all the quizzes gathered from the database, reapply any filters and searches applied.
         self.applyFilters()
     
+    def quizzesChanged(self, quizIDs: list) -> None:
+        """
+        This is run after quizzes have been created, edited or imported, and saved in the database.
+        Only those quizzes are loaded again, and they are patched into the catalog, the search index, and the list of results,
+        rather than loading everything again with refreshList.
+        """
+        for i in quizIDs:
+            # Make sure no out of date copy of the quiz is in the quiz cache, then load the quiz into the catalog.
+            self.quizCache.invalidate(i)
+            record = self.catalog.loadQuiz(i)
+            if(self.searchIndex != None):
+                # Replace the quiz's old title and tags in the search index.
+                self.searchIndex.removeQuiz(i)
+                if(record != None):
+                    self.searchIndex.addQuiz(i, record[1], record[5])
+        self.updateResults(quizIDs)
+    
+    def quizRemoved(self, quizID: int) -> None:
+        """This is run after a quiz has been deleted from the database, and removes it from the catalog, the quiz cache, the search index, and the list of results."""
+        self.catalog.removeQuiz(quizID)
+        self.quizCache.invalidate(quizID)
+        if(self.searchIndex != None):
+            self.searchIndex.removeQuiz(quizID)
+        self.updateResults([quizID])
+    
+    def updateResults(self, quizIDs: list) -> None:
+        """
+        This updates the list of results after the given quizzes have changed. Without a search, each quiz is added to, kept in, or taken out of the list
+        depending on whether it still passes the filters, and the list stays scrolled where it was. With a search, the search is run again,
+        as the quizzes' places depend on how well they match. If lots of quizzes have changed, the filters are simply applied again.
+        """
+        if(self.state != MainWindowStates.quizBrowser):
+            # The quiz browser isn't open, so the list is made when it is next shown.
+            return
+        # Update the numbers of quizzes shown next to each filter option.
+        self.updateFilterOptions()
+        if(len(self.quizBrowserSearchEntry.get().strip()) or len(quizIDs) > MainMenu.maximumPatchedQuizzes):
+            self.applyFilters()
+            return
+        # The quiz that is selected, so that it stays selected if the quizzes before it move.
+        selectedID = self.quizIDs[self.currentlySelectedQuiz] if self.currentlySelectedQuiz != None and self.currentlySelectedQuiz < len(self.quizIDs) else None
+        for i in quizIDs:
+            passes = self.catalog.quizPassesFilters(i, self.subjectFilter, self.examBoardFilter,
+                                    self.difficultyFilter[1] if self.difficultyFilter else None, self.difficultyFilter[2] if self.difficultyFilter else None)
+            try:
+                position = self.quizIDs.index(i)
+            except ValueError:
+                position = None
+            if(passes and position == None):
+                # A new quiz goes on the end, which is where it is in the catalog.
+                self.quizIDs.append(i)
+            elif(not passes and position != None):
+                # A deleted quiz, or one that no longer passes the filters, is taken out.
+                del self.quizIDs[position]
+        self.currentlySelectedQuiz = None
+        if(selectedID != None and self.catalog.hasQuiz(selectedID)):
+            try:
+                self.currentlySelectedQuiz = self.quizIDs.index(selectedID)
+            except ValueError:
+                pass
+        # Redraw the rows shown, keeping the list scrolled to the same place if it still can be.
+        start = self.listStart
+        self.listStart = -1
+        self.scrollQuizList(start)
+    
+    def resultSaved(self, result: tuple) -> None:
+        """
+        This is run after the result of a quiz has been saved, and is given the record added to the Results table.
+        Only the quiz's best attempt is updated, and the rows shown are redrawn if it is a new best attempt.
+        The results aren't ordered by best attempt, so none of the quizzes need to move.
+        """
+        if(self.catalog.recordResult(result) and self.state == MainWindowStates.quizBrowser):
+            self.renderVisibleRows()
+    
     def applyFilters(self, e = None) -> None:
         """
         This is run by the refreshList method, and by changing a filter or changing the text in the search bar.
@@ -389,186 +533,231 @@ class MainMenu(object):
             return
         
         # Record the time at which this method starts running.
-        startTime = time.clock()
+        self.filterStartTime = time.perf_counter()
         
         # Get the search query from the search bar.
         searchQuery = self.quizBrowserSearchEntry.get().lower()
-        # Get the values of the filters
-        subjectText = self.filterBySubjectCombo.get()
-        examBoardText = self.filterByExamBoardCombo.get()
-        difficultyText = self.filterByDifficultyCombo.get()
-        # Copy the list of all the quizzes, if the [:] is omitted, then the quizList variable just refrences the self.allQuizzes list.
-        quizList = self.allQuizzes[:]
-        if(not subjectText == "Filter by subject" and not subjectText == "No filter"):
-            # If the subject filter has been set:
-            x = 0
-            # Get the subject ID.
-            allowedSubject = self.inverseSubjectDictionary[subjectText]
-            while x < len(quizList):
-                # Go through the list of quizzes, and remove those ones that don't match the subject filter.
-                if(quizList[x][2] != allowedSubject):
-                    del quizList[x]
-                else:
-                    x += 1
-        if(not examBoardText == "Filter by exam board" and not examBoardText == "No filter"):
-            # If the exam board filter has been set:
-            x = 0
-            # Get the exam board ID:
-            allowedExamBoard = self.inverseExamboardDictionary[examBoardText]
-            while x < len(quizList):
-                # Go through the list of quizzes, and remove those ones that don't match the exam board filter.
-                if(quizList[x][3] != allowedExamBoard):
-                    # If the quiz doesn't match the filter, remove it.
-                    del quizList[x]
-                else:
-                    # Otherwise, carry on.
-                    x += 1
-        if(not difficultyText == "Filter by difficulty" and not difficultyText == "No filter"):
-            # If the difficulty filter has been set:
-            if(len(difficultyText) == 1):
-                # And if the difficulty filter is just one difficulty, not a range:
-                x = 0
-                # Get the allowed difficulty.
-                allowedDifficulty = int(difficultyText[0])
-                while x < len(quizList):
-                    # Then go through the list of quizzes, and remove those ones that don't match the difficulty filter.
-                    if(quizList[x][6] != allowedDifficulty):
-                        # If the quiz doesn't match the filter, remove it.
-                        del quizList[x]
-                    else:
-                        # Otherwise, carry on.
-                        x += 1
-            elif(difficultyText.endswith("above")):
-                # If the difficulty filter is a range with the word "above", e.g. "3 and above".
-                x = 0
-                # Find the minimum difficulty
-                allowedDifficulty = int(difficultyText[0])
-                while x < len(quizList):
-                    # Then go through the list of quizzes, and remove those ones that are below the minimum difficulty.
-                    if(quizList[x][6] < allowedDifficulty):
-                        # If the quiz doesn't match the filter, remove it.
-                        del quizList[x]
-                    else:
-                        # Otherwise, carry on.
-                        x += 1
-            else:
-                # If the difficulty filter is a range with the word "below", e.g. "2 and below".
-                x = 0
-                # Get the maximum diffiuclty
-                allowedDifficulty = int(difficultyText[0])
-                while x < len(quizList):
-                    # Then go through the list of quizzes, and remove those ones that are above the maximum difficulty.
-                    if(quizList[x][6] > allowedDifficulty):
-                        # If the quiz doesn't match the filter, remove it.
-                        del quizList[x]
-                    else:
-                        # Otherwise, carry on.
-                        x += 1
+        # Find the IDs of the quizzes that pass the filters, using the catalog's indexes. This is None if no filters are set.
+        allowedIDs = self.catalog.filterQuizIDs(self.subjectFilter, self.examBoardFilter,
+                                    self.difficultyFilter[1] if self.difficultyFilter else None, self.difficultyFilter[2] if self.difficultyFilter else None)
         
         # Ranking algorithm
         if(len(searchQuery.strip())):
             # If there is text in the search bar that isn't white space:
-            # Split the query into a list of words, separated by spaces.
-            searchWords = searchQuery.split(" ")
-            quizRankings = {}
-            for i in range(len(quizList)):
-                # For each quiz:
-                score = 0
-                for k in searchWords:
-                    if(not k):
-                        # If there is just a space with no word following, then ignore that word.
-                        continue
-                    # For each word in the search query:
-                    for j in quizList[i][1].split(" "):
-                        # For each word in the quiz title, work out how similar the words are and add it to the score.
-                        score += 2 * maths.pow(difflib.SequenceMatcher(None, k, j).ratio(), 3)
-                        # Also add the number of exact word matches to the score.
-                        score += j.count(k)
-                    for j in quizList[i][5].split(","):
-                        # Then go through the tags, and work out how similar the words are and add it to the score.
-                        score += 2 * maths.pow(difflib.SequenceMatcher(None, k, j).ratio(), 4)
-                # Divide the score to remove the advantage of having a large number of words in the title and a large amount of tags.
-                quizRankings[i] = score / (1 + quizList[i][1].count(" ") + quizList[i][5].count(","))
-            # The counter is a way to order the quizzes by their scores easily.
-            counter = collections.Counter(quizRankings)
-        
+            # Send the search to the search worker, which will use the search index to find the best matching quizzes out of the ones that passed the filters.
+            # This replaces any search that was still running for older text in the search bar.
+            # Every matching quiz is found, as the list can scroll through all of them, but they are only put in order as far down as the list is scrolled.
+            self.awaitedSearch = self.searchWorker.submit(self.searchIndex, searchQuery, allowedIDs, None)
+            if(not self.collectingSearchResults):
+                # Check for the search's results shortly, unless the quiz browser is already checking for an older search's results.
+                self.collectingSearchResults = True
+                self.tk.after(5, self.collectSearchResults)
+        else:
+            # If there wasn't a search query, stop any search that is still running and list all the quizzes that passed the filters.
+            self.searchWorker.cancel()
+            self.awaitedSearch = None
+            if(allowedIDs == None):
+                quizIDs = list(self.catalog.iterQuizIDs())
+            else:
+                quizIDs = [i for i in self.catalog.iterQuizIDs() if i in allowedIDs]
+            self.showQuizResults(quizIDs)
+    
+    def updateFilterOptions(self) -> None:
+        """
+        This fills in the options of the filter comboboxes, with the number of quizzes each option matches next to it, e.g. "Mathematics (1,204)".
+        The counts come from the catalog's indexes.
+        """
+        # The exam board and subject options, in the same order as the dictionaries. These lists map each option's index to its ID.
+        self.examBoardFilterOptions = list(self.examboardDictionary.keys())
+        self.subjectFilterOptions = list(self.subjectDictionary.keys())
+        examBoardCounts = self.catalog.getFacetCounts(catalog.QuizCatalog.examBoardColumn)
+        subjectCounts = self.catalog.getFacetCounts(catalog.QuizCatalog.subjectColumn)
+        difficultyCounts = self.catalog.getFacetCounts(catalog.QuizCatalog.difficultyColumn)
+        # The option text for each exam board, subject and difficulty option.
+        examBoardTexts = [self.examboardDictionary[i] + " ({:,})".format(examBoardCounts.get(i, 0)) for i in self.examBoardFilterOptions]
+        subjectTexts = [self.subjectDictionary[i] + " ({:,})".format(subjectCounts.get(i, 0)) for i in self.subjectFilterOptions]
+        # The count for a difficulty range is the total of the counts for each difficulty in the range.
+        difficultyTexts = [i[0] + " ({:,})".format(sum([difficultyCounts.get(j, 0) for j in range(i[1], i[2] + 1)])) for i in MainMenu.difficultyFilters]
+        self.filterByExamBoardCombo.config(values = ["No filter"] + examBoardTexts)
+        self.filterBySubjectCombo.config(values = ["No filter"] + subjectTexts)
+        self.filterByDifficultyCombo.config(values = ["No filter"] + difficultyTexts)
+        # If a filter is applied, update the text shown in its combobox, as its count may have changed.
+        if(self.examBoardFilter in self.examBoardFilterOptions):
+            self.filterByExamBoardCombo.set(examBoardTexts[self.examBoardFilterOptions.index(self.examBoardFilter)])
+        if(self.subjectFilter in self.subjectFilterOptions):
+            self.filterBySubjectCombo.set(subjectTexts[self.subjectFilterOptions.index(self.subjectFilter)])
+        if(self.difficultyFilter in MainMenu.difficultyFilters):
+            self.filterByDifficultyCombo.set(difficultyTexts[MainMenu.difficultyFilters.index(self.difficultyFilter)])
+    
+    def referenceDataChanged(self, referenceList, id: int, name: str, added: bool) -> None:
+        """
+        This is run when a subject or exam board is added or removed, e.g. by the list editors or by importing a quiz.
+        Only the parts of the application that use it are updated, rather than reloading the whole quiz browser.
+        """
+        isSubject = referenceList == self.referenceData.subjects
+        if(not added):
+            # Unbind the quizzes in the catalog, as they have been unbound in the database.
+            self.catalog.clearFacetValue(catalog.QuizCatalog.subjectColumn if isSubject else catalog.QuizCatalog.examBoardColumn, id)
+            # The cached quizzes may hold the removed ID too, so empty the quiz cache.
+            self.quizCache.clear()
+            # The statistics totals are grouped by subject and exam board, so the totals for the removed one are moved to the totals without one.
+            self.rollups.clearValue(referenceList.quizColumn, id)
+        if(self.state != MainWindowStates.quizBrowser):
+            return
+        if(not added and isSubject and self.subjectFilter == id):
+            # If the quizzes were being filtered by the removed subject, remove the filter.
+            self.subjectFilter = None
+            self.filterBySubjectCombo.set("Filter by subject")
+        elif(not added and not isSubject and self.examBoardFilter == id):
+            self.examBoardFilter = None
+            self.filterByExamBoardCombo.set("Filter by exam board")
+        # Update the filter options, then show the list again so the quizzes' subjects and exam boards are up to date.
+        self.updateFilterOptions()
+        self.applyFilters()
+    
+    def selectFilter(self, e = None) -> None:
+        """
+        This is run when an option is selected in one of the filter comboboxes.
+        It records which filters are selected, and then re-applies the filters.
+        """
+        # The index of the selected option in each combobox, where 0 is "No filter" and -1 is the default "Filter by ..." text.
+        examBoardIndex = self.filterByExamBoardCombo.current()
+        subjectIndex = self.filterBySubjectCombo.current()
+        difficultyIndex = self.filterByDifficultyCombo.current()
+        # Find the ID or difficulty range of each selected option.
+        self.examBoardFilter = self.examBoardFilterOptions[examBoardIndex - 1] if examBoardIndex > 0 else None
+        self.subjectFilter = self.subjectFilterOptions[subjectIndex - 1] if subjectIndex > 0 else None
+        self.difficultyFilter = MainMenu.difficultyFilters[difficultyIndex - 1] if difficultyIndex > 0 else None
+        self.applyFilters()
+    
+    def collectSearchResults(self) -> None:
+        """
+        This is run on the main thread after a search has been sent to the search worker.
+        If the search has finished, its results are shown on the list, otherwise this checks again a moment later.
+        """
+        if(self.state != MainWindowStates.quizBrowser or self.awaitedSearch == None):
+            # If the quiz browser has been closed, or the search is no longer wanted, stop checking.
+            self.collectingSearchResults = False
+            return
+        quizIDs = self.searchWorker.getResult(self.awaitedSearch)
+        if(quizIDs == None):
+            # The search hasn't finished yet, so check again in a moment.
+            self.tk.after(10, self.collectSearchResults)
+            return
+        self.awaitedSearch = None
+        self.collectingSearchResults = False
+        # The results are only put in order as far down as the list shows, so they are shown as they are rather than copied into a list.
+        # Deleting a quiz runs the search again, and until then a deleted quiz's row is left blank.
+        self.showQuizResults(quizIDs)
+    
+    def showQuizResults(self, quizIDs: list) -> None:
+        """
+        This is given the IDs of all the quizzes that match the filters and search, in order, and shows the list from the top.
+        Only the rows that fit in the list are made, so it takes the same time to show 10 results as it does to show 100,000.
+        """
+        # Keep the same quiz selected if it is still in the results.
+        selectedID = self.quizIDs[self.currentlySelectedQuiz] if self.currentlySelectedQuiz != None and self.currentlySelectedQuiz < len(self.quizIDs) else None
+        self.quizIDs = quizIDs
+        self.currentlySelectedQuiz = None
+        if(selectedID != None):
+            try:
+                self.currentlySelectedQuiz = self.quizIDs.index(selectedID)
+            except ValueError:
+                # The selected quiz no longer matches, so nothing is selected.
+                pass
+        # Go back to the top of the list.
+        self.listStart = 0
+        self.renderVisibleRows()
+        # Print to the console how long it took to filter, search, and sort the list of quizzes.
+        print("Search and filter took: " + str(round(time.perf_counter() - self.filterStartTime, 3)) + "s")
+    
+    def renderVisibleRows(self) -> None:
+        """This clears the quiz lists and fills them with just the rows that fit in the list, starting from self.listStart, then moves the scroll bar to match."""
         # Clear the visual lists.
         self.quizListBoxNames.delete(0, tk.END)
         self.quizListBoxSubject.delete(0, tk.END)
         self.quizListBoxExamBoard.delete(0, tk.END)
         self.quizListBoxBestAttempt.delete(0, tk.END)
-        # Clear the behind-the-scenes lists.
-        self.quizIDs = []
-        self.quizNames = []
-        self.quizSubjects = []
-        self.quizExamboards = []
-        self.quizQuestionNumbers = []
-        self.quizDifficulties = []
-        self.quizTags = {}
         
-        if(len(searchQuery.strip())):
-            # If there was a search query:
-            # Go through the list of quizzes in order of their scores and add each to the lists and behind-the-scenes lists.
-            for j in counter.most_common(200):
-                i = quizList[j[0]]
-                # Add things to the behind-the-scenes lists.
-                self.quizIDs.append(i[0])
-                self.quizNames.append(i[1])
-                self.quizSubjects.append(i[2])
-                self.quizExamboards.append(i[3])
-                self.quizQuestionNumbers.append(i[4])
-                self.quizDifficulties.append(i[6])
-                # The tags needs to be parsed into a list, rather than a CSV string.
-                # The in-line IF statement is to prevent .split() being called on a null value, in case a quiz has no tags.
-                self.quizTags[i[0]] = i[5].split(",") if i[5] else []
-                # This is adds each quiz to each of the on-screen lists.
-                self.quizListBoxNames.insert(tk.END, i[1])
-                # The subject and exam board for the quiz needs to be looked up in the dictionaries because they are stored as IDs in the database.
-                self.quizListBoxSubject.insert(tk.END, self.subjectDictionary.get(i[2], ""))
-                self.quizListBoxExamBoard.insert(tk.END, self.examboardDictionary.get(i[3], ""))
-                
-                if(i[8] and len(i[8])):
-                    # If the user has attempted the quiz.
-                    timeInSeconds = i[8][0][6]
-                    # Calculate the time taken in minutes and seconds.
-                    timeTakenString = (str(round(timeInSeconds // 60)) + "m " if timeInSeconds >= 60 else "") + (str(round((maths.ceil(timeInSeconds * 10) / 10) % 60, 1)) + "s" if round((maths.ceil(timeInSeconds * 10) / 10) % 60, 1) else "")
-                    # Then add the score and the time taken to the best attempt column.
-                    self.quizListBoxBestAttempt.insert(tk.END, str(round(i[8][0][3] * 100, 1)) + "% - " + timeTakenString)
-                else:
-                    # If the user hasn't attempted the quiz, show "Not Attempted" in the best attempt column.
-                    self.quizListBoxBestAttempt.insert(tk.END, "Not Attempted")
+        for i in self.quizIDs[self.listStart:self.listStart + self.visibleRowCount]:
+            # Each row is made from the catalog, with its best attempt by the currently selected user on the end of it.
+            row = self.catalog.getRow(i)
+            if(row == None):
+                # If the quiz has been deleted since the results were found, leave its row blank so the rows still line up with self.quizIDs.
+                row = [i, "", None, None, 0, "", 0, []]
+            # This is adds each quiz to each of the visual lists.
+            self.quizListBoxNames.insert(tk.END, row[1])
+            # The subject and exam board for the quiz needs to be looked up in the dictionaries because they are stored as IDs in the database.
+            self.quizListBoxSubject.insert(tk.END, self.subjectDictionary.get(row[2], ""))
+            self.quizListBoxExamBoard.insert(tk.END, self.examboardDictionary.get(row[3], ""))
+            if(row[7] and len(row[7])):
+                # If the user has attempted the quiz.
+                timeInSeconds = row[7][0][6]
+                # Calculate the time taken in minutes and seconds.
+                timeTakenString = (str(round(timeInSeconds // 60)) + "m " if timeInSeconds >= 60 else "") + (str(round((maths.ceil(timeInSeconds * 10) / 10) % 60, 1)) + "s" if round((maths.ceil(timeInSeconds * 10) / 10) % 60, 1) else "")
+                # Then add the score and the time taken to the best attempt column.
+                self.quizListBoxBestAttempt.insert(tk.END, str(round(row[7][0][3] * 100, 1)) + "% - " + timeTakenString)
+            else:
+                # If the user hasn't attempted the quiz, show "Not Attempted" in the best attempt column.
+                self.quizListBoxBestAttempt.insert(tk.END, "Not Attempted")
+        if(self.currentlySelectedQuiz != None and self.listStart <= self.currentlySelectedQuiz < self.listStart + self.visibleRowCount):
+            # If the selected quiz is one of the rows shown, highlight it again, as clearing the lists removed the highlight.
+            self.quizListBoxNames.selection_set(self.currentlySelectedQuiz - self.listStart)
+        # The scroll bar shows which part of all the results is shown, as fractions of the way down the results.
+        total = len(self.quizIDs)
+        if(total):
+            self.quizListBoxScrollBar.set(self.listStart / total, min(self.listStart + self.visibleRowCount, total) / total)
         else:
-            # If there wasn't a search query:
-            # This goes through each quiz in the database and adds it to these lists which will be used in searching/filtering.
-            for j in range(min(200, len(quizList))): # A maximum of 200 records will be shown.
-                i = quizList[j]
-                # Add things to the behind-the-scenes lists.
-                self.quizIDs.append(i[0])
-                self.quizNames.append(i[1])
-                self.quizSubjects.append(i[2])
-                self.quizExamboards.append(i[3])
-                self.quizQuestionNumbers.append(i[4])
-                self.quizDifficulties.append(i[6])
-                # The tags needs to be parsed into a list, rather than a CSV string.
-                # The in-line IF statement is to prevent .split() being called on a null value, in case a quiz has no tags.
-                self.quizTags[i[0]] = i[5].split(",") if i[5] else []
-                # This is adds each quiz to each of the visual lists.
-                self.quizListBoxNames.insert(tk.END, i[1])
-                # The subject and exam board for the quiz needs to be looked up in the dictionaries because they are stored as IDs in the database.
-                self.quizListBoxSubject.insert(tk.END, self.subjectDictionary.get(i[2], ""))
-                self.quizListBoxExamBoard.insert(tk.END, self.examboardDictionary.get(i[3], ""))
-                if(i[8] and len(i[8])):
-                    # If the user has attempted the quiz.
-                    timeInSeconds = i[8][0][6]
-                    # Calculate the time taken in minutes and seconds.
-                    timeTakenString = (str(round(timeInSeconds // 60)) + "m " if timeInSeconds >= 60 else "") + (str(round((maths.ceil(timeInSeconds * 10) / 10) % 60, 1)) + "s" if round((maths.ceil(timeInSeconds * 10) / 10) % 60, 1) else "")
-                    # Then add the score and the time taken to the best attempt column.
-                    self.quizListBoxBestAttempt.insert(tk.END, str(round(i[8][0][3] * 100, 1)) + "% - " + timeTakenString)
-                else:
-                    # If the user hasn't attempted the quiz, show "Not Attempted" in the best attempt column.
-                    self.quizListBoxBestAttempt.insert(tk.END, "Not Attempted")
-        # Print to the console how long it took to filter, search, and sort the list of quizzes.
-        print("Search and filter took: " + str(round(time.clock() - startTime, 3)) + "s")
+            self.quizListBoxScrollBar.set(0, 1)
+    
+    def scrollQuizList(self, start: int) -> str:
+        """
+        This shows the rows starting from the given position in the results, keeping the list full where possible.
+        Returns "break", so that tkinter doesn't also run its own scrolling for the event that called this.
+        """
+        # Keep the start within the results, so the list doesn't scroll past the last row.
+        start = max(0, min(int(start), len(self.quizIDs) - self.visibleRowCount))
+        if(start != self.listStart):
+            # Only redraw the list if the rows shown have changed.
+            self.listStart = start
+            self.renderVisibleRows()
+        return "break"
+    
+    def resizeQuizList(self, e) -> None:
+        """This is run when the list changes size, and works out how many rows fit in it, redrawing the list if that has changed."""
+        # The height of one row is the height of a line of text in the list's font, plus the border drawn around a selected row.
+        rowHeight = tkfont.Font(font = self.quizListBoxNames.cget("font")).metrics("linespace") + 2 * int(self.quizListBoxNames.cget("selectborderwidth"))
+        # The list's own border and focus highlight take up some of its height.
+        listHeight = e.height - 2 * (int(self.quizListBoxNames.cget("borderwidth")) + int(self.quizListBoxNames.cget("highlightthickness")))
+        rowCount = max(1, listHeight // rowHeight)
+        if(rowCount != self.visibleRowCount):
+            self.visibleRowCount = rowCount
+            # Scrolling to the current start keeps it within the results, and setting the start to -1 first makes sure the list is redrawn with the new number of rows.
+            start = self.listStart
+            self.listStart = -1
+            self.scrollQuizList(start)
+    
+    def moveSelection(self, change: int) -> str:
+        """This moves the selected quiz up or down the results by the given number of rows, scrolling the list if it goes off the top or bottom."""
+        if(not self.quizIDs):
+            return "break"
+        if(self.currentlySelectedQuiz == None):
+            # If nothing is selected, start from the top row shown.
+            selected = self.listStart
+        else:
+            selected = max(0, min(self.currentlySelectedQuiz + change, len(self.quizIDs) - 1))
+        self.currentlySelectedQuiz = selected
+        if(selected < self.listStart):
+            # Scroll up so the selected quiz is the top row.
+            self.scrollQuizList(selected)
+        elif(selected >= self.listStart + self.visibleRowCount):
+            # Scroll down so the selected quiz is the bottom row.
+            self.scrollQuizList(selected - self.visibleRowCount + 1)
+        # Highlight the selected row, and show its details in the side panel.
+        self.quizListBoxNames.selection_clear(0, tk.END)
+        self.quizListBoxNames.selection_set(selected - self.listStart)
+        self.selectQuiz()
+        return "break"
     
     def loadSidePanel(self) -> None:
         """
@@ -692,37 +881,45 @@ class MainMenu(object):
         elif(self.quizListBoxBestAttempt.curselection()):
             # If an element has been selected in the quiz best attempts list.
             n = self.quizListBoxBestAttempt.curselection()[0]
-        # Converting the index to an integer, to prevent errors that could occur if it isn't already an integer.
-        self.currentlySelectedQuiz = int(n)
+        # The lists only hold the rows shown, so the row number is converted to the quiz's position in all of the results.
+        n = self.listStart + int(n)
+        if(n < self.listStart or n >= len(self.quizIDs)):
+            # If nothing is selected, or the row is no longer in the results, leave the side panel as it is.
+            return
+        self.currentlySelectedQuiz = n
+        # Get the details of the currently selected quiz from the catalog.
+        quiz = self.catalog.getQuiz(self.quizIDs[self.currentlySelectedQuiz])
+        if(quiz == None):
+            # The quiz has been deleted since it was listed.
+            return
         # This changes all the text labels on the right to the details of the currently selected quiz.
-        self.quizListSideName.config(text = self.quizNames[self.currentlySelectedQuiz]) # Showing the quiz title
-        if(self.quizSubjects[self.currentlySelectedQuiz]):
+        self.quizListSideName.config(text = quiz[1]) # Showing the quiz title
+        if(quiz[2] in self.subjectDictionary):
             # If the quiz has a subject, display it in the side panel.
-            self.quizListSideSubject.config(text = self.subjectDictionary[self.quizSubjects[self.currentlySelectedQuiz]])
+            self.quizListSideSubject.config(text = self.subjectDictionary[quiz[2]])
         else:
             # If the quiz has no subject set, clear the last quiz's subject text from the side panel.
             self.quizListSideSubject.config(text = "")
-        if(self.quizExamboards[self.currentlySelectedQuiz]):
+        if(quiz[3] in self.examboardDictionary):
             # If the quiz has an exam board, display it in the side panel.
-            self.quizListSideExamboard.config(text = self.examboardDictionary[self.quizExamboards[self.currentlySelectedQuiz]])
+            self.quizListSideExamboard.config(text = self.examboardDictionary[quiz[3]])
         else:
             # If the quiz has no exam board set, clear the last quiz's exam board text from the side panel.
             self.quizListSideExamboard.config(text = "")
         # Get the number of questions for the currently selected quiz.
-        numberOfQuestions = self.quizQuestionNumbers[self.currentlySelectedQuiz]
+        numberOfQuestions = quiz[4]
         # Show the number of questions and the diffiuclty on two lines within the same label.
         self.quizListSideTotalQuestions.config(text = str(numberOfQuestions) + " question"
-                                    + ("s" if numberOfQuestions != 1 else "") + " in this quiz.\nDifficulty: " + str(self.quizDifficulties[self.currentlySelectedQuiz]))
-        # Find the best attempt for that quiz.
-        bestAttempt = self.database.execute("SELECT * FROM `Results` WHERE `UserID`=? AND `QuizID`=? ORDER BY `Score` DESC, `TotalDuration` ASC;",
-                                    float(self.currentUser.id), float(self.quizIDs[self.currentlySelectedQuiz]))
-        if(bestAttempt and len(bestAttempt)):
+                                    + ("s" if numberOfQuestions != 1 else "") + " in this quiz.\nDifficulty: " + str(quiz[6]))
+        # Find the best attempt for that quiz, which has already been loaded by the catalog.
+        bestAttempt = self.catalog.getBestAttempt(self.quizIDs[self.currentlySelectedQuiz])
+        if(bestAttempt):
             # If a best attempt has been set,
-            timeInSeconds = bestAttempt[0][6]
+            timeInSeconds = bestAttempt[6]
             # Format the time it took to complete it.
             timeTakenString = (str(round(timeInSeconds // 60)) + "m " if timeInSeconds >= 60 else "") + (str(round((maths.ceil(timeInSeconds * 10) / 10) % 60, 1)) + "s" if round((maths.ceil(timeInSeconds * 10) / 10) % 60, 1) else "")
             # Show the best attempt's score and time taken.
-            self.quizListSideBestAttempt.config(text = "Best score: " + str(round(bestAttempt[0][3] * 100, 1)) + "%\nTime taken: " + timeTakenString)
+            self.quizListSideBestAttempt.config(text = "Best score: " + str(round(bestAttempt[3] * 100, 1)) + "%\nTime taken: " + timeTakenString)
         else:
             # If no best attempt has been set, tell the user.
             self.quizListSideBestAttempt.config(text = "Not attempted yet.")
@@ -736,57 +933,45 @@ class MainMenu(object):
         """
         This method is for adjusting the list, which gets called by the scrollbar every time the scrollbar is moved.
         This method is called by tkinter (the GUI module), so I can't control what arguments are entered.
+        Dragging the scrollbar gives ("moveto", fraction), and clicking the arrows or the trough gives ("scroll", amount, "units" or "pages").
         """
-        # Set all the lists' scroll positions.
-        self.quizListBoxNames.yview(*args)
-        self.quizListBoxSubject.yview(*args)
-        self.quizListBoxExamBoard.yview(*args)
-        self.quizListBoxBestAttempt.yview(*args)
-    
-    def scrollOnList(self, *args) -> None:
-        """
-        This method is called each time the user scrolls (often with the mouse's scroll wheel) with a list in-focus,
-        and adjusts the other lists and the scrollbar based on how much is scrolled.
-        This method is called by tkinter (the GUI module), so I can't control what arguments are entered.
-        """
-        # Set the scroll bar position.
-        self.quizListBoxScrollBar.set(args[0], args[1])
-        # Set all the visual lists' scroll positions.
-        self.quizListBoxNames.yview("moveto", args[0])
-        self.quizListBoxSubject.yview("moveto", args[0])
-        self.quizListBoxExamBoard.yview("moveto", args[0])
-        self.quizListBoxBestAttempt.yview("moveto", args[0])
+        if(args[0] == "moveto"):
+            # Show the rows at that fraction of the way down the results.
+            self.scrollQuizList(float(args[1]) * len(self.quizIDs))
+        elif(args[0] == "scroll"):
+            # A unit is one row, and a page is the number of rows that fit in the list.
+            self.scrollQuizList(self.listStart + int(args[1]) * (self.visibleRowCount if args[2] == "pages" else 1))
     
     def launchQuiz(self) -> None:
         """This launches the quiz window for the currently selected quiz."""
-        # Import the quiz and quizGui files from within the application's base directory.
-        import quiz, quizGui
+        # Import the quizGui file from within the application's base directory.
+        import quizGui
         # The following if statements check each list to see if an entry from any of the lists has been selected, and sets the number n to the selected row number.
         if(self.currentlySelectedQuiz == None):
             # An error message is shown if there are no rows selected, and this method returns so it doesn't try to load a quiz with id of negative one.
             tkmb.showerror("Launch quiz error", "No quiz selected to launch, please select a quiz by clicking on one from the list.")
             return
         
-        print("Loading: " + self.quizNames[self.currentlySelectedQuiz]) # A debugging line, to check if the correct quiz is being loaded.
-        # This loads the quiz from the database, the method .getQuiz() returns a Quiz object.
-        quizObj = quiz.Quiz.getQuiz(self.quizIDs[self.currentlySelectedQuiz], self.database)
+        print("Loading: " + self.catalog.getQuizName(self.quizIDs[self.currentlySelectedQuiz])) # A debugging line, to check if the correct quiz is being loaded.
+        # This loads the quiz from the quiz cache (or the database if it isn't cached), the method .getQuiz() returns a Quiz object.
+        quizObj = self.quizCache.getQuiz(self.quizIDs[self.currentlySelectedQuiz])
         # This then launches the window, passing the loaded quiz as an argument.
         quizGui.ActiveQuizDialog(self.tk, self, quizObj, self.currentUser)
     
     def editQuiz(self) -> None:
         """This launches the quiz window for the currently selected quiz."""
-        # Import the quiz and quizCreator files from within the application's base directory.
-        import quiz, quizCreator
+        # Import the quizCreator file from within the application's base directory.
+        import quizCreator
         if(self.currentlySelectedQuiz == None):
             # An error message is shown if there are no rows selected, and this method returns so it doesn't try to load a quiz with id of negative one.
             # However, the button should be disabled if there is no quiz selected, so this is just a fallback.
             tkmb.showerror("Edit quiz error", "No quiz selected to launch, please select a quiz by clicking on one from the list.")
             return
         
-        print("Editing quiz: " + self.quizNames[self.currentlySelectedQuiz]) # A debugging line, to check if the correct quiz is being loaded.
-        # This loads the quiz from the database, the method .getQuiz() returns a Quiz object.
+        print("Editing quiz: " + self.catalog.getQuizName(self.quizIDs[self.currentlySelectedQuiz])) # A debugging line, to check if the correct quiz is being loaded.
+        # This loads the quiz from the quiz cache (or the database if it isn't cached), the method .getQuiz() returns a Quiz object.
         try:
-            quiz = quiz.Quiz.getQuiz(self.quizIDs[self.currentlySelectedQuiz], self.database)
+            quiz = self.quizCache.getQuiz(self.quizIDs[self.currentlySelectedQuiz])
             # This then launches the window, passing the loaded quiz as an argument.
             quizCreator.QuizEditorDialog(self.tk, self, quiz)
         except IndexError:
@@ -818,19 +1003,16 @@ class MainMenu(object):
     
     def exportQuizButtonCommand(self):
         """This function is tied to the export quiz button."""
-        # Import the quiz file from within the application's base directory.
-        import quiz
         if(self.currentlySelectedQuiz == None):
             # An error message is shown if there are no rows selected, and this method returns so it doesn't try to export a quiz with id of negative one.
             # However, the button should be disabled if there is no quiz selected, so this is just a fallback.
             tkmb.showerror("Export quiz error", "No quiz selected to export, please select a quiz by clicking on one from the list.")
             return
         
-        print("Exporting quiz: " + self.quizNames[self.currentlySelectedQuiz]) # A debugging line, to check if the correct quiz is being exported.
-        # This loads the quiz from the database, the method .getQuiz() returns a Quiz object.
+        print("Exporting quiz: " + self.catalog.getQuizName(self.quizIDs[self.currentlySelectedQuiz])) # A debugging line, to check if the correct quiz is being exported.
+        # This loads the quiz from the quiz cache (or the database if it isn't cached), the method .getQuiz() returns a Quiz object.
         try:
-            quiz = quiz.Quiz.getQuiz(self.quizIDs[self.currentlySelectedQuiz], self.database)
-            # This then launches the window, passing the loaded quiz as an argument.
+            quiz = self.quizCache.getQuiz(self.quizIDs[self.currentlySelectedQuiz])
             # This launches your OS's file explorer, and lets you select a file that ends with ".xml".
             filename = tkfile.asksaveasfilename(filetypes = ["\"Quiz File\" .xml"], parent = self.tk, title = "Export Quiz")
             print(filename) # Line useful for debugging
@@ -843,22 +1025,51 @@ class MainMenu(object):
             # If the quiz isn't found in the database.
             tkmb.showerror("Error", "The selected quiz wasn't found in the database.", parent = self.tk)
     
+    def exportQuizBundleButtonCommand(self, shownOnly: bool) -> None:
+        """This function is tied to the export quizzes options on the top menu. It exports every quiz, or only the ones shown on the quiz browser if shownOnly is True, into one file."""
+        # Import the quiz file from within the application's base directory.
+        import quiz
+        if(shownOnly):
+            if(self.state != MainWindowStates.quizBrowser):
+                tkmb.showerror("Export quizzes error", "No quizzes are shown, please log in to see the quiz browser.", parent = self.tk)
+                return
+            # The quizzes in the quiz browser list, which are the ones that match the search and filters.
+            ids = list(self.quizIDs)
+        else:
+            ids = [i[0] for i in self.database.execute("SELECT `QuizID` FROM `Quizzes` ORDER BY `QuizID`;")]
+        if(not ids):
+            tkmb.showerror("Export quizzes error", "There are no quizzes to export.", parent = self.tk)
+            return
+        # This launches your OS's file explorer, and lets you select a file that ends with ".xml".
+        filename = tkfile.asksaveasfilename(filetypes = ["\"Quiz File\" .xml"], parent = self.tk, title = "Export Quizzes")
+        if(filename == None or filename == ""):
+            # If the user didn't choose a file, usually by closing the window, we take no further action.
+            return
+        exported = quiz.Quiz.exportQuizzes(self, ids, filename)
+        tkmb.showinfo("Export Quizzes", str(exported) + " quizzes successfully exported to XML, saved to: " + filename, parent = self.tk)
+    
     def deleteQuizButtonCommand(self):
         """This function is tied to the delete quiz button."""
         # Get the name and ID of the quiz being deleted.
-        quizName = self.quizNames[self.currentlySelectedQuiz]
+        quizName = self.catalog.getQuizName(self.quizIDs[self.currentlySelectedQuiz])
         quizID = self.quizIDs[self.currentlySelectedQuiz]
         # Ask user if they are sure, return if they say no.
         if(not tkmb.askyesno("Delete Quiz", "Are you sure you want to delete the quiz \"" + quizName + "\"? Quiz is deleted for all users and all past results will be deleted too.", parent = self.tk)):
             return
-        # Delete the quiz's questions.
-        self.database.execute("DELETE FROM `Questions` WHERE `QuizID` = ?;", float(quizID))
-        # Remove the quiz's results.
-        self.database.execute("DELETE FROM `Results` WHERE `QuizID` = ?;", float(quizID))
-        # Then delete the quiz from the database.
-        self.database.execute("DELETE FROM `Quizzes` WHERE `QuizID` = ?;", float(quizID))
-        # Refresh the quiz browser list.
-        self.refreshList()
+        with self.database.transaction():
+            # The statistics totals include the quiz's results, so they are taken off the totals of the users that have done it.
+            # This is done first, as the results are read to find what to take off.
+            self.rollups.removeQuiz(quizID)
+            # Delete the quiz's questions.
+            self.database.execute("DELETE FROM `Questions` WHERE `QuizID` = ?;", float(quizID))
+            # Remove the quiz's results.
+            self.database.execute("DELETE FROM `Results` WHERE `QuizID` = ?;", float(quizID))
+            # Then delete the quiz from the database.
+            self.database.execute("DELETE FROM `Quizzes` WHERE `QuizID` = ?;", float(quizID))
+            # Remove the quiz's signature from the duplicate index.
+            self.duplicates.removeQuiz(quizID)
+        # Remove the quiz from the catalog, the quiz cache, and the quiz browser list.
+        self.quizRemoved(quizID)
     
     def userSettings(self) -> None:
         """This launches the user settings window, if there is a user logged in."""
@@ -895,11 +1106,28 @@ class MainMenu(object):
             # If the user isn't logged in, display an error.
             tkmb.showerror("User error", "No user currently selected, can't show user statistics.")
     
+    def showDatabaseReport(self) -> None:
+        """Opens a window showing the database statement timing report, and also prints it to the console."""
+        report = self.database.getReport() + "\n\n" + self.quizCache.getReport()
+        print(report)
+        window = tk.Toplevel(self.tk)
+        window.title("Database Report - " + MainMenu.appName)
+        # The report is shown in a read-only text box, in a fixed-width font so the columns line up.
+        scrollbar = tk.Scrollbar(window)
+        scrollbar.pack(side = tk.RIGHT, fill = tk.Y)
+        text = tk.Text(window, width = 140, height = 40, wrap = tk.NONE, font = ("Courier", 9), yscrollcommand = scrollbar.set)
+        text.insert(tk.END, report)
+        text.config(state = tk.DISABLED)
+        text.pack(side = tk.LEFT, fill = tk.BOTH, expand = True)
+        scrollbar.config(command = text.yview)
+    
     def endApplication(self) -> None:
         """Called when the application is ending."""
         print("Application closing...")
         # Change the state.
         self.state = MainWindowStates.closing
+        # Stop the search worker thread.
+        self.searchWorker.stop()
         # Destroy the root window.
         self.tk.destroy()
 
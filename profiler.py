@@ -0,0 +1,128 @@
+"""
+This file contains the StatementProfiler, which times every SQL statement run by the DatabaseManager.
+Statements are grouped by their normalised SQL text (with any literal values replaced by question marks),
+and for each group the profiler records how many times it was run, how long it took, and how many rows it returned or changed.
+Statements slower than the slow query threshold are also kept in a log, along with their parameters.
+"""
+
+# Regular expressions are used to normalise the SQL text.
+import re
+# Collections is used for the bounded lists of timings and slow queries.
+import collections
+# Time is used to timestamp slow queries.
+import time
+
+def getPercentile(values: list, percentile: float) -> float:
+    """Returns the given percentile (between 0 and 100) of a list of numbers, using the nearest-rank method. Returns 0 if the list is empty."""
+    if(not values):
+        return 0.0
+    ordered = sorted(values)
+    # The nearest rank is rounded up, and the list is indexed from 0.
+    index = max(0, -(-len(ordered) * percentile // 100) - 1)
+    return ordered[int(index)]
+
+class StatementStatistics(object):
+    """The timings of every run of one normalised SQL statement."""
+    # Only the most recent timings are kept for the percentiles, so a long session doesn't use more and more memory.
+    maximumSamples = 2000
+
+    def __init__(self, statement: str) -> None:
+        self.statement = statement
+        self.count = 0
+        self.totalTime = 0.0
+        self.maximumTime = 0.0
+        self.rows = 0
+        self.samples = collections.deque(maxlen = StatementStatistics.maximumSamples)
+
+    def record(self, duration: float, rows: int) -> None:
+        """Adds one run of the statement, which took duration seconds and returned or changed the given number of rows."""
+        self.count += 1
+        self.totalTime += duration
+        self.maximumTime = max(self.maximumTime, duration)
+        self.rows += rows
+        self.samples.append(duration)
+
+    def getPercentile(self, percentile: float) -> float:
+        """Returns the given percentile (between 0 and 100) of the recent timings in seconds."""
+        return getPercentile(self.samples, percentile)
+
+class StatementProfiler(object):
+    # Statements that take longer than this many seconds are added to the slow query log.
+    slowThreshold = 0.05
+    # The number of slow queries kept in the log.
+    slowLogLength = 200
+    # These find the literal values in SQL text: quoted strings, numbers, and lists of question marks.
+    stringRegex = re.compile(r"'(?:[^']|'')*'")
+    numberRegex = re.compile(r"(?<![\w`])-?\d+(?:\.\d+)?(?![\w`])")
+    listRegex = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+    whitespaceRegex = re.compile(r"\s+")
+
+    def __init__(self) -> None:
+        # The normalised SQL text maps to the StatementStatistics for that statement.
+        self.statements = {}
+        # The most recent slow queries, as (time, duration, SQL text, parameters) tuples, and how many there have been in total.
+        # They are only kept here for the report, rather than printed, so a slow query doesn't also wait for the console.
+        self.slowQueries = collections.deque(maxlen = StatementProfiler.slowLogLength)
+        self.slowQueryCount = 0
+        # The normalised text of each SQL statement that has been seen, as most statements are run many times.
+        self.normalised = {}
+        # Whether statements are being timed.
+        self.enabled = True
+
+    def normalise(self, statement: str) -> str:
+        """Returns the SQL statement with its whitespace tidied and any literal values replaced by question marks, so similar statements are grouped together."""
+        if(statement not in self.normalised):
+            text = StatementProfiler.whitespaceRegex.sub(" ", statement.strip())
+            text = StatementProfiler.stringRegex.sub("?", text)
+            text = StatementProfiler.numberRegex.sub("?", text)
+            # A list of values, such as in "IN (?,?,?)", is shown as "(...)" so that lists of any length are grouped together.
+            text = StatementProfiler.listRegex.sub("(...)", text)
+            self.normalised[statement] = text
+        return self.normalised[statement]
+
+    def record(self, statement: str, parameters: tuple, duration: float, result: object) -> None:
+        """Records one run of a statement, which took duration seconds. result is what the storage engine returned."""
+        if(not self.enabled):
+            return
+        if(isinstance(result, list)):
+            # A list of rows from a SELECT statement, or of IDs from executeMany.
+            rows = len(result)
+        elif(isinstance(result, int)):
+            # The number of rows changed.
+            rows = max(result, 0)
+        else:
+            # A pyodbc cursor, which holds the number of rows changed.
+            rows = max(getattr(result, "rowcount", 0) or 0, 0)
+        text = self.normalise(statement)
+        if(text not in self.statements):
+            self.statements[text] = StatementStatistics(text)
+        self.statements[text].record(duration, rows)
+        if(duration >= StatementProfiler.slowThreshold):
+            self.slowQueries.append((time.time(), duration, statement, parameters))
+            self.slowQueryCount += 1
+
+    def reset(self) -> None:
+        """Clears all the recorded timings and the slow query log."""
+        self.statements = {}
+        self.slowQueries.clear()
+        self.slowQueryCount = 0
+
+    def getReport(self, limit: int = 30) -> str:
+        """
+        Returns the report as text: the statements that took the most time in total (up to limit of them), followed by the slow query log.
+        All times are shown in milliseconds.
+        """
+        lines = ["Database statement report", ""]
+        lines.append("{:>7} {:>10} {:>8} {:>8} {:>8} {:>8} {:>8}  {}".format("Calls", "Total", "Mean", "p50", "p95", "p99", "Rows", "Statement"))
+        ordered = sorted(self.statements.values(), key = lambda i: i.totalTime, reverse = True)
+        for i in ordered[:limit]:
+            lines.append("{:>7} {:>10.1f} {:>8.2f} {:>8.2f} {:>8.2f} {:>8.2f} {:>8}  {}".format(i.count, i.totalTime * 1000, i.totalTime * 1000 / i.count,
+                    i.getPercentile(50) * 1000, i.getPercentile(95) * 1000, i.getPercentile(99) * 1000, i.rows, i.statement))
+        if(len(ordered) > limit):
+            lines.append("... and " + str(len(ordered) - limit) + " more statements.")
+        lines.append("")
+        lines.append("Slow queries (over {:.0f} ms): {}".format(StatementProfiler.slowThreshold * 1000, self.slowQueryCount)
+                + (", the last {} are shown".format(len(self.slowQueries)) if self.slowQueryCount > len(self.slowQueries) else ""))
+        for i in self.slowQueries:
+            lines.append("{} {:>8.1f}  {} | {}".format(time.strftime("%H:%M:%S", time.localtime(i[0])), i[1] * 1000, i[2], " | ".join([str(j) for j in i[3]])))
+        return "\n".join(lines)
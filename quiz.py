@@ -3,18 +3,43 @@ This file contains both the Question and Quiz classes.
 The Question class holds the data on a question that has been taken from the database or imported,
 and the Quiz class holds the Question objects and handles saving and loading to and from the database,
 as well as importing and exporting quizzes into a non-database format.
+A Quiz loaded from the database only loads its questions when they are first used, and they can also be streamed a few at a time.
+Each question has a content hash of its normalised text, which is stored with it, and a quiz's hash is worked out from its title, difficulty and its questions' hashes.
 """
 
 # This is used to parse the XML quiz files.
 import xml.etree.ElementTree as et
-# Regular expressions are used for validating quizzes being imported.
+# Hashlib is used to make the content hashes of the questions and quizzes.
+import hashlib
+# Regular expressions are used to normalise the text that is hashed.
 import re
 # For showing import/export messages
 import tkinter.messagebox as tkmb
 
+def getIndentedXML(element: et.Element, level: int) -> str:
+    """Returns an XML element as text, with newlines and indentation (at the given number of levels) added so it is easily readable by people."""
+    def indent(element, level):
+        # Each child is put on its own line, one level further in than its parent, and the parent's closing tag goes back to the parent's level.
+        if(len(element)):
+            element.text = "\n" + Quiz.xmlIndent * (level + 1)
+            for i in element:
+                indent(i, level + 1)
+                i.tail = "\n" + Quiz.xmlIndent * (level + 1)
+            element[-1].tail = "\n" + Quiz.xmlIndent * level
+    indent(element, level)
+    return Quiz.xmlIndent * level + et.tostring(element, encoding = "unicode") + "\n"
+
 class Question(object):
-    def __init__(self, quizID: int, question: str, correctAnswer: str, otherAnswers: list, id: int, hint: str, help: str) -> None:
-        """This is the Question constructor, and it expects all arguments listed above."""
+    # The attributes of each question are fixed, so they are stored in slots rather than a dictionary for each object, which uses less memory for big quizzes.
+    __slots__ = ("quizID", "question", "correctAnswer", "otherAnswers", "id", "hint", "help", "hash")
+    # This finds runs of whitespace, which are treated as a single space in the content hash.
+    whitespaceRegex = re.compile(r"\s+")
+    # The characters put between the fields, and between the wrong answers, in the text that is hashed. They can't be typed into a question.
+    fieldSeparator = "\x1f"
+    answerSeparator = "\x1e"
+
+    def __init__(self, quizID: int, question: str, correctAnswer: str, otherAnswers: list, id: int, hint: str, help: str, hash: str = None) -> None:
+        """This is the Question constructor, and it expects all arguments listed above. hash is the question's stored content hash, if it has been loaded from the database."""
         self.quizID = quizID
         self.question = question
         self.correctAnswer = correctAnswer
@@ -22,6 +47,23 @@ class Question(object):
         self.id = id
         self.hint = hint
         self.help = help
+        self.hash = hash
+    
+    def normaliseText(text: str) -> str: # This is not called on an object, but the class itself.
+        """Returns the text as it is hashed, with whitespace at the ends removed and any other runs of whitespace turned into single spaces."""
+        return Question.whitespaceRegex.sub(" ", text).strip() if text else ""
+    
+    def getHash(self) -> str:
+        """
+        Returns the question's content hash, the md5 hash of its normalised question, answers, hint and help.
+        The wrong answers are sorted first, as they are shuffled when the question is shown, so their order doesn't change the hash.
+        The hash is worked out once, so after the question is changed self.hash should be set to None.
+        """
+        if(self.hash == None):
+            answers = Question.answerSeparator.join(sorted([Question.normaliseText(i) for i in self.otherAnswers]))
+            fields = [Question.normaliseText(self.question), Question.normaliseText(self.correctAnswer), answers, Question.normaliseText(self.hint), Question.normaliseText(self.help)]
+            self.hash = hashlib.md5(Question.fieldSeparator.join(fields).encode("utf-8")).hexdigest()
+        return self.hash
     
     def validate(self):
         """
@@ -104,20 +146,74 @@ class Question(object):
             raise ValueError("Question: " + check)
         if(len(self.otherAnswers) == 3):
             # If there are 4 answers
-            database.execute("INSERT INTO Questions (QuizID, Question, CorrectAnswer, Answer2, Answer3, Answer4, Hint, Help) VALUES (?,?,?,?,?,?,?,?)",
-                float(self.quizID), self.question, self.correctAnswer, self.otherAnswers[0], self.otherAnswers[1], self.otherAnswers[2], self.hint, self.help)
+            database.execute("INSERT INTO Questions (QuizID, Question, CorrectAnswer, Answer2, Answer3, Answer4, Hint, Help, Hash) VALUES (?,?,?,?,?,?,?,?,?)",
+                float(self.quizID), self.question, self.correctAnswer, self.otherAnswers[0], self.otherAnswers[1], self.otherAnswers[2], self.hint, self.help, self.getHash())
         elif(len(self.otherAnswers) == 2):
             # If there are 3 answers
-            database.execute("INSERT INTO Questions (QuizID, Question, CorrectAnswer, Answer2, Answer3, Hint, Help) VALUES (?,?,?,?,?,?,?)",
-                float(self.quizID), self.question, self.correctAnswer, self.otherAnswers[0], self.otherAnswers[1], self.hint, self.help)
+            database.execute("INSERT INTO Questions (QuizID, Question, CorrectAnswer, Answer2, Answer3, Hint, Help, Hash) VALUES (?,?,?,?,?,?,?,?)",
+                float(self.quizID), self.question, self.correctAnswer, self.otherAnswers[0], self.otherAnswers[1], self.hint, self.help, self.getHash())
         else:
             # If there are only 2 answers
-            database.execute("INSERT INTO Questions (QuizID, Question, CorrectAnswer, Answer2, Hint, Help) VALUES (?,?,?,?,?,?)",
-                float(self.quizID), self.question, self.correctAnswer, self.otherAnswers[0], self.hint, self.help)
+            database.execute("INSERT INTO Questions (QuizID, Question, CorrectAnswer, Answer2, Hint, Help, Hash) VALUES (?,?,?,?,?,?,?)",
+                float(self.quizID), self.question, self.correctAnswer, self.otherAnswers[0], self.hint, self.help, self.getHash())
         # Gets the last changed record from the database and gets its ID.
         lastRecord = database.execute("SELECT @@IDENTITY;")
         self.id = lastRecord[0][0]
     
+    def addManyToDatabase(questions: list, database) -> None: # This is not called on an object, but the class itself.
+        """
+        This adds a list of questions to the database in a single transaction, using one batched INSERT statement, and sets each question's ID.
+        All the questions are validated first, so if any of them are invalid, none of them are saved.
+        """
+        for i in questions:
+            check = i.validate()
+            if(check):
+                # If the validation of a question fails, don't save any of them to the database, instead raise an error.
+                raise ValueError("Question: " + check)
+        # Every question is inserted with all three wrong answer columns, and any missing wrong answers are left null.
+        rows = [[float(i.quizID), i.question, i.correctAnswer] + (i.otherAnswers + [None, None])[:3] + [i.hint, i.help, i.getHash()] for i in questions]
+        ids = database.executeMany("INSERT INTO Questions (QuizID, Question, CorrectAnswer, Answer2, Answer3, Answer4, Hint, Help, Hash) VALUES (?,?,?,?,?,?,?,?,?)", rows)
+        for i in range(len(questions)):
+            questions[i].id = ids[i]
+    
+    def updateInDatabase(self, database) -> None:
+        """This saves the question's changed fields and its content hash to its existing record in the database, keeping its QuestionID."""
+        check = self.validate()
+        if(check):
+            # If the validation of the question fails, don't save to the database, instead raise an error.
+            raise ValueError("Question: " + check)
+        # The fields have changed, so the hash has to be worked out again.
+        self.hash = None
+        database.execute("UPDATE Questions SET Question = ?, CorrectAnswer = ?, Answer2 = ?, Answer3 = ?, Answer4 = ?, Hint = ?, Help = ?, Hash = ? WHERE QuestionID = ?;",
+            *([self.question, self.correctAnswer] + (self.otherAnswers + [None, None])[:3] + [self.hint, self.help, self.getHash(), float(self.id)]))
+    
+    def deleteManyFromDatabase(questionIDs: list, database) -> None: # This is not called on an object, but the class itself.
+        """This deletes the questions with the given IDs from the database, a few hundred at a time so the statements don't get too long."""
+        questionIDs = list(questionIDs)
+        for i in range(0, len(questionIDs), 500):
+            part = questionIDs[i:i + 500]
+            database.execute("DELETE FROM Questions WHERE QuestionID IN (" + ",".join(["?"] * len(part)) + ");", *[float(j) for j in part])
+    
+    def hasSameFields(self, other: 'Question') -> bool:
+        """Returns whether the other question has exactly the same text in all of its fields, with an empty hint or help the same as a missing one."""
+        return (self.question == other.question and self.correctAnswer == other.correctAnswer and self.otherAnswers == other.otherAnswers and
+                (self.hint or "") == (other.hint or "") and (self.help or "") == (other.help or ""))
+    
+    def getXMLElement(self) -> et.Element:
+        """Returns the question as a "question" XML element, as it is written in exported quiz files."""
+        question = et.Element("question")
+        # Add the question text as a child of the question element.
+        et.SubElement(question, "qtext").text = self.question
+        # As well as the correct answer.
+        et.SubElement(question, "correctanswer").text = self.correctAnswer
+        for i in self.otherAnswers:
+            # And then add the wrong answers.
+            et.SubElement(question, "wronganswer").text = i
+        # Then add the hint and help tags as children to the question.
+        et.SubElement(question, "hint").text = self.hint
+        et.SubElement(question, "help").text = self.help
+        return question
+    
     def getQuestionFromDatabaseRecord(record: tuple) -> 'Question': # This is not called on an object, but the class itself.
         """This will take a record from the database as a tuple and return a Question object from the data it is given."""
         # The following lines get each of the required data fields to make a Question object.
@@ -129,13 +225,44 @@ class Question(object):
         otherAnswers = [i for i in record[4:7] if i]
         hint = record[7]
         help = record[8]
-        return Question(quizID, question, correctAnswer, otherAnswers, questionID, hint, help) # This generates the Question object and returns it.
+        # The stored content hash, which is in the last column.
+        hash = record[9] if len(record) > 9 else None
+        return Question(quizID, question, correctAnswer, otherAnswers, questionID, hint, help, hash) # This generates the Question object and returns it.
+
+class QuizHash(object):
+    """
+    This works out a quiz's content hash a question at a time, so a quiz's questions don't all have to be in memory at once.
+    The hash is the md5 hash of the quiz's normalised title and its difficulty, followed by the content hash of each of its questions in order.
+    The subject and exam board aren't included, so the same quiz is found as a duplicate whichever subject and exam board it is filed under.
+    """
+    def __init__(self, title: str, difficulty: int) -> None:
+        self.md5 = hashlib.md5()
+        # The title isn't case sensitive, and the difficulty is hashed as a whole number so "3" and "3.0" give the same hash.
+        self.md5.update((Question.normaliseText(title).lower() + Question.fieldSeparator + (str(int(float(difficulty))) if difficulty != None else "")).encode("utf-8"))
+    
+    def addQuestion(self, question: Question) -> None:
+        """Adds the next question of the quiz to the hash."""
+        self.md5.update((Question.fieldSeparator + question.getHash()).encode("ascii"))
+    
+    def hexdigest(self) -> str:
+        """Returns the hexadecimal format of the hash, once all the questions have been added."""
+        return self.md5.hexdigest()
 
 class Quiz(object):
-    def __init__(self, databaseManager, id: int, name: str, tags: list, subject: int, examBoard: int, difficulty: int, questions: list = []) -> None:
+    # As with questions, the attributes are stored in slots rather than a dictionary for each object.
+    __slots__ = ("dbm", "id", "name", "tags", "subject", "difficulty", "examBoard", "loadedQuestions", "amountOfQuestions")
+    # The number of questions fetched from the database at a time when the questions are streamed.
+    questionPageSize = 20
+    # The text at the start of exported quiz files, and the indentation used for each level of elements in them.
+    xmlDeclaration = "<?xml version=\"1.0\" encoding=\"utf-8\"?>\n"
+    xmlIndent = "    "
+
+    def __init__(self, databaseManager, id: int, name: str, tags: list, subject: int, examBoard: int, difficulty: int, questions: list = None,
+                amountOfQuestions: int = None) -> None:
         """
-        Quiz object constructor, all parameters except the questions are required,
-        questions can be added later through the preferred addQuestion method.
+        Quiz object constructor, all parameters except the questions and the amount of questions are required.
+        If questions is None and the quiz is in the database, the questions are loaded from the database the first time they are used.
+        amountOfQuestions is the number of questions the quiz record says it has, so the questions don't have to be loaded to count them.
         """
         self.dbm = databaseManager
         self.id = id
@@ -144,283 +271,229 @@ class Quiz(object):
         self.subject = subject
         self.difficulty = difficulty
         self.examBoard = examBoard
-        self.questions = questions
+        # The list of Question objects, which is None until the questions have been loaded.
+        self.loadedQuestions = questions
+        self.amountOfQuestions = amountOfQuestions if amountOfQuestions != None or questions == None else len(questions)
     
-    def exportQuiz(self, parent, filename: str) -> None:
-        """This will export the quiz into an XML file."""
-        # Create the quiz root element.
-        root = et.Element("quiz")
-        # Place the meta tags in it.
-        meta = et.SubElement(root, "meta")
+    @property
+    def questions(self) -> list:
+        """The list of Question objects, which are loaded from the database the first time this is used."""
+        if(self.loadedQuestions == None):
+            self.loadedQuestions = self.loadQuestions()
+        return self.loadedQuestions
+    
+    @questions.setter
+    def questions(self, questions: list) -> None:
+        self.loadedQuestions = questions
+        self.amountOfQuestions = len(questions)
+    
+    def hasLoadedQuestions(self) -> bool:
+        """Returns whether the questions are in memory, rather than needing loading from the database."""
+        return self.loadedQuestions != None
+    
+    def loadQuestions(self) -> list:
+        """Loads all the quiz's questions from the database, and returns them as a list of Question objects."""
+        if(self.dbm == None or self.id == None):
+            # A quiz that isn't in the database has no questions to load.
+            return []
+        questionRows = self.dbm.execute("SELECT * FROM `Questions` WHERE `QuizID` = ? ORDER BY `QuestionID`;", float(self.id))
+        questionList = [Question.getQuestionFromDatabaseRecord(i) for i in questionRows] # This turns all the question records to a list of question objects.
+        if(self.amountOfQuestions != None and len(questionList) != self.amountOfQuestions):
+            # If the amount of questions found isn't equal to the amount of questions that the quiz record thinks it has, raise an error.
+            raise Exception("The number of questions in the quiz found doesn't match the expected amount of questions for that quiz.")
+        return questionList
+    
+    def getQuestionCount(self) -> int:
+        """Returns the number of questions in the quiz, without loading them if the quiz record has the number."""
+        if(self.loadedQuestions != None or self.amountOfQuestions == None):
+            return len(self.questions)
+        return self.amountOfQuestions
+    
+    def iterQuestions(self):
+        """
+        Goes through the questions one by one, e.g. "for question in quiz.iterQuestions():".
+        If the questions haven't been loaded, they are fetched from the database a page at a time, and aren't kept, so only a few are in memory at once.
+        """
+        if(self.loadedQuestions != None or self.dbm == None or self.id == None):
+            yield from self.questions
+            return
+        lastQuestionID = -1
+        while True:
+            questionRows = self.dbm.execute("SELECT TOP " + str(Quiz.questionPageSize) + " * FROM `Questions` WHERE `QuizID` = ? AND `QuestionID` > ? ORDER BY `QuestionID`;",
+                    float(self.id), float(lastQuestionID))
+            for i in questionRows:
+                yield Question.getQuestionFromDatabaseRecord(i)
+            if(len(questionRows) < Quiz.questionPageSize):
+                # The last page has been reached.
+                return
+            lastQuestionID = questionRows[-1][0]
+    
+    def getMetaXMLElement(self, subjectDictionary: dict, examboardDictionary: dict) -> et.Element:
+        """Returns the quiz's details as a "meta" XML element, as it is written in exported quiz files. The dictionaries map the subject and exam board IDs to their names."""
+        meta = et.Element("meta")
         # Within the meta tags, put the title tag.
         et.SubElement(meta, "title").text = self.name
         if(self.subject and self.subject != -1):
             # If the quiz has a subject, put it in the subject tags as text.
-            et.SubElement(meta, "subjectName").text = parent.subjectDictionary[self.subject]
+            et.SubElement(meta, "subjectName").text = subjectDictionary[self.subject]
         if(self.examBoard and self.examBoard != -1):
             # If the quiz has an exam board, put it in the exam board tags as text.
-            et.SubElement(meta, "examBoardName").text = parent.examboardDictionary[self.examBoard]
+            et.SubElement(meta, "examBoardName").text = examboardDictionary[self.examBoard]
         # Put the difficulty tag in the meta tags.
         et.SubElement(meta, "difficulty").text = str(self.difficulty)
-        for i in self.questions:
-            # For each question,
-            # Make a question a child of the quiz element.
-            question = et.SubElement(root, "question")
-            # Then add the question text as a child of the new question element.
-            et.SubElement(question, "qtext").text = i.question
-            # As well as the correct answer.
-            et.SubElement(question, "correctanswer").text = i.correctAnswer
-            for j in i.otherAnswers:
-                # And then add the wrong answers.
-                et.SubElement(question, "wronganswer").text = j
-            # Then add the hint and help tags as children to the question.
-            et.SubElement(question, "hint").text = i.hint
-            et.SubElement(question, "help").text = i.help
-        
-        if(not filename):
-            # If the file name has not been set, return the XML as a string.
-            # This is used by the hash function.
-            return et.tostring(root)
-        
-        # Defining a function within a method.
-        def prettifyXML(element, indent = "    "):
-            """Adds indentation and newlines to the XML document so it becomes easily readable."""
-            queue = [(0, element)]
-            while queue:
-                # Going through each element in the tree,
-                level, element = queue.pop(0)
-                # Find the child elements of that element.
-                children = [(level + 1, child) for child in list(element)]
-                # Then add new lines and indentaion for each one.
-                if children:
-                    element.text = "\n" + indent * (level + 1)  # for child open
-                if queue:
-                    element.tail = "\n" + indent * queue[0][0]  # for sibling open
-                else:
-                    element.tail = "\n" + indent * (level - 1)  # for parent close
-                # Then add the child elements to be processed too.
-                queue[0:0] = children
-        # Run the XML prettifier on the XML tree.
-        prettifyXML(root)
-        # Open the file to write to.
-        file = open(filename, "w")
-        # Write the prettified XML to the file.
-        file.write(str(et.tostring(root))[2:-1].replace("\\n", "\n"))
-        # Save the file.
-        file.close()
+        return meta
+    
+    def exportQuiz(self, parent, filename: str) -> None:
+        """This will export the quiz into an XML file."""
+        # Open the file to write to, and write the quiz to it a question at a time.
+        with open(filename, "w", encoding = "utf-8") as file:
+            file.write(Quiz.xmlDeclaration)
+            self.writeXML(file, parent.subjectDictionary, parent.examboardDictionary)
         # Show a message to the user telling them it has been successfully exported.
         tkmb.showinfo("Export Quiz", "Quiz successfully exported to XML, saved to: " + filename)
     
-    def getHash(self, parent):
-        """This function gets the md5 hash of the XML export text of the quiz."""
-        import hashlib
-        # Create the md5 hasher.
-        md5 = hashlib.new("md5")
-        # Enter the XML.
-        md5.update(self.exportQuiz(parent, None))
-        # Return the hexadecimal format of the hash.
-        return md5.hexdigest()
+    def writeXML(self, file, subjectDictionary: dict, examboardDictionary: dict, level: int = 0) -> None:
+        """
+        Writes the quiz as indented XML to an open text file, indented by the given number of levels.
+        The meta element and each question are written as soon as they are made, and the questions are streamed from the database if they haven't been loaded,
+        so only one question is held in memory at a time.
+        """
+        file.write(Quiz.xmlIndent * level + "<quiz>\n")
+        file.write(getIndentedXML(self.getMetaXMLElement(subjectDictionary, examboardDictionary), level + 1))
+        for i in self.iterQuestions():
+            file.write(getIndentedXML(i.getXMLElement(), level + 1))
+        file.write(Quiz.xmlIndent * level + "</quiz>\n")
+    
+    def getHash(self) -> str:
+        """This function gets the content hash of the quiz (see QuizHash), going through the questions a few at a time and using their stored hashes."""
+        hasher = QuizHash(self.name, self.difficulty)
+        for i in self.iterQuestions():
+            hasher.addQuestion(i)
+        return hasher.hexdigest()
     
     # Methods below are not executed on an object, but the Quiz class itself.
     # i.e. to use these methods you wouldn't need a Quiz object ( q = Quiz(args here); q.getQuiz(other args here) - this is wrong )
     # but you still execute them on the Quiz class ( q = Quiz.getQuiz(args here) - getQuiz returns a Quiz object, correct way to use ).
     
     def getQuiz(id: int, database) -> 'Quiz': # This is not called on an object, but the class itself.
-        """This will load a quiz given a quiz ID, and return it as a Quiz object."""
+        """
+        This will load a quiz given a quiz ID, and return it as a Quiz object.
+        Only the quiz record is loaded, and the questions are loaded when they are first used.
+        """
         # Queries the database to find the quiz record which is to be loaded.
         rows = database.execute("SELECT * FROM `Quizzes` WHERE `QuizID` = ?;", float(id))
         # This checks if the 'rows' list is not empty. This uses the property that empty lists in python are treated as false by if and while statements, and non-empty lists are true.
         if(rows):
-            # Goes through each field in the record and returns a Quiz object
-            record = rows[0]
-            # Fetch the questions for the quiz.
-            questionRows = database.execute("SELECT * FROM `Questions` WHERE `QuizID` = ?;", float(id))
-            questionList = [Question.getQuestionFromDatabaseRecord(i) for i in questionRows] # This turns all the question records to a list of question objects.
-            title = record[1]
-            subjectID = record[2]
-            examboardID = record[3]
-            amountOfQuestions = record[4]
-            if(len(questionList) != amountOfQuestions):
-                # If the amount of questions found isn't equal to the amount of questions that the quiz record thinks it has, raise an error.
-                raise Exception("The number of questions in the quiz found doesn't match the expected amount of questions for that quiz.")
-            tags = record[5].split(",") if record[5] else [] # This will generate a list of tags (they are comma-separated), and if there are no tags it will be an empty list.
-            difficulty = record[6]
-            return Quiz(database, id, title, tags, subjectID, examboardID, difficulty, questionList) # This creates the quiz object and returns it.
+            return Quiz.getQuizFromDatabaseRecord(rows[0], database)
         else:
             # If no quiz is found with the given ID, return an error.
             raise IndexError("No quiz found at the given id.")
     
-    def importQuiz(parent, filename: str) -> 'Quiz': # This is not called on an object, but the class itself.
+    def ensureQuestionHashes(database) -> None: # This is not called on an object, but the class itself.
         """
-        This will import a quiz from an XML file and load it as a Quiz object.
-        It will save it to the database by default.
+        Makes sure every question has its content hash stored, e.g. the first time a database from before the hashes were added is opened.
+        The Hash column and its index are added to the Questions table if they are missing,
+        and the quizzes with unhashed questions have their questions' hashes and their own hash worked out and saved, a few hundred quizzes in each transaction.
+        Once every question has its hash, this only runs one quick query, so it can be run every time the application starts.
         """
-        # Define the variables.
-        tree = None
-        root = None
-        metadata = None
-        title = None
-        difficulty = None
         try:
-            # Parse the file.
-            tree = et.parse(filename)
-            # Get the root quiz element.
-            root = tree.getroot()
-            # Find the meta child element.
-            metadata = root.find("meta")
-            # Get the title and difficulty elements' texts from the meta element.
-            title = metadata.find("title").text
-            difficulty = metadata.find("difficulty").text
-        except AttributeError:
-            # If any of the above things couldn't be found, end the method.
-            return tkmb.showerror("Import error", "Invalid quiz XML file.", parent = parent.tk)
-        except et.ParseError:
-            # If any of the above things couldn't be found, end the method.
-            return tkmb.showerror("Import error", "Invalid quiz XML file.", parent = parent.tk)
-        # Find the subject name.
-        subject = metadata.find("subjectName")
-        subjectID = -1
-        if(subject != None):
-            # If the subject name is set,
-            subject = subject.text
-            found = False
-            # Go through each of the subjects in the database to see if any of the subjects match the one found.
-            for i in parent.inverseSubjectDictionary.keys():
-                if(subject.lower() == i.lower()):
-                    # If one does, set the subjectID to the subjectID of the subject in the database.
-                    subjectID = parent.inverseSubjectDictionary[i]
-                    found = True
-                    break
-            if(not found):
-                # If the subject name isn't found, create the subject in the database, fetch its ID, and use that.
-                parent.database.execute("INSERT INTO `Subjects` (SubjectName) VALUES (?);", subject)
-                # This gets the inserted record's id.
-                subjectID = parent.database.execute("SELECT @@IDENTITY;")[0][0]
-                # Add the subject to the application's dictionaries.
-                parent.subjectDictionary[subjectID] = subject
-                parent.inverseSubjectDictionary[subject] = subjectID
-                print("Subject: " + subject + " added.")
-                if(parent.state == 2):
-                    # Reload the quiz browser, as the exam board filter now has a new option.
-                    parent.unloadQuizBrowserScreen()
-                    parent.unloadSidePanel()
-                    parent.loadQuizBrowserScreen()
-        
-        # Find the exam board name.
-        examBoard = metadata.find("examBoardName")
-        examBoardID = -1
-        if(examBoard != None):
-            # If the exam board name is set,
-            examBoard = examBoard.text
-            found = False
-            # Go through each of the exam boards in the database to see if any of the exam boards match the one found.
-            for i in parent.inverseExamboardDictionary.keys():
-                if(examBoard.lower() == i.lower()):
-                    # If one does, set the examBoardID to the examBoardID of the exam board in the database.
-                    examBoardID = parent.inverseExamboardDictionary[i]
-                    found = True
-                    break
-            if(not found):
-                # If the exam board name isn't found, create the exam board in the database, fetch its ID, and use that.
-                parent.database.execute("INSERT INTO `Examboards` (EName) VALUES (?);", examBoard)
-                # This gets the inserted record's id.
-                examBoardID = parent.database.execute("SELECT @@IDENTITY;")[0][0]
-                # Add the exam board to the application's dictionaries.
-                parent.examboardDictionary[examBoardID] = examBoard
-                parent.inverseExamboardDictionary[examBoard] = examBoardID
-                print("Exam board: " + examBoard + " added.")
-                if(parent.state == 2):
-                    # Reload the quiz browser, as the exam board filter now has a new option.
-                    parent.unloadQuizBrowserScreen()
-                    parent.unloadSidePanel()
-                    parent.loadQuizBrowserScreen()
-        
-        tags = []
-        # Find the tag holder element.
-        tagsElement = metadata.find("tags")
-        if(tagsElement != None):
-            # if there is a tags element, find all the tag child elements.
-            for i in tagsElement.findall("tag"):
-                # For each tag found, if it isn't blank
-                if(i != None and i.text.strip()):
-                    # Add the tag to the list.
-                    tags.append(i.text.strip())
-        # Find all the question tags.
-        questions = root.findall("question")
-        questionList = []
-        for i in questions:
-            # For each question element found,
-            try:
-                # Get the title,
-                qtext = i.find("qtext").text
-                # the correct answer,
-                correctAnswer = i.find("correctanswer").text
-                # and the wrong answers.
-                wrongAnswers = [j.text for j in i.findall("wronganswer")]
-            except AttributeError:
-                # If one of those three were missing from a question, stop the method execution.
-                return "Invalid question XML."
-            # Get the question's hint and help elements.
-            hintElement = i.find("hint")
-            helpElement = i.find("help")
-            # Get the text from the hint and help elements
-            hint = hintElement.text if hintElement != None and hintElement.text else ""
-            help = helpElement.text if helpElement != None and helpElement.text else ""
-            # Create the question object.
-            question = Question(-1, qtext, correctAnswer, wrongAnswers, -1, hint, help)
-            if(question.validate()):
-                # If the question is invalid, show an error and return.
-                tkmb.showerror("Question error", "Question \"" + qtext + "\": " + question.validate(), parent = parent.tk)
-                return
-            # Then add the question to the list.
-            questionList.append(question)
-        
-        # VALIDATION
-        if(len(title) < 3):
-            tkmb.showerror("Title error", "Quiz title is too short, it should be at least 3 characters long (currently: " + str(len(title)) + ").", parent = parent.tk)
-            return
-        if(len(title) > 70):
-            tkmb.showerror("Title error", "Quiz title is too long, it should be at most 70 characters long (currently: " + str(len(title)) + ").", parent = parent.tk)
-            return
-        # Regular expression to check if the title has any invalid characters.
-        quizTitleRegex = re.compile('[^a-zA-Z0-9\.\-\? ]')
-        # Run the title through the regular expression.
-        reducedTitle = quizTitleRegex.sub("", title)
-        if(reducedTitle != title):
-            # If the title has been changed by the regular expression, the title contained invalid characters and so has failed the format check. Show an error message to the user.
-            tkmb.showerror("Title error", "Quiz title contains invalid characters, it should only contain english letters, numbers, spaces, dashes, question marks, or full stops/periods.", parent = parent.tk)
-            return
-        # Presence check on difficulty drop-down entry box.
-        if(not difficulty):
-            # If no difficulty has been set, show an error.
-            tkmb.showerror("Difficulty error", "No difficulty has been set for this quiz.", parent = parent.tk)
-            return
-        # Length check on tag entry.
-        if(len(",".join(tags)) > 150):
-            # If the length of the tags is too long, show an error.
-            tkmb.showerror("Tags error", "Tag list is too long, it should be at most 150 characters long (currently: " + str(len(title)) + ").", parent = parent.tk)
-            return
-        # Creating a quiz object, so a hash can be generated.
-        quizObject = Quiz(None, None, title, tags, int(subjectID) if subjectID and subjectID != -1 else None, int(examBoardID) if examBoardID and examBoardID != -1 else None, difficulty, questionList)
-        quizHash = quizObject.getHash(parent)
-        # Check the database to see if an identical quiz is in there already.
-        queryResults = parent.database.execute("SELECT * FROM `Quizzes` WHERE `Hash` = ?;", quizHash)
-        if(len(queryResults)):
-            # The quiz is already in the database.
-            tkmb.showerror("Quiz error", "An identical quiz is already in the database.", parent = parent.tk)
+            # The column name isn't quoted here, as SQLite treats a quoted name that isn't a column as text rather than failing.
+            database.execute("SELECT TOP 1 Hash FROM `Questions`;")
+        except Exception:
+            database.execute("ALTER TABLE `Questions` ADD COLUMN `Hash` VARCHAR(32);")
+        try:
+            database.execute("CREATE INDEX `QuestionsHashIndex` ON `Questions` (`Hash`);")
+        except Exception:
+            # The index is already there.
+            pass
+        if(not database.execute("SELECT TOP 1 `QuestionID` FROM `Questions` WHERE `Hash` IS NULL;")):
+            # Every question has its hash already, which is the case every time after the first, so the quizzes don't need to be gone through.
             return
-        
-        # Adding the quiz to the database, if all checks have passed.
-        parent.database.execute("INSERT INTO `Quizzes` (QuizName, SubjectID, ExamboardID, AmountOfQuestions, TagList, Difficulty, Hash)" +
-                                        "VALUES (?,?,?,?,?,?,?);", title, float(subjectID) if subjectID != -1 else None, float(examBoardID) if examBoardID != -1 else None, float(len(questions)), ",".join(tags), float(difficulty), quizHash)
-        
-        # Getting the ID of the record that was just added.
-        lastRecord = parent.database.execute("SELECT @@IDENTITY;")
-        quizID = lastRecord[0][0]
-        for i in questionList:
-            # For each question, give it the Quiz's ID, and then add it to the database.
-            i.quizID = quizID
-            i.addToDatabase(parent.database)
-        # If the quiz has been successfully imported, show the user a message.
-        tkmb.showinfo("Quiz import", "Quiz \"" + title + "\" has been successfully imported.", parent = parent.tk)
-        parent.refreshList()
+        quizIDs = [i[0] for i in database.execute("SELECT DISTINCT `QuizID` FROM `Questions` WHERE `Hash` IS NULL;")]
+        print("Working out the content hashes of " + str(len(quizIDs)) + " quizzes...")
+        for i in range(0, len(quizIDs), 500):
+            part = [float(j) for j in quizIDs[i:i + 500]]
+            placeholders = ",".join(["?"] * len(part))
+            with database.transaction():
+                # The questions of the quizzes in this part are loaded with one query, and grouped by their quiz.
+                questions = {}
+                for j in database.execute("SELECT * FROM `Questions` WHERE `QuizID` IN (" + placeholders + ") ORDER BY `QuizID`, `QuestionID`;", *part):
+                    questions.setdefault(j[1], []).append(Question.getQuestionFromDatabaseRecord(j))
+                for j in questions.values():
+                    for k in j:
+                        if(k.hash == None):
+                            database.execute("UPDATE `Questions` SET `Hash` = ? WHERE `QuestionID` = ?;", k.getHash(), float(k.id))
+                # Then each quiz's own hash is worked out from its questions' hashes, if the quiz is still in the database.
+                for j in database.execute("SELECT `QuizID`, `QuizName`, `Difficulty` FROM `Quizzes` WHERE `QuizID` IN (" + placeholders + ");", *part):
+                    hasher = QuizHash(j[1], j[2])
+                    for k in questions.get(j[0], []):
+                        hasher.addQuestion(k)
+                    database.execute("UPDATE `Quizzes` SET `Hash` = ? WHERE `QuizID` = ?;", hasher.hexdigest(), float(j[0]))
+    
+    def getQuizFromDatabaseRecord(record: tuple, database, questions: list = None) -> 'Quiz': # This is not called on an object, but the class itself.
+        """This takes a record from the Quizzes table and returns a Quiz object, with the given questions (or loading them when they are first used if None)."""
+        # Goes through each field in the record.
+        title = record[1]
+        subjectID = record[2]
+        examboardID = record[3]
+        amountOfQuestions = record[4]
+        tags = record[5].split(",") if record[5] else [] # This will generate a list of tags (they are comma-separated), and if there are no tags it will be an empty list.
+        difficulty = record[6]
+        quizObject = Quiz(database, record[0], title, tags, subjectID, examboardID, difficulty, None, amountOfQuestions) # This creates the quiz object.
+        if(questions != None):
+            if(len(questions) != amountOfQuestions):
+                # If the amount of questions found isn't equal to the amount of questions that the quiz record thinks it has, raise an error.
+                raise Exception("The number of questions in the quiz found doesn't match the expected amount of questions for that quiz.")
+            quizObject.loadedQuestions = questions
+        return quizObject
+    
+    def getQuizzes(ids: list, database) -> list: # This is not called on an object, but the class itself.
+        """
+        This loads many quizzes and all their questions using two queries for every few hundred quizzes, one for the quiz records and one for the questions,
+        so the statements don't get too long.
+        Returns a list of Quiz objects in the same order as the IDs, leaving out any IDs that weren't found.
+        """
+        ids = list(dict.fromkeys(ids))
+        records = {}
+        questions = {}
+        for i in range(0, len(ids), 500):
+            part = [float(j) for j in ids[i:i + 500]]
+            placeholders = ",".join(["?"] * len(part))
+            for j in database.execute("SELECT * FROM `Quizzes` WHERE `QuizID` IN (" + placeholders + ");", *part):
+                records[j[0]] = j
+                questions[j[0]] = []
+            # Group the questions by their quiz.
+            for j in database.execute("SELECT * FROM `Questions` WHERE `QuizID` IN (" + placeholders + ") ORDER BY `QuizID`, `QuestionID`;", *part):
+                questions[j[1]].append(Question.getQuestionFromDatabaseRecord(j))
+        return [Quiz.getQuizFromDatabaseRecord(records[i], database, questions[i]) for i in ids if i in records]
+    
+    def exportQuizzes(parent, ids: list, filename: str) -> int: # This is not called on an object, but the class itself.
+        """
+        This will export the quizzes with the given IDs into one XML file, as a bundle of <quiz> elements inside a <quizzes> element, which can be imported in one go.
+        The quizzes are loaded with getQuizzes and written a hundred at a time, so every quiz in the database can be exported without holding them all in memory,
+        and without two queries for every quiz. Quizzes that are no longer in the database are left out. Returns the number of quizzes exported.
+        """
+        ids = list(ids)
+        exported = 0
+        with open(filename, "w", encoding = "utf-8") as file:
+            file.write(Quiz.xmlDeclaration + "<quizzes>\n")
+            for i in range(0, len(ids), 100):
+                for quizObject in Quiz.getQuizzes(ids[i:i + 100], parent.database):
+                    quizObject.writeXML(file, parent.subjectDictionary, parent.examboardDictionary, 1)
+                    exported += 1
+            file.write("</quizzes>\n")
+        return exported
+    
+    def importQuiz(parent, filename: str) -> list: # This is not called on an object, but the class itself.
+        """
+        This will import the quiz, or the bundle of quizzes, in an XML file and save them to the database.
+        The file is read and saved a piece at a time by the QuizImporter (see quizImporter.py), so big files don't have to fit in memory.
+        Returns the list of the IDs of the quizzes that were imported.
+        """
+        import quizImporter
+        importer = quizImporter.QuizImporter(parent)
+        importer.importFile(filename)
+        # Show the user which quizzes were imported, and add them to the quiz browser.
+        importer.showResults()
+        importer.updateApplication()
+        return importer.importedQuizIDs
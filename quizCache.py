@@ -0,0 +1,87 @@
+"""
+This file contains the QuizCache class, which keeps the most recently used Quiz objects in memory so that launching, editing or exporting
+the same quiz again doesn't have to go back to the database.
+The cache holds a limited number of quizzes and questions, and when it is full the quiz that was used longest ago is removed (least recently used).
+Anything that changes or deletes a quiz in the database must invalidate it in the cache.
+"""
+
+# An OrderedDict keeps the quizzes in the order they were last used.
+import collections
+# The lock lets the cache be used from more than one thread, e.g. by the simulation harness.
+import threading
+# The Quiz class, which loads the quizzes that aren't in the cache.
+import quiz
+
+class QuizCache(object):
+    # The default number of quizzes kept in the cache.
+    defaultCapacity = 32
+    # The default total number of questions kept in the cache. Every cached quiz has all its questions loaded,
+    # and the least recently used quizzes are removed until their questions fit, so the cache's memory use stays bounded however big the quizzes are.
+    defaultQuestionCapacity = 5000
+
+    def __init__(self, database, capacity: int = None, questionCapacity: int = None) -> None:
+        """
+        database is the DatabaseManager object the quizzes are loaded from, capacity is the most quizzes that are kept,
+        and questionCapacity is the most questions that are kept in total. The most recently used quiz is always kept, even if it has more questions than that.
+        """
+        self.database = database
+        self.capacity = capacity if capacity != None else QuizCache.defaultCapacity
+        self.questionCapacity = questionCapacity if questionCapacity != None else QuizCache.defaultQuestionCapacity
+        # The QuizID maps to the Quiz object, with the most recently used quiz at the end.
+        self.quizzes = collections.OrderedDict()
+        # The QuizID maps to the number of questions the quiz had when it was cached, and the total of them.
+        # These are remembered, as the quiz editor can add questions to a cached quiz before it is invalidated.
+        self.questionCounts = {}
+        self.questionCount = 0
+        self.lock = threading.Lock()
+        # The number of times a quiz was found in the cache, and the number of times it had to be loaded from the database.
+        self.hits = 0
+        self.misses = 0
+
+    def getQuiz(self, quizID: int) -> 'quiz.Quiz':
+        """Returns the Quiz object with the given ID, from the cache if it is there, otherwise it is loaded from the database and added to the cache."""
+        with self.lock:
+            if(quizID in self.quizzes):
+                self.hits += 1
+                # Move the quiz to the end, as it is now the most recently used.
+                self.quizzes.move_to_end(quizID)
+                return self.quizzes[quizID]
+            self.misses += 1
+        # The quiz is loaded outside the lock, so other threads aren't held up. This raises IndexError if the quiz isn't in the database.
+        quizObject = quiz.Quiz.getQuiz(quizID, self.database)
+        # Load the questions now, so they are kept in the cache with the quiz.
+        quizObject.loadedQuestions = quizObject.loadQuestions()
+        with self.lock:
+            # Another thread may have cached the same quiz while this one was loading it.
+            self.remove(quizID)
+            self.quizzes[quizID] = quizObject
+            self.questionCounts[quizID] = len(quizObject.loadedQuestions)
+            self.questionCount += self.questionCounts[quizID]
+            while len(self.quizzes) > 1 and (len(self.quizzes) > self.capacity or self.questionCount > self.questionCapacity):
+                # Remove the least recently used quiz.
+                self.remove(next(iter(self.quizzes)))
+        return quizObject
+
+    def remove(self, quizID: int) -> None:
+        """Removes a quiz from the cache if it is there, and takes its questions off the total. The lock must be held when this is called."""
+        if(self.quizzes.pop(quizID, None) != None):
+            self.questionCount -= self.questionCounts.pop(quizID)
+
+    def invalidate(self, quizID: int) -> None:
+        """Removes a quiz from the cache, which must be done whenever it is changed or deleted in the database."""
+        with self.lock:
+            self.remove(quizID)
+
+    def clear(self) -> None:
+        """Removes every quiz from the cache, e.g. when a change affects many quizzes at once."""
+        with self.lock:
+            self.quizzes.clear()
+            self.questionCounts.clear()
+            self.questionCount = 0
+
+    def getReport(self) -> str:
+        """Returns the numbers of quizzes and questions cached and the hit and miss counts as text."""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return "Quiz cache: {} of {} quizzes and {} of {} questions cached, {} hits, {} misses ({:.0f}% hit rate)".format(len(self.quizzes), self.capacity,
+                    self.questionCount, self.questionCapacity, self.hits, self.misses, 100 * self.hits / lookups if lookups else 0)
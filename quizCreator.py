@@ -61,6 +61,8 @@ class QuizCreatorDialog(object):
         # Fetches the exam boards and subjects from the application dictionaries.
         self.examBoardCombobox = ttk.Combobox(self.window, textvariable = self.examBoardString, state = "readonly", values = ["None"] + list(self.parent.examboardDictionary.values()))
         self.subjectCombobox = ttk.Combobox(self.window, textvariable = self.subjectString, state = "readonly", values = ["None"] + list(self.parent.subjectDictionary.values()))
+        # Keep the drop down menus up to date if subjects or exam boards are added or removed while the window is open.
+        self.parent.referenceData.listenWhileOpen(self.window, self.referenceDataChanged)
         # The difficulty options are hard coded, because the user can't create their own difficulties.
         self.difficultyCombobox = ttk.Combobox(self.window, textvariable = self.difficultyString, state = "readonly", values = [1, 2, 3, 4, 5])
         self.tagsEntry = tk.Entry(self.window, textvariable = self.tagsString)
@@ -87,6 +89,17 @@ class QuizCreatorDialog(object):
         self.addQuestionButton.grid(row = 2, column = 4)
         self.horizontalSeparator.grid(row = 3, column = 0, columnspan = 5, sticky = tk.W + tk.E)
     
+    def referenceDataChanged(self, referenceList, id: int, name: str, added: bool) -> None:
+        """This is run when a subject or exam board is added or removed, and updates the options in its drop down menu."""
+        if(referenceList == self.parent.referenceData.subjects):
+            combobox, string = self.subjectCombobox, self.subjectString
+        else:
+            combobox, string = self.examBoardCombobox, self.examBoardString
+        combobox.config(values = ["None"] + list(referenceList.names.values()))
+        if(not added and string.get() == name):
+            # If the removed name was selected, the quiz can't be put under it any more.
+            string.set("None")
+    
     def setupQuestionsFrame(self):
         """This creates a questions frame where the user can create questions and enter the question details."""
         # Creating the scrollbar for scrolling through the list of questions if the window can't contain all of them.
@@ -167,7 +180,7 @@ class QuizCreatorDialog(object):
     
     def submit(self):
         """Gets all the details and questions and saves them in the database."""
-        import quiz
+        import quiz, duplicates
         # Get the quiz details from the entry boxes.
         title = self.nameString.get().strip() # .strip() removes whitespace from both ends of the string.
         subject = self.subjectString.get()
@@ -272,20 +285,32 @@ class QuizCreatorDialog(object):
         
         # Create the quiz object, so we can generate a hash.
         quizObject = quiz.Quiz(None, None, title, tags, int(subjectID) if subjectID else None, int(examBoardID) if examBoardID else None, difficulty, questions)
+        # Check whether any quizzes are nearly the same as this one, and if so ask the user whether they still want to create it.
+        signature = duplicates.MinHashSignature.getQuizSignature(quizObject)
+        similarQuizzes = self.parent.duplicates.findSimilar(signature)
+        if(similarQuizzes):
+            similarName = self.parent.database.execute("SELECT `QuizName` FROM `Quizzes` WHERE `QuizID` = ?;", float(similarQuizzes[0][0]))
+            if(not tkmb.askyesno("Similar quiz", "This quiz is very similar to the quiz \"" + (similarName[0][0] if similarName else "Unknown quiz") + "\" ({:.0%} similar). ".format(similarQuizzes[0][1]) +
+                    "Do you still want to create it?", parent = self.window)):
+                return
         
-        # Adding the quiz to the database, if all checks have passed.
-        self.parent.database.execute("INSERT INTO `Quizzes` (QuizName, SubjectID, ExamboardID, AmountOfQuestions, TagList, Difficulty, Hash)" +
-                                        "VALUES (?,?,?,?,?,?,?);", title, subjectID, examBoardID, float(len(questions)), tags, float(difficulty), quizObject.getHash(self.parent))
-        
-        # Getting the ID of the record that was just added.
-        lastRecord = self.parent.database.execute("SELECT @@IDENTITY;")
-        quizID = lastRecord[0][0]
-        for i in questions:
-            # For each question, give it the Quiz's ID, and then add it to the database.
-            i.quizID = quizID
-            i.addToDatabase(self.parent.database)
-        # Reload the quiz list on the quiz browser to show the new quiz.
-        self.parent.refreshList()
+        # Adding the quiz and its questions to the database in one transaction, if all checks have passed.
+        with self.parent.database.transaction():
+            self.parent.database.execute("INSERT INTO `Quizzes` (QuizName, SubjectID, ExamboardID, AmountOfQuestions, TagList, Difficulty, Hash)" +
+                                            "VALUES (?,?,?,?,?,?,?);", title, subjectID, examBoardID, float(len(questions)), tags, float(difficulty), quizObject.getHash())
+            
+            # Getting the ID of the record that was just added.
+            lastRecord = self.parent.database.execute("SELECT @@IDENTITY;")
+            quizID = lastRecord[0][0]
+            for i in questions:
+                # Give each question the Quiz's ID.
+                i.quizID = quizID
+            # Then add all the questions to the database together.
+            quiz.Question.addManyToDatabase(questions, self.parent.database)
+            # Add the quiz to the duplicate index, so quizzes created later can be compared with it.
+            self.parent.duplicates.addQuiz(quizID, signature)
+        # Add the new quiz to the catalog, and show it on the quiz browser.
+        self.parent.quizzesChanged([quizID])
         # Exit the window upon successfully creating the quiz.
         self.window.destroy()
     
@@ -324,6 +349,8 @@ class QuizEditorDialog(QuizCreatorDialog):
         self.setupQuestionsFrame()
         # Need to rebind the "Finish Quiz" button to run the save changes method, rather than save a new quiz to the database method that was inherited.
         self.finishButton.config(command = self.update)
+        # Each row of entries that was filled in with an existing question maps to that Question object, so the changes can be found when the quiz is saved.
+        self.originalQuestions = {}
         # For editing a quiz, all the original quiz data needs to be re-entered.
         self.fillInExistingData()
         for i in self.quiz.questions:
@@ -388,10 +415,14 @@ class QuizEditorDialog(QuizCreatorDialog):
         
         # Adding the row of entries to the quiz dictionary, to keep references to the entry fields so the data inside them can be gathered when the quiz is saved.
         self.questions[myindex] = [question, correctAnswer, answer2, answer3, answer4, hint, help, deleteButton]
+        self.originalQuestions[myindex] = currentQuestion
     
     def update(self):
-        """This method updates all of the database entries, deletes questions that have been removed and adds questions that have been added."""
-        import quiz
+        """
+        This method updates all of the database entries, deletes questions that have been removed and adds questions that have been added.
+        Only the questions that have been changed, removed or added are written to the database, and the others keep their records and their stored hashes.
+        """
+        import quiz, duplicates
         # Get the quiz details from the entry boxes.
         title = self.nameString.get().strip()
         subject = self.subjectString.get()
@@ -436,8 +467,10 @@ class QuizEditorDialog(QuizCreatorDialog):
             tagList.append(i.strip().lower())
         # Re-creating the tags CSV string in case the last one had excess commas or had excess whitespace.
         tags = ",".join(tagList)
-        # Validating all the questions.
+        # Validating all the questions, and sorting them into the new questions, the changed questions and the unchanged questions.
         questions = []
+        newQuestions = []
+        changedQuestions = []
         for i in self.questions.keys():
             # For each question, get all the entered fields.
             questionText = self.questions[i][0].get()
@@ -455,20 +488,31 @@ class QuizEditorDialog(QuizCreatorDialog):
                 otherAnswers.append(answer4)
             hint = self.questions[i][5].get()
             help = self.questions[i][6].get()
-            # Create a question object and check if it is valid.
-            q = quiz.Question(-1, questionText, correctAnswer, otherAnswers, -1, hint, help)
+            # Create a question object and check if it is valid. A row that was filled in with an existing question keeps that question's ID.
+            original = self.originalQuestions.get(i, None)
+            q = quiz.Question(self.quiz.id, questionText, correctAnswer, otherAnswers, original.id if original else -1, hint, help)
             # Check if the question is valid, errorText will be None if there are no errors, else it will be a string.
             errorText = q.validate()
             if(errorText):
                 # If it's invalid, show an error, and then return.
                 tkmb.showerror("Question error", "Question (\"" + questionText + "\") has error: " + errorText, parent = self.window)
                 return
+            if(original == None):
+                newQuestions.append(q)
+            elif(q.hasSameFields(original)):
+                # An unchanged question keeps its stored hash, so the quiz's hash only has to hash the questions that have changed.
+                q.hash = original.getHash()
+            else:
+                changedQuestions.append(q)
             # If the question passes all the checks, add it to the questions list.
             questions.append(q)
         if(len(questions) < 2):
             # If there are less than 2 questions, show an error, and the return.
             tkmb.showerror("Question error", "Quiz should have at least 2 questions.", parent = self.window)
             return
+        # The existing questions whose rows have been removed.
+        keptQuestionIDs = set([i.id for i in questions])
+        removedQuestionIDs = [i.id for i in self.originalQuestions.values() if i.id not in keptQuestionIDs]
         # Get the subject and/or exam board ID from the text entry.
         subjectID = None
         examBoardID = None
@@ -497,18 +541,27 @@ class QuizEditorDialog(QuizCreatorDialog):
         # Create the quiz object, so we can generate a hash.
         quizObject = quiz.Quiz(None, None, title, tags, int(subjectID) if subjectID else None, int(examBoardID) if examBoardID else None, difficulty, questions)
         
-        # Update the quiz record.
-        self.parent.database.execute("UPDATE `Quizzes` SET QuizName = ?, SubjectID = ?, ExamboardID = ?, AmountOfQuestions = ?, TagList = ?, Difficulty = ?, Hash = ? WHERE QuizID = ?;",
-                                        title, subjectID, examBoardID, float(len(questions)), tags, float(difficulty), quizObject.getHash(self.parent), float(self.quiz.id))
-        # Remove the old questions
-        self.parent.database.execute("DELETE FROM `Questions` WHERE QuizID=?;", float(self.quiz.id))
-        # Add the new questions to the database.
-        for i in questions:
-            i.quizID = self.quiz.id
-            i.addToDatabase(self.parent.database)
+        # The update is done in one transaction, so if anything fails the quiz is left as it was rather than losing its questions.
+        with self.parent.database.transaction():
+            # Update the quiz record.
+            self.parent.database.execute("UPDATE `Quizzes` SET QuizName = ?, SubjectID = ?, ExamboardID = ?, AmountOfQuestions = ?, TagList = ?, Difficulty = ?, Hash = ? WHERE QuizID = ?;",
+                                            title, subjectID, examBoardID, float(len(questions)), tags, float(difficulty), quizObject.getHash(), float(self.quiz.id))
+            # Remove the questions that have been deleted, and save the ones that have been changed.
+            if(removedQuestionIDs):
+                quiz.Question.deleteManyFromDatabase(removedQuestionIDs, self.parent.database)
+            for i in changedQuestions:
+                i.updateInDatabase(self.parent.database)
+            if(subjectID != self.quiz.subject or examBoardID != self.quiz.examBoard or float(difficulty) != self.quiz.difficulty):
+                # The statistics totals are grouped by subject, exam board and difficulty, so the quiz's results are moved to the totals for its new ones.
+                self.parent.rollups.moveQuiz(self.quiz.id, (self.quiz.subject, self.quiz.examBoard, self.quiz.difficulty), (subjectID, examBoardID, difficulty))
+            # Add the new questions to the database. They are added after the existing questions, which is also where they are on the screen.
+            if(newQuestions):
+                quiz.Question.addManyToDatabase(newQuestions, self.parent.database)
+            # Replace the quiz's signature in the duplicate index, as its questions may have changed.
+            self.parent.duplicates.addQuiz(self.quiz.id, duplicates.MinHashSignature.getQuizSignature(quizObject))
         
-        # Reload the quiz list on the quiz browser to show the new quiz.
-        self.parent.refreshList()
+        # Reload the edited quiz in the catalog (removing the out of date copy from the quiz cache), and show the changes on the quiz browser.
+        self.parent.quizzesChanged([self.quiz.id])
         # Exit the window upon successfully creating the quiz.
         self.window.destroy()
     
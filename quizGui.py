@@ -7,8 +7,8 @@ import tkinter.font as tkfont
 import tkinter.messagebox as tkmb
 # Maths module is used for the ceiling function.
 import math as maths
-# Threading is used for the secondary thread.
-import threading
+# The quiz session holds the logic of doing the quiz, which this window displays.
+from quizSession import QuizSession, QuizStates
 
 class ActiveQuizDialog(object):
     def __init__(self, toplevel: tk.Tk, parent, quiz: 'Quiz', currentUser: 'User') -> None:
@@ -101,215 +101,161 @@ class ActiveQuizDialog(object):
         self.pauseButton.grid(row = 5, column = 1, sticky = tk.W+tk.E+tk.N+tk.S)
         self.endQuizButton.grid(row = 6, column = 1, sticky = tk.W+tk.E+tk.N+tk.S)
         
-        # Creating the secondary quiz thread.
-        t = threading.Thread(target = self.quizThread)
-        # Set the active quiz window's state to running.
-        self.running = True
-        # Starting the secondary thread.
-        t.start()
+        # The session does the timing and marking, and this window shows it and passes on the user's clicks.
+        self.session = QuizSession(quiz, currentUser)
+        # The ID of the pending after() callback, so it can be cancelled, or None if there isn't one.
+        self.scheduledCallback = None
+        # Show the first question.
+        self.session.start()
+        self.showQuestion()
+    
+    def schedule(self, delay: float, callback) -> None:
+        """Runs the callback after delay seconds on the tkinter main loop, replacing any callback that was already waiting."""
+        self.cancelScheduled()
+        self.scheduledCallback = self.window.after(max(0, int(delay * 1000)), self.runScheduled, callback)
+    
+    def runScheduled(self, callback) -> None:
+        """Runs a callback that was scheduled by the schedule method."""
+        self.scheduledCallback = None
+        callback()
+    
+    def cancelScheduled(self) -> None:
+        """Cancels the callback waiting to run, if there is one."""
+        if(self.scheduledCallback != None):
+            self.window.after_cancel(self.scheduledCallback)
+            self.scheduledCallback = None
+    
+    def displayAnswers(self) -> None:
+        """Shows the current question and its answers on the buttons, ready to be answered."""
+        question = self.session.getCurrentQuestion()
+        answers = self.session.answers
+        self.questionLabel.config(text = question.question)
+        for i in range(len(answers)):
+            # This recolours and re-enables buttons, as after each question the font colour of each button changes, and some buttons may be disabled.
+            self.answerButtons[i].config(text = answers[i], fg = "black", bg = "SystemButtonFace")
+            self.answerButtons[i].config(state = tk.NORMAL)
+        for i in range(3, len(answers) - 1, -1):
+            # This disables buttons if there is less than four answers for a given question.
+            self.answerButtons[i].config(state = tk.DISABLED, text = "")
+        self.hintButton.config(state = tk.NORMAL if question.hint else tk.DISABLED)
+        self.helpButton.config(state = tk.NORMAL if question.help else tk.DISABLED)
+    
+    def showQuestion(self) -> None:
+        """Shows the session's current question, or the results if the quiz has been finished."""
+        if(self.session.state == QuizStates.finished):
+            # This code is run when the user has finished the quiz.
+            self.completeQuiz()
+            return
+        self.displayAnswers()
+        self.timeLimitLabel.config(text = "")
+        # Start the countdown, if the user has timers turned on.
+        self.updateCountdown()
+    
+    def updateCountdown(self) -> None:
+        """Updates the time remaining for the current question, and schedules itself to run again when the displayed number of seconds next changes."""
+        if(self.session.paused):
+            return
+        if(self.session.checkTime()):
+            # If the user has ran out of time, the question has been marked as wrong.
+            self.showMarkedAnswer()
+            return
+        timeRemaining = self.session.getTimeRemaining()
+        if(timeRemaining == None):
+            return
+        # Display the remaining time in seconds, rounded up to the nearest integer.
+        self.timeLimitLabel.config(text = str(maths.ceil(timeRemaining)), fg = "black")
+        # The displayed number changes when the time remaining reaches the whole number of seconds below it.
+        self.schedule(timeRemaining - (maths.ceil(timeRemaining) - 1), self.updateCountdown)
+    
+    def showMarkedAnswer(self) -> None:
+        """Shows whether the answer to the current question was correct, and schedules the next question."""
+        self.cancelScheduled()
+        answer = self.session.givenAnswer
+        correctAnswer = self.session.correctAnswer
+        if(answer == correctAnswer):
+            # Display 'Correct', in green, where the countdown timer was.
+            self.timeLimitLabel.config(text = "Correct!", fg = "green")
+        else:
+            # Display 'Wrong' or 'Out of time!', in red, where the countdown timer was.
+            self.timeLimitLabel.config(text = "Out of time!" if answer == None else "Wrong!", fg = "red")
+        for i in range(len(self.answerButtons)):
+            # For each of the answer buttons:
+            if(i == correctAnswer):
+                # Make the text green if it was the correct button
+                self.answerButtons[i].config(fg = "green")
+            else:
+                # Make the text red if it was the wrong button
+                self.answerButtons[i].config(fg = "red")
+            if(i == answer):
+                # If it was the button that they clicked, make the background of that button white.
+                self.answerButtons[i].config(bg = "white")
+        # Show the next question once the delay is over.
+        self.schedule(self.session.getTimeUntilNextQuestion(), self.nextQuestion)
+    
+    def nextQuestion(self) -> None:
+        """Moves on to the next question, once the delay after answering is over."""
+        self.session.nextQuestion()
+        self.showQuestion()
     
     def answerButtonClick(self, answer: int) -> None:
-        """This method is a simple method to be run in a lambda statement whenever an answer button is clicked."""
-        if(self.currentState == 0):
-            # If the window is in a state to accept an answer, then set their answer to the button number that they clicked.
-            self.theirAnswer = answer
-            # Change the state so the user can't change their answer.
-            self.currentState = 1
+        """This method is run whenever an answer button is clicked, with the number of the button."""
+        if(self.session.answer(answer) != None):
+            self.showMarkedAnswer()
     
     def showHint(self):
         """This displays a hint to the user, if the question has one."""
-        if(self.quiz.questions[self.questionNumber].hint):
+        if(self.session.state == QuizStates.answering and self.session.getCurrentQuestion().hint):
             # If the current question has a hint text, show a message box with the hint in it.
-            tkmb.showinfo("Hint", self.quiz.questions[self.questionNumber].hint, parent = self.window)
+            tkmb.showinfo("Hint", self.session.getCurrentQuestion().hint, parent = self.window)
     
     def showHelp(self):
         """This displays help to the user, if the question has it."""
-        if(self.quiz.questions[self.questionNumber].help):
-            # If they open the help, mark the question as wrong (there is no answer with index 4, arrays start at zero so it would be the 5th answer).
-            self.theirAnswer = 4
-            # Stop the user answering.
-            self.currentState = 1
+        question = self.session.getCurrentQuestion() if self.session.state == QuizStates.answering else None
+        if(question and question.help and self.session.useHelp()):
+            # If they open the help, the question is marked as wrong.
+            self.showMarkedAnswer()
             # Display the help as a message box.
-            tkmb.showinfo("Help", self.quiz.questions[self.questionNumber].help, parent = self.window)
+            tkmb.showinfo("Help", question.help, parent = self.window)
     
     def pause(self):
         """This toggles the pause state of the quiz."""
-        # This is a simple pause toggle. If self.paused was False, then it becomes True. If it was True, then it becomes False.
-        self.paused = not self.paused
+        if(self.session.state not in (QuizStates.answering, QuizStates.answered)):
+            return
+        if(not self.session.paused):
+            # The quiz has just been paused, so stop the countdown or the delay before the next question.
+            self.session.pause()
+            self.cancelScheduled()
+            # Set the question text to "PAUSED".
+            self.questionLabel.config(text = "PAUSED")
+            # Disable the hint and help buttons.
+            self.hintButton.config(state = tk.DISABLED)
+            self.helpButton.config(state = tk.DISABLED)
+            for i in range(4):
+                # This disables all the buttons.
+                self.answerButtons[i].config(state = tk.DISABLED, text = "PAUSED")
+            return
+        # The quiz has just been unpaused.
+        self.session.resume()
+        if(self.session.state == QuizStates.answering):
+            # If the question is being answered, show it again and carry on with the countdown.
+            self.displayAnswers()
+            self.updateCountdown()
+        else:
+            self.questionLabel.config(text = "Next question coming in a moment...")
+            # Carry on waiting for the rest of the delay before the next question.
+            self.schedule(self.session.getTimeUntilNextQuestion(), self.nextQuestion)
     
-    def quizThread(self):
-        """This subroutine is run in a separate thread, and it will manage the quiz window while the user is doing the quiz."""
-        import time # Used to keep track of times
-        self.questionNumber = 0 # The question number of the quiz that should be displayed on the next iteration.
-        currentQuestion = -1 # The current question number that is currently being displayed.
-        currentQuestionStartTime = 0 # The time that the current question was initially displayed, stored as the time since the thread started, in seconds.
-        answerTime = 0 # The time that the quiz window will move on from the current question after the user has answered, stored as the time since the thread started, in seconds.
-        self.currentState = -1 # The current state of the quiz. States: -1 - Quiz hasn't started, 0 - Time to answer question, 1 - Question answered, 2 - Quiz finished.
-        self.theirAnswer = -1 # The answer that the user gives, which is set every time a user clicks on an answer button.
-        correctAnswer = -1 # The correct answer to the current question.
-        self.numberOfCorrectAnswers = 0 # The number of answers that have been answered correctly.
-        self.totalPausedDuration = 0 # The length of time that the quiz has been paused for, in seconds.
-        self.timesTakenToAnswer = [None for i in range(len(self.quiz.questions))] # The time it took to answer each question, in seconds.
-        self.totalDuration = None # The total duration of the quiz, in seconds.
-        self.startTime = time.clock() # The time that the quiz started, in seconds.
-        wasPaused = False # If the quiz was paused last iteration of the loop.
-        self.paused = False # This is changed by clicking the paused button, and indicates whether the quiz should be paused or not.
-        while self.running:
-            if(self.paused == True and wasPaused == True):
-                # The quiz is still paused.
-                # Wait 0.1 seconds before running through the loop again.
-                time.sleep(0.1)
-                # Account for the missed time in the variables.
-                self.totalPausedDuration += 0.1
-                currentQuestionStartTime += 0.1
-                # Then go through the loop again.
-                continue
-            if(self.paused == True and wasPaused == False):
-                # Quiz has just been paused.
-                # Set the question text to "PAUSED".
-                self.questionLabel.config(text = "PAUSED")
-                # Disable the hint and help buttons.
-                self.hintButton.config(state = tk.DISABLED)
-                self.helpButton.config(state = tk.DISABLED)
-                for i in range(4):
-                    # This disables all the buttons.
-                    self.answerButtons[i].config(state = tk.DISABLED, text = "PAUSED")
-                # Indicate that the quiz was paused last iteration, and all the GUI has changed.
-                wasPaused = True
-                continue
-            if(self.paused == False and wasPaused == True):
-                # Quiz has just been unpaused.
-                if(self.currentState == 0):
-                    # If the question is being answered.
-                    self.questionLabel.config(text = self.quiz.questions[self.questionNumber].question)
-                    answers, correctAnswer = self.quiz.questions[self.questionNumber].getShuffledAnswers()
-                    for i in range(len(answers)):
-                        # This recolours and re-enables buttons, as after each question the font colour of each button changes, and some buttons may be disabled.
-                        self.answerButtons[i].config(text = answers[i], fg = "black", bg = "SystemButtonFace")
-                        self.answerButtons[i].config(state = tk.NORMAL)
-                    for i in range(4, len(answers), -1):
-                        # This disables buttons if there is less than four answers for a given question.
-                        self.answerButtons[i].config(state = tk.DISABLED, text = "")
-                    self.hintButton.config(state = tk.NORMAL if self.quiz.questions[self.questionNumber].hint else tk.DISABLED)
-                    self.helpButton.config(state = tk.NORMAL if self.quiz.questions[self.questionNumber].help else tk.DISABLED)
-                else:
-                    self.questionLabel.config(text = "Next question coming in a moment...")
-                # Indicate that the quiz was running last iteration of the loop.
-                wasPaused = False
-            if(currentQuestion != self.questionNumber):
-                # A new question needs to be displayed
-                if(len(self.quiz.questions) == self.questionNumber):
-                    # This code is run when the user has finished the quiz.
-                    self.currentState = 2
-                    self.running = False
-                    continue
-                # The next question's text is displayed
-                self.questionLabel.config(text = self.quiz.questions[self.questionNumber].question)
-                currentQuestionStartTime = time.clock()
-                currentQuestion = self.questionNumber
-                # Gets the shuffled answers to the current question.
-                answers, correctAnswer = self.quiz.questions[self.questionNumber].getShuffledAnswers()
-                for i in range(len(answers)):
-                    # This recolours and re-enables buttons, as after each question the font colour of each button changes, and some buttons may be disabled.
-                    self.answerButtons[i].config(text = answers[i], fg = "black", bg = "SystemButtonFace")
-                    self.answerButtons[i].config(state = tk.NORMAL)
-                for i in range(3, len(answers) - 1, -1):
-                    # This disables buttons if there is less than four answers for a given question.
-                    self.answerButtons[i].config(state = tk.DISABLED, text = "")
-                self.hintButton.config(state = tk.NORMAL if self.quiz.questions[self.questionNumber].hint else tk.DISABLED)
-                self.helpButton.config(state = tk.NORMAL if self.quiz.questions[self.questionNumber].help else tk.DISABLED)
-                self.timeLimitLabel.config(text = "")
-                # Resetting their answer and the state variables.
-                self.theirAnswer = -1
-                self.currentState = 0
-            if(self.currentState == 1 and self.theirAnswer != -1):
-                # The following code runs immediately after they click an answer.
-                # Record the time taken to answer the question
-                self.timesTakenToAnswer[currentQuestion] = time.clock() - currentQuestionStartTime
-                if(correctAnswer == self.theirAnswer):
-                    # If the answer they entered is correct:
-                    # Show the next question after 1 second of delay
-                    answerTime = time.clock() + 1
-                    # Display 'Correct', in green, where the countdown timer was.
-                    self.timeLimitLabel.config(text = "Correct!", fg = "green")
-                    self.numberOfCorrectAnswers += 1
-                else:
-                    # If the answered they entered is wrong:
-                    # Show the next question after 5 seconds of delay.
-                    answerTime = time.clock() + 5
-                    # Display 'Wrong', in red, where the countdown timer was.
-                    self.timeLimitLabel.config(text = "Wrong!", fg = "red")
-                for i in range(len(self.answerButtons)):
-                    # For each of the answer buttons:
-                    if(i == correctAnswer):
-                        # Make the text green if it was the correct button
-                        self.answerButtons[i].config(fg = "green")
-                    else:
-                        # Make the text red if it was the wrong button
-                        self.answerButtons[i].config(fg = "red")
-                    if(i == self.theirAnswer):
-                        # If it was the button that they clicked, make the background of that button white.
-                        self.answerButtons[i].config(bg = "white")
-                self.theirAnswer = -1
-            if(self.theirAnswer == -1):
-                if(self.currentState == 0):
-                    # If they have not entered an answer, and the window is in the state where it is awaiting an answer:
-                    if(self.user.timeConfig):
-                        # If the user has timers enabled in their settings, calculate the time remaining.
-                        timeRemaining = currentQuestionStartTime -  time.clock()
-                        if(self.user.timeConfig == 1):
-                            # If the timer setting is set to long, time allowed is 5 seconds + 5 per difficulty level.
-                            timeRemaining += 5 + self.quiz.difficulty * 5
-                        else:
-                            # If the timer is set to short, it is half the long time.
-                            timeRemaining += 2.5 + self.quiz.difficulty * 2.5
-                        if(timeRemaining <= 0):
-                            # If the user has ran out of time:
-                            # Display 'Out of time!', in red, where the countdown timer was.
-                            self.timeLimitLabel.config(text = "Out of time!", fg = "red")
-                            for i in range(len(self.answerButtons)):
-                                # For each of the answer buttons:
-                                if(i == correctAnswer):
-                                    # Make the text green if it was the correct button
-                                    self.answerButtons[i].config(fg = "green")
-                                else:
-                                    # Make the text red if it was the wrong button
-                                    self.answerButtons[i].config(fg = "red")
-                            self.currentState = 1
-                            # Display the next question after 5 seconds of delay.
-                            answerTime = time.clock() + 5
-                        else:
-                            # If the user still has time left, display the remaining time in seconds, rounded up to the nearest integer.
-                            self.timeLimitLabel.config(text = str(maths.ceil(timeRemaining)), fg = "black")
-                elif(self.currentState == 1 and answerTime <= time.clock()):
-                    # If the delay after answering a question is over, show the next question.
-                    self.questionNumber += 1
-            # Wait 0.1 seconds before running through the loop again, to reduce load on CPU.
-            time.sleep(0.1)
-        # If the user has finished the quiz and hasn't terminated the quiz elsewhere:
-        if(self.currentState == 2):
-            # Remove the buttons
-            self.unloadQuestionView()
-            # Calculate the average time to answer a question.
-            averageAnswerTime = sum(self.timesTakenToAnswer) / len(self.timesTakenToAnswer)
-            self.totalDuration = time.clock() - self.totalPausedDuration - self.startTime
-            # Display the user's performance statistics.
-            self.loadFinishedView()
-            self.running = True
-            import datetime
-            # Adds the result to the database.
-            self.parent.database.execute("INSERT INTO `Results` (UserID, QuizID, Score, DateCompleted, AverageAnswerTime, TotalDuration) VALUES (?, ?, ?, ?, ?, ?);",
-                    float(self.user.id), float(self.quiz.id), self.numberOfCorrectAnswers / len(self.quiz.questions), datetime.datetime.now(), averageAnswerTime, self.totalDuration)
-            
-            # Keep the window alive before closing it, so the user has time to read the results.
-            while(self.running):
-                time.sleep(0.1)
-        # Reload the quiz list in case the best attempt of the quiz has changed.
-        self.parent.refreshList()
-        self.parent.unloadSidePanel()
-        self.parent.loadSidePanel()
-        # Destroy the window after everything has finished.
-        self.window.destroy()
+    def completeQuiz(self) -> None:
+        """Shows the user's results once they have answered every question, and saves them to the database."""
+        # Remove the buttons
+        self.unloadQuestionView()
+        # Display the user's performance statistics.
+        self.loadFinishedView()
+        # Adds the result to the database.
+        self.session.saveResult(self.parent.database, self.parent.rollups)
+        # Update the quiz's best attempt on the quiz browser, without reloading the rest of the quizzes.
+        self.parent.resultSaved(self.session.result)
+        # The window stays open until the user closes it, so the user has time to read the results.
     
     def unloadQuestionView(self) -> None:
         """This method removes all the buttons of the quiz, ready to display the end screen statistics."""
@@ -329,9 +275,10 @@ class ActiveQuizDialog(object):
         # Show the text 'Quiz Completed!', centered.
         self.questionLabel.config(text = "Quiz Completed!", anchor = tk.CENTER)
         # Show the number of correct answers out of the number of questions.
-        self.scoreLabel = tk.Label(self.window, text = "Score: " + str(self.numberOfCorrectAnswers) + "/" + str(len(self.quiz.questions)), font = self.questionFont)
+        self.scoreLabel = tk.Label(self.window, text = "Score: " + str(self.session.numberOfCorrectAnswers) + "/" + str(self.session.numberOfQuestions), font = self.questionFont)
         # Format the time taken to do the quiz.
-        timeTakenString = (str(round(self.totalDuration // 60)) + "m " if self.totalDuration >= 60 else "") + (str(round((maths.ceil(self.totalDuration * 10) / 10) % 60, 1)) + "s" if round((maths.ceil(self.totalDuration * 10) / 10) % 60, 1) else "")
+        totalDuration = self.session.totalDuration
+        timeTakenString = (str(round(totalDuration // 60)) + "m " if totalDuration >= 60 else "") + (str(round((maths.ceil(totalDuration * 10) / 10) % 60, 1)) + "s" if round((maths.ceil(totalDuration * 10) / 10) % 60, 1) else "")
         # Show the time taken on the time taken label.
         self.timeLabel = tk.Label(self.window, text = "Time taken: " + timeTakenString, font = self.questionFont)
         # Position the time taken label and the score label on the window.
@@ -339,5 +286,11 @@ class ActiveQuizDialog(object):
         self.timeLabel.grid(row = 4, column = 0)
     
     def finish(self) -> None:
-        """This destroys the window after all the previous tasks are finished, by setting running to false, so the window closes once the thread has finished its last iteration."""
-        self.running = False
+        """This is run when the window is closed or the quiz is ended, and it destroys the window."""
+        self.cancelScheduled()
+        self.session.close()
+        # The quiz's best attempt has already been updated when the result was saved, so only the side panel is reloaded.
+        self.parent.unloadSidePanel()
+        self.parent.loadSidePanel()
+        # Destroy the window after everything has finished.
+        self.window.destroy()
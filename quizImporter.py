@@ -0,0 +1,363 @@
+"""
+This file contains the QuizFileReader and QuizImporter classes, which import quizzes from XML quiz files.
+The file is read a piece at a time, and each question is validated and saved to the database in batches as soon as it has been read,
+then removed from the parsed XML tree, so a quiz file with tens of thousands of questions is imported without holding it all in memory.
+A file can hold one quiz, or a bundle of many quizzes, either as several <quiz> elements one after another or inside one root element,
+and every quiz in it is imported in a single pass through the file.
+"""
+
+# This is used to parse the XML quiz files.
+import xml.etree.ElementTree as et
+# Codecs is used to decode the file a piece at a time.
+import codecs
+# Regular expressions are used to find the XML declaration and to validate the quiz titles.
+import re
+# For showing import messages
+import tkinter.messagebox as tkmb
+# The Question and Quiz classes that the imported quizzes are made of.
+import quiz
+# The similarity index, which finds quizzes that are nearly the same as an imported quiz.
+import duplicates
+
+class QuizImportError(Exception):
+    """Raised when a quiz in a file can't be imported. It holds the title and the message of the error shown to the user."""
+    def __init__(self, title: str, message: str) -> None:
+        super().__init__(message)
+        self.title = title
+        self.message = message
+
+class QuizFileReader(object):
+    """
+    This reads a quiz file a piece at a time, and goes through the quizzes in it as a stream of (event, value) tuples, e.g. "for event, value in reader:".
+    Each quiz starts with a ("quiz", metadata) event, where metadata is a dictionary of the quiz's details, followed by a ("question", Question) event
+    for each of its questions and an ("end", None) event. If a quiz or a question isn't valid, an ("invalid", message) event is given instead.
+    Each element is removed from the XML tree once it has been read, so only the question being read is held in memory.
+    """
+    # The number of characters read from the file at a time.
+    chunkSize = 65536
+    # The name of the element that the file's contents are placed inside, so that a file with several <quiz> root elements can be parsed.
+    wrapperTag = "quizfile"
+    # This finds the XML declaration at the start of a file, and the encoding in it.
+    declarationRegex = re.compile(rb"^\s*<\?xml[^>]*?(?:encoding\s*=\s*[\"']([\w.:-]+)[\"'])?[^>]*\?>")
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        # Whether a quiz is being read, and whether the rest of the current quiz is being skipped.
+        self.inQuiz = False
+        self.skipping = False
+
+    def skipQuiz(self) -> None:
+        """Skips the rest of the quiz being read, so the next event is the start of the next quiz. This is used after a quiz fails to import."""
+        if(self.inQuiz):
+            self.skipping = True
+
+    def readChunks(self):
+        """Goes through the text of the file a piece at a time, without its XML declaration, decoded using the encoding given in the declaration."""
+        with open(self.filename, "rb") as file:
+            data = file.read(QuizFileReader.chunkSize)
+            encoding = "utf-8-sig"
+            declaration = QuizFileReader.declarationRegex.match(data.lstrip(codecs.BOM_UTF8))
+            if(declaration):
+                # The declaration is removed, as it can't be inside the wrapper element.
+                data = data.lstrip(codecs.BOM_UTF8)[declaration.end():]
+                if(declaration.group(1)):
+                    encoding = declaration.group(1).decode("ascii")
+            decoder = codecs.getincrementaldecoder(encoding)()
+            while data:
+                yield decoder.decode(data)
+                data = file.read(QuizFileReader.chunkSize)
+            yield decoder.decode(b"", final = True)
+
+    def getMetadata(self, metaElement: et.Element) -> dict:
+        """Returns the quiz details from a meta element as a dictionary, or None if the title or difficulty is missing."""
+        title = metaElement.find("title")
+        difficulty = metaElement.find("difficulty")
+        if(title == None or title.text == None or difficulty == None):
+            return None
+        subjectElement = metaElement.find("subjectName")
+        examBoardElement = metaElement.find("examBoardName")
+        tags = []
+        # Find the tag holder element.
+        tagsElement = metaElement.find("tags")
+        if(tagsElement != None):
+            # if there is a tags element, find all the tag child elements.
+            for i in tagsElement.findall("tag"):
+                # For each tag found, if it isn't blank, add it to the list.
+                if(i.text and i.text.strip()):
+                    tags.append(i.text.strip())
+        return {"title": title.text, "difficulty": difficulty.text, "tags": tags,
+                "subjectName": subjectElement.text if subjectElement != None and subjectElement.text else None,
+                "examBoardName": examBoardElement.text if examBoardElement != None and examBoardElement.text else None}
+
+    def getQuestion(self, questionElement: et.Element) -> quiz.Question:
+        """Returns the Question object for a question element, or None if the question text or an answer is missing."""
+        try:
+            # Get the title,
+            qtext = questionElement.find("qtext").text
+            # the correct answer,
+            correctAnswer = questionElement.find("correctanswer").text
+            # and the wrong answers.
+            wrongAnswers = [i.text for i in questionElement.findall("wronganswer")]
+        except AttributeError:
+            # If one of those three were missing from a question.
+            return None
+        # Get the question's hint and help elements.
+        hintElement = questionElement.find("hint")
+        helpElement = questionElement.find("help")
+        # Get the text from the hint and help elements
+        hint = hintElement.text if hintElement != None and hintElement.text else ""
+        help = helpElement.text if helpElement != None and helpElement.text else ""
+        return quiz.Question(-1, qtext, correctAnswer, wrongAnswers, -1, hint, help)
+
+    def __iter__(self):
+        """Goes through the events of every quiz in the file. This raises et.ParseError if the file isn't valid XML."""
+        parser = et.XMLPullParser(events = ("start", "end"))
+        parser.feed("<" + QuizFileReader.wrapperTag + ">")
+        # The elements that have been started but not ended, so each element's parent is known.
+        elements = []
+        # The quiz's details, and the questions read before its meta element (which is usually first, so this is usually empty).
+        metadata = None
+        waitingQuestions = []
+        for chunk in self.readChunks():
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if(event == "start"):
+                    elements.append(element)
+                    if(element.tag == "quiz"):
+                        self.inQuiz = True
+                        self.skipping = False
+                        metadata = None
+                        waitingQuestions = []
+                    continue
+                elements.pop()
+                if(not elements):
+                    # The end of the wrapper element.
+                    continue
+                parent = elements[-1]
+                if(element.tag == "quiz"):
+                    if(not self.skipping):
+                        self.inQuiz = False
+                        yield ("end", None) if metadata != None else ("invalid", "Invalid quiz XML file.")
+                    self.inQuiz = False
+                    self.skipping = False
+                elif(parent.tag != "quiz"):
+                    # Any other elements are only read as part of the quiz's meta and question elements, so they are kept until those end,
+                    # unless they are in the wrapper element, outside of any quiz.
+                    if(len(elements) > 1):
+                        continue
+                elif(self.skipping):
+                    # The rest of a quiz being skipped is removed without being read.
+                    pass
+                elif(element.tag == "meta" and metadata == None):
+                    metadata = self.getMetadata(element)
+                    if(metadata == None):
+                        yield ("invalid", "Invalid quiz XML file.")
+                        self.skipQuiz()
+                        continue
+                    yield ("quiz", metadata)
+                    # Then give any questions that were before the meta element.
+                    for i in waitingQuestions:
+                        if(not self.skipping):
+                            yield i
+                    waitingQuestions = []
+                elif(element.tag == "question"):
+                    question = self.getQuestion(element)
+                    event = ("question", question) if question != None else ("invalid", "Invalid question XML.")
+                    if(metadata == None):
+                        waitingQuestions.append(event)
+                    else:
+                        yield event
+                # Remove the element from the tree now it has been read.
+                element.clear()
+                parent.remove(element)
+        parser.feed("</" + QuizFileReader.wrapperTag + ">")
+        parser.close()
+
+class QuizImporter(object):
+    # The number of questions saved to the database at a time.
+    batchSize = 500
+    # Regular expression to check if a quiz title has any invalid characters.
+    quizTitleRegex = re.compile("[^a-zA-Z0-9\\.\\-\\? ]")
+
+    def __init__(self, parent) -> None:
+        """parent is the MainMenu object, which holds the database, the subject and exam board dictionaries, and the quiz browser."""
+        self.parent = parent
+        self.database = parent.database
+        # The IDs of the quizzes that have been imported, and the (quiz title, error title, error message) of the quizzes that couldn't be.
+        self.importedQuizIDs = []
+        self.importedTitles = []
+        self.errors = []
+        # The (quiz title, similar quiz's title, similarity) of imported quizzes that are very similar to a quiz already in the database.
+        self.warnings = []
+        # The subjects and exam boards added by the quiz being imported, which are added to the application's reference data once it has been saved.
+        # The casefolded name maps to the (ID, name).
+        self.newSubjects = {}
+        self.newExamBoards = {}
+
+    def validateMetadata(metadata: dict) -> None: # This is not called on an object, but the class itself.
+        """Checks the title, difficulty and tags of a quiz being imported, and raises a QuizImportError if any of them are invalid."""
+        title = metadata["title"]
+        if(len(title) < 3):
+            raise QuizImportError("Title error", "Quiz title is too short, it should be at least 3 characters long (currently: " + str(len(title)) + ").")
+        if(len(title) > 70):
+            raise QuizImportError("Title error", "Quiz title is too long, it should be at most 70 characters long (currently: " + str(len(title)) + ").")
+        # Run the title through the regular expression, if the title is changed by it then it contains invalid characters and so has failed the format check.
+        if(QuizImporter.quizTitleRegex.sub("", title) != title):
+            raise QuizImportError("Title error", "Quiz title contains invalid characters, it should only contain english letters, numbers, spaces, dashes, question marks, or full stops/periods.")
+        # Presence check on difficulty.
+        if(not metadata["difficulty"]):
+            raise QuizImportError("Difficulty error", "No difficulty has been set for this quiz.")
+        try:
+            float(metadata["difficulty"])
+        except ValueError:
+            raise QuizImportError("Difficulty error", "The quiz's difficulty isn't a number.")
+        # Length check on tags.
+        tagList = ",".join(metadata["tags"])
+        if(len(tagList) > 150):
+            raise QuizImportError("Tags error", "Tag list is too long, it should be at most 150 characters long (currently: " + str(len(tagList)) + ").")
+
+    def getFacetID(self, name: str, referenceList, newValues: dict) -> int:
+        """
+        Returns the ID of the subject or exam board with the given name (ignoring case), adding it to the database if it isn't found.
+        referenceList is the application's ReferenceList of subjects or exam boards, and newValues holds the names added by the quiz being imported.
+        """
+        if(name == None):
+            return -1
+        # Look the name up in the application's names, and then in the ones just added.
+        id = referenceList.find(name)
+        if(id != None):
+            return id
+        if(name.casefold() not in newValues):
+            # If the name isn't found, create it in the database, and use its ID. It is only added to the reference data once the quiz has been saved.
+            newValues[name.casefold()] = (referenceList.insertName(name), name)
+        return newValues[name.casefold()][0]
+
+    def importQuiz(self, metadata: dict, events) -> int:
+        """
+        Saves the quiz with the given details, reading its questions from the events of a QuizFileReader and saving them in batches, and returns the new quiz's ID.
+        Everything is done in one transaction, so if the quiz fails to import (raising a QuizImportError) none of it is saved.
+        """
+        QuizImporter.validateMetadata(metadata)
+        title = metadata["title"]
+        with self.database.transaction():
+            subjectID = self.getFacetID(metadata["subjectName"], self.parent.referenceData.subjects, self.newSubjects)
+            examBoardID = self.getFacetID(metadata["examBoardName"], self.parent.referenceData.examBoards, self.newExamBoards)
+            # The quiz record is added first so the questions can be given its ID, and its number of questions and hash are set once they have all been read.
+            self.database.execute("INSERT INTO `Quizzes` (QuizName, SubjectID, ExamboardID, AmountOfQuestions, TagList, Difficulty, Hash) VALUES (?,?,?,?,?,?,?);",
+                    title, float(subjectID) if subjectID != -1 else None, float(examBoardID) if examBoardID != -1 else None, 0.0,
+                    ",".join(metadata["tags"]), float(metadata["difficulty"]), "")
+            quizID = self.database.execute("SELECT @@IDENTITY;")[0][0]
+            # The quiz's content hash is worked out a question at a time.
+            hasher = quiz.QuizHash(title, metadata["difficulty"])
+            # Its similarity signature is worked out at the same time, so near-duplicates can be found.
+            signature = duplicates.MinHashSignature()
+            numberOfQuestions = 0
+            batch = []
+            for event, value in events:
+                if(event == "end"):
+                    break
+                if(event == "invalid"):
+                    raise QuizImportError("Import error", value)
+                check = value.validate()
+                if(check):
+                    # If the question is invalid, stop importing this quiz.
+                    raise QuizImportError("Question error", "Question \"" + str(value.question) + "\": " + check)
+                value.quizID = quizID
+                hasher.addQuestion(value)
+                signature.addQuestion(value)
+                numberOfQuestions += 1
+                batch.append(value)
+                if(len(batch) >= QuizImporter.batchSize):
+                    quiz.Question.addManyToDatabase(batch, self.database)
+                    batch = []
+            if(batch):
+                quiz.Question.addManyToDatabase(batch, self.database)
+            quizHash = hasher.hexdigest()
+            # Check the database to see if an identical quiz is in there already.
+            if(self.database.execute("SELECT `QuizID` FROM `Quizzes` WHERE `Hash` = ? AND `QuizID` <> ?;", quizHash, float(quizID))):
+                raise QuizImportError("Quiz error", "An identical quiz is already in the database.")
+            self.database.execute("UPDATE `Quizzes` SET `AmountOfQuestions` = ?, `Hash` = ? WHERE `QuizID` = ?;", float(numberOfQuestions), quizHash, float(quizID))
+            # A quiz that is nearly the same as one already in the database is still imported, but the user is warned about it.
+            similar = self.parent.duplicates.findSimilar(signature, quizID)
+            if(similar):
+                similarName = self.database.execute("SELECT `QuizName` FROM `Quizzes` WHERE `QuizID` = ?;", float(similar[0][0]))[0][0]
+                self.warnings.append((title, similarName, similar[0][1]))
+            self.parent.duplicates.addQuiz(quizID, signature)
+        return quizID
+
+    def addNewFacets(self) -> None:
+        """Adds the subjects and exam boards created by the last imported quiz to the application's reference data, which updates the quiz browser's filters."""
+        for id, name in self.newSubjects.values():
+            self.parent.referenceData.subjects.register(id, name)
+            print("Subject: " + name + " added.")
+        for id, name in self.newExamBoards.values():
+            self.parent.referenceData.examBoards.register(id, name)
+            print("Exam board: " + name + " added.")
+
+    def importFile(self, filename: str) -> list:
+        """Imports every quiz in the given file, and returns the list of the imported quizzes' IDs. Quizzes that can't be imported are added to self.errors."""
+        reader = QuizFileReader(filename)
+        # The same iterator is used here and by importQuiz, so the file is only read once.
+        events = iter(reader)
+        title = None
+        try:
+            for event, value in events:
+                if(event != "quiz"):
+                    # A quiz that couldn't be read.
+                    self.errors.append((None, "Import error", value if event == "invalid" else "Invalid quiz XML file."))
+                    reader.skipQuiz()
+                    continue
+                title = value["title"]
+                self.newSubjects = {}
+                self.newExamBoards = {}
+                try:
+                    self.importedQuizIDs.append(self.importQuiz(value, events))
+                    self.importedTitles.append(title)
+                    self.addNewFacets()
+                except QuizImportError as e:
+                    self.errors.append((title, e.title, e.message))
+                    reader.skipQuiz()
+                title = None
+        except (et.ParseError, UnicodeDecodeError, LookupError):
+            # If the file isn't valid XML, the quizzes before the error have still been imported.
+            self.errors.append((title, "Import error", "Invalid quiz XML file."))
+        if(not self.importedQuizIDs and not self.errors):
+            # If the file didn't have any quizzes in it.
+            self.errors.append((None, "Import error", "Invalid quiz XML file."))
+        return self.importedQuizIDs
+
+    def showResults(self) -> None:
+        """Shows the user a message saying which quizzes were imported, and the errors for those that weren't."""
+        if(len(self.importedQuizIDs) + len(self.errors) == 1):
+            # If the file had one quiz, show the same messages as importing a single quiz has always shown.
+            if(self.errors):
+                tkmb.showerror(self.errors[0][1], self.errors[0][2], parent = self.parent.tk)
+            else:
+                message = "Quiz \"" + self.importedTitles[0] + "\" has been successfully imported."
+                if(self.warnings):
+                    message += "\n\nIt is very similar to the quiz \"" + self.warnings[0][1] + "\" ({:.0f}% similar).".format(self.warnings[0][2] * 100)
+                tkmb.showinfo("Quiz import", message, parent = self.parent.tk)
+            return
+        message = str(len(self.importedQuizIDs)) + " quizzes have been successfully imported."
+        if(self.errors):
+            message += "\n\n" + str(len(self.errors)) + " quizzes couldn't be imported:"
+            # Only the first few errors are shown, so the message fits on the screen.
+            for title, errorTitle, errorMessage in self.errors[:10]:
+                message += "\n" + (("\"" + title + "\": ") if title else "") + errorMessage
+            if(len(self.errors) > 10):
+                message += "\n... and " + str(len(self.errors) - 10) + " more."
+        if(self.warnings):
+            message += "\n\n" + str(len(self.warnings)) + " imported quizzes are very similar to quizzes already in the database:"
+            for title, similarName, similarity in self.warnings[:10]:
+                message += "\n\"" + title + "\" is {:.0f}% similar to \"".format(similarity * 100) + similarName + "\""
+            if(len(self.warnings) > 10):
+                message += "\n... and " + str(len(self.warnings) - 10) + " more."
+        if(self.errors):
+            tkmb.showwarning("Quiz import", message, parent = self.parent.tk)
+        else:
+            tkmb.showinfo("Quiz import", message, parent = self.parent.tk)
+
+    def updateApplication(self) -> None:
+        """Adds the imported quizzes to the catalog and the search index, and shows them on the quiz browser."""
+        if(self.importedQuizIDs):
+            self.parent.quizzesChanged(self.importedQuizIDs)
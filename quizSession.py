@@ -0,0 +1,207 @@
+"""
+This file contains the QuizSession class, which holds all the logic of a user doing a quiz, without any of the interface.
+The session shuffles the answers, times each question, handles pausing, marks the answers, and saves the result to the database.
+The quiz window (quizGui.ActiveQuizDialog) drives a session from the user's clicks, and the simulation harness drives sessions with virtual students.
+"""
+
+# Time is used for the monotonic clock, which can't go backwards if the system clock is changed.
+import time
+# Datetime is used for the date the quiz was completed.
+import datetime
+
+class QuizStates:
+    """Stored in QuizSession.state, it holds one of these integers, which is the state of the quiz being done."""
+    notStarted = -1
+    answering = 0
+    answered = 1
+    finished = 2
+    closed = 3
+
+class QuizSession(object):
+    # The number of seconds before the next question is shown, after a correct answer and after a wrong answer (or running out of time).
+    correctAnswerDelay = 1
+    wrongAnswerDelay = 5
+    # The answer index given when the user opens the help, which is never correct as there is no 5th answer.
+    helpAnswer = 4
+
+    def __init__(self, quiz: 'Quiz', user: 'User', clock = time.monotonic) -> None:
+        """
+        quiz is the Quiz object being done, and user is the User object doing it.
+        clock is the function that gives the current time in seconds, which can be replaced by the simulation harness so no real time has to pass.
+        """
+        self.quiz = quiz
+        self.user = user
+        self.clock = clock
+        # The current state of the quiz, one of the QuizStates values.
+        self.state = QuizStates.notStarted
+        # The number of the question being shown, and the number of questions in the quiz.
+        self.questionNumber = 0
+        self.numberOfQuestions = quiz.getQuestionCount()
+        # The questions are streamed from the quiz one at a time, so a big quiz doesn't have to be loaded all at once.
+        self.questionStream = quiz.iterQuestions()
+        self.currentQuestion = None
+        # The shuffled answers to the current question, and the index of the correct answer in them.
+        self.answers = []
+        self.correctAnswer = -1
+        # The answer given to the current question, None if they ran out of time.
+        self.givenAnswer = None
+        # The number of answers that have been answered correctly.
+        self.numberOfCorrectAnswers = 0
+        # The time it took to answer each question, in seconds.
+        self.timesTakenToAnswer = [None for i in range(self.numberOfQuestions)]
+        # The time that the quiz started, and the time that the current question was shown.
+        self.startTime = None
+        self.currentQuestionStartTime = None
+        # The time that the quiz will move on from the current question after it has been answered.
+        self.answerTime = None
+        # Whether the quiz is paused, the time it was paused at, and the total time that the quiz has been paused for, in seconds.
+        self.paused = False
+        self.pausedAt = None
+        self.totalPausedDuration = 0
+        # The total duration of the quiz and the average time to answer a question, in seconds, which are set when the quiz is finished.
+        self.totalDuration = None
+        self.averageAnswerTime = None
+        # The record added to the Results table when the result is saved, in the same order as the table's columns.
+        self.result = None
+
+    def getTimeAllowed(self) -> float:
+        """Returns the number of seconds allowed to answer each question, or None if the user has timers turned off."""
+        if(not self.user.timeConfig):
+            return None
+        if(self.user.timeConfig == 1):
+            # If the timer setting is set to long, time allowed is 5 seconds + 5 per difficulty level.
+            return 5 + self.quiz.difficulty * 5
+        # If the timer is set to short, it is half the long time.
+        return 2.5 + self.quiz.difficulty * 2.5
+
+    def getCurrentQuestion(self) -> 'Question':
+        """Returns the Question object currently being shown."""
+        return self.currentQuestion
+
+    def getTimeRemaining(self) -> float:
+        """Returns the number of seconds left to answer the current question, or None if there is no time limit."""
+        timeAllowed = self.getTimeAllowed()
+        if(timeAllowed == None or self.state != QuizStates.answering):
+            return None
+        # While paused, the time remaining stays as it was when the quiz was paused.
+        now = self.pausedAt if self.paused else self.clock()
+        return self.currentQuestionStartTime + timeAllowed - now
+
+    def start(self) -> None:
+        """Starts the quiz, showing the first question."""
+        self.startTime = self.clock()
+        self.showQuestion()
+
+    def showQuestion(self) -> None:
+        """Moves to the question at self.questionNumber, or finishes the quiz if there are no questions left."""
+        if(self.questionNumber == self.numberOfQuestions):
+            self.finish()
+            return
+        # Gets the next question from the stream, and its shuffled answers.
+        self.currentQuestion = next(self.questionStream, None)
+        if(self.currentQuestion == None):
+            # If the quiz ran out of questions early, the quiz record has the wrong amount of questions.
+            raise Exception("The number of questions in the quiz found doesn't match the expected amount of questions for that quiz.")
+        self.answers, self.correctAnswer = self.currentQuestion.getShuffledAnswers()
+        self.givenAnswer = None
+        self.currentQuestionStartTime = self.clock()
+        self.answerTime = None
+        self.state = QuizStates.answering
+
+    def answer(self, answer: int) -> bool:
+        """
+        Marks the current question with the given answer index, and returns whether it was correct.
+        answer is None if the user ran out of time, and QuizSession.helpAnswer if they opened the help.
+        If the question can't be answered right now (e.g. it is paused or already answered), nothing happens and None is returned.
+        """
+        if(self.state != QuizStates.answering or self.paused):
+            return None
+        # Change the state so the user can't change their answer.
+        self.state = QuizStates.answered
+        self.givenAnswer = answer
+        now = self.clock()
+        # Record the time taken to answer the question
+        self.timesTakenToAnswer[self.questionNumber] = now - self.currentQuestionStartTime
+        correct = answer == self.correctAnswer
+        if(correct):
+            self.numberOfCorrectAnswers += 1
+        # The next question is shown sooner after a correct answer, so the user has time to see the right answer after a wrong one.
+        self.answerTime = now + (QuizSession.correctAnswerDelay if correct else QuizSession.wrongAnswerDelay)
+        return correct
+
+    def useHelp(self) -> bool:
+        """Marks the current question as wrong because the user opened the help. Returns False if the question couldn't be answered right now."""
+        return self.answer(QuizSession.helpAnswer) != None
+
+    def checkTime(self) -> bool:
+        """Marks the current question as wrong if the user has run out of time, and returns whether they had."""
+        timeRemaining = self.getTimeRemaining()
+        if(timeRemaining != None and timeRemaining <= 0 and not self.paused):
+            self.answer(None)
+            return True
+        return False
+
+    def getTimeUntilNextQuestion(self) -> float:
+        """Returns the number of seconds until the next question should be shown, or None if the current question hasn't been answered."""
+        if(self.state != QuizStates.answered or self.paused):
+            return None
+        return self.answerTime - self.clock()
+
+    def nextQuestion(self) -> None:
+        """Moves on to the next question (or finishes the quiz), once the current one has been answered."""
+        if(self.state != QuizStates.answered or self.paused):
+            return
+        self.questionNumber += 1
+        self.showQuestion()
+
+    def pause(self) -> None:
+        """Pauses the quiz, which stops the question's timer and the delay before the next question."""
+        if(self.paused or self.state not in (QuizStates.answering, QuizStates.answered)):
+            return
+        self.paused = True
+        self.pausedAt = self.clock()
+
+    def resume(self) -> None:
+        """Unpauses the quiz. The time spent paused is added on to the question's start time and the answer delay, so it isn't counted."""
+        if(not self.paused):
+            return
+        self.paused = False
+        pausedDuration = self.clock() - self.pausedAt
+        self.pausedAt = None
+        self.totalPausedDuration += pausedDuration
+        self.currentQuestionStartTime += pausedDuration
+        if(self.answerTime != None):
+            self.answerTime += pausedDuration
+
+    def finish(self) -> None:
+        """Works out the final statistics, once every question has been answered."""
+        self.state = QuizStates.finished
+        # Calculate the average time to answer a question.
+        self.averageAnswerTime = sum(self.timesTakenToAnswer) / len(self.timesTakenToAnswer)
+        self.totalDuration = self.clock() - self.totalPausedDuration - self.startTime
+
+    def close(self) -> None:
+        """Marks the session as closed, e.g. when the quiz window is closed."""
+        self.state = QuizStates.closed
+
+    def getScore(self) -> float:
+        """Returns the score as a fraction of the questions answered correctly, between 0 and 1."""
+        return self.numberOfCorrectAnswers / self.numberOfQuestions
+
+    def saveResult(self, database, rollups = None) -> int:
+        """
+        Adds the result of the finished quiz to the Results table, and returns the new result's ID.
+        rollups is the StatisticsRollups object, if given the user's statistics totals are updated in the same transaction.
+        """
+        if(self.state != QuizStates.finished):
+            raise ValueError("The quiz hasn't been finished, so there is no result to save.")
+        dateCompleted = datetime.datetime.now()
+        with database.transaction():
+            database.execute("INSERT INTO `Results` (UserID, QuizID, Score, DateCompleted, AverageAnswerTime, TotalDuration) VALUES (?, ?, ?, ?, ?, ?);",
+                    float(self.user.id), float(self.quiz.id), self.getScore(), dateCompleted, self.averageAnswerTime, self.totalDuration)
+            # Getting the ID of the record that was just added.
+            resultID = database.execute("SELECT @@IDENTITY;")[0][0]
+            self.result = (resultID, self.user.id, self.quiz.id, self.getScore(), dateCompleted, self.averageAnswerTime, self.totalDuration)
+            if(rollups != None):
+                rollups.recordResult(self.user.id, self.quiz, resultID, self.getScore(), self.averageAnswerTime, self.totalDuration)
+            return resultID
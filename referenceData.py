@@ -0,0 +1,119 @@
+"""
+This file contains the ReferenceList class, which holds the subjects or the exam boards, and the ReferenceData class, which holds both of them.
+They are loaded from the database once, when the application starts. As well as the ID to name and name to ID dictionaries,
+each list keeps a dictionary of the casefolded names, so a name is matched ignoring case without going through every name.
+Subjects and exam boards are added and removed through the lists, which update the database and the dictionaries,
+and then tell the listeners (e.g. the quiz browser and any open windows) so they can update just what has changed.
+"""
+
+class ReferenceList(object):
+    def __init__(self, database, table: str, idColumn: str, nameColumn: str, quizColumn: str) -> None:
+        """
+        database is the DatabaseManager object, table is the name of the table the names are stored in, and idColumn and nameColumn are its columns.
+        quizColumn is the column of the Quizzes table that holds the IDs, which is cleared when a name is removed.
+        """
+        self.database = database
+        self.table = table
+        self.idColumn = idColumn
+        self.nameColumn = nameColumn
+        self.quizColumn = quizColumn
+        # The ID maps to the name, and the name maps to the ID. These dictionaries are only ever changed, never replaced,
+        # so they can be shared with the rest of the application (e.g. MainMenu.subjectDictionary).
+        self.names = {}
+        self.ids = {}
+        # The casefolded name maps to the ID, for matching names ignoring case.
+        self.casefoldedIDs = {}
+        # The functions run when a name is added or removed, which are given the list, the ID, the name, and whether it was added.
+        self.listeners = []
+
+    def load(self) -> None:
+        """Loads all the names from the database, replacing any that are already loaded."""
+        self.names.clear()
+        self.ids.clear()
+        self.casefoldedIDs.clear()
+        for id, name in self.database.execute("SELECT `" + self.idColumn + "`, `" + self.nameColumn + "` FROM `" + self.table + "`;"):
+            self.names[id] = name
+            self.ids[name] = id
+            self.casefoldedIDs[name.casefold()] = id
+
+    def find(self, name: str) -> int:
+        """Returns the ID of the name (ignoring case), or None if it isn't in the list."""
+        return self.casefoldedIDs.get(name.casefold(), None)
+
+    def getName(self, id: int, default: str = None) -> str:
+        """Returns the name with the given ID, or the default if there isn't one."""
+        return self.names.get(id, default)
+
+    def insertName(self, name: str) -> int:
+        """
+        Adds a name to the database only, and returns its new ID. This is used inside a transaction that may be rolled back, e.g. by the quiz importer,
+        and once the transaction has been saved the name should be given to register.
+        """
+        self.database.execute("INSERT INTO `" + self.table + "` (" + self.nameColumn + ") VALUES (?);", name)
+        return self.database.execute("SELECT @@IDENTITY;")[0][0]
+
+    def register(self, id: int, name: str) -> None:
+        """Adds a name that has been saved in the database to the list, and tells the listeners."""
+        self.names[id] = name
+        self.ids[name] = id
+        self.casefoldedIDs[name.casefold()] = id
+        self.notify(id, name, True)
+
+    def add(self, name: str) -> int:
+        """Adds a new name to the database and to the list, tells the listeners, and returns its ID."""
+        id = self.insertName(name)
+        self.register(id, name)
+        return id
+
+    def remove(self, id: int) -> None:
+        """Removes a name from the database and the list, unbinding the quizzes that have it, and then tells the listeners."""
+        with self.database.transaction():
+            self.database.execute("UPDATE `Quizzes` SET " + self.quizColumn + " = null WHERE " + self.quizColumn + " = ?;", float(id))
+            self.database.execute("DELETE FROM `" + self.table + "` WHERE " + self.idColumn + " = ?;", float(id))
+        name = self.names.pop(id)
+        del self.ids[name]
+        del self.casefoldedIDs[name.casefold()]
+        self.notify(id, name, False)
+
+    def addListener(self, listener) -> None:
+        """Adds a function that is run whenever a name is added or removed, which is given the list, the ID, the name, and whether it was added."""
+        self.listeners.append(listener)
+
+    def removeListener(self, listener) -> None:
+        """Stops a function from being run when names are added or removed, e.g. when its window is closed."""
+        if(listener in self.listeners):
+            self.listeners.remove(listener)
+
+    def notify(self, id: int, name: str, added: bool) -> None:
+        """Runs each of the listeners."""
+        # A copy of the list is used, in case a listener removes itself.
+        for i in list(self.listeners):
+            i(self, id, name, added)
+
+class ReferenceData(object):
+    def __init__(self, database) -> None:
+        """database is the DatabaseManager object the subjects and exam boards are loaded from."""
+        self.subjects = ReferenceList(database, "Subjects", "SubjectID", "SubjectName", "SubjectID")
+        self.examBoards = ReferenceList(database, "Examboards", "ExamboardID", "EName", "ExamboardID")
+        self.load()
+
+    def load(self) -> None:
+        """Loads the subjects and exam boards from the database."""
+        self.subjects.load()
+        self.examBoards.load()
+
+    def addListener(self, listener) -> None:
+        """Adds a function that is run whenever a subject or exam board is added or removed."""
+        self.subjects.addListener(listener)
+        self.examBoards.addListener(listener)
+
+    def removeListener(self, listener) -> None:
+        """Stops a function from being run when subjects and exam boards are added or removed."""
+        self.subjects.removeListener(listener)
+        self.examBoards.removeListener(listener)
+
+    def listenWhileOpen(self, window, listener) -> None:
+        """Adds a listener for as long as the given tkinter window is open, so a window's listener is removed when it is closed."""
+        self.addListener(listener)
+        # The Destroy event is also sent for each widget in the window, so only the window's own event removes the listener.
+        window.bind("<Destroy>", lambda e: self.removeListener(listener) if e.widget == window else None, add = "+")
@@ -0,0 +1,280 @@
+"""
+This file contains the StatisticsRollups class, which keeps running totals of each user's results so the statistics window doesn't have to read every result.
+The totals are kept for each combination of subject, exam board and difficulty that the user has done, so the totals for any filter are found by adding up a few rows,
+however many results the user has. The last three scores on each quiz are kept too, for the list of quizzes in need of review.
+The totals are updated in the same transaction that adds each result. If a quiz is deleted or moved to another subject, exam board or difficulty,
+only that quiz's results are taken off the totals they were in (and added to their new ones), so no user's whole history is read again.
+A user's totals are only built from all of their results the first time they are needed.
+"""
+
+# Maths module is used for the floor function, to work out each score's percentage band.
+import math as maths
+
+class ResultSummary(object):
+    """The totals of a set of results, which the averages and the score band chart are worked out from."""
+    # The number of percentage bands, from 0-9% to 90-99% and finally 100%.
+    numberOfBands = 11
+
+    def __init__(self) -> None:
+        self.attempts = 0
+        self.totalScore = 0.0
+        self.totalAnswerTime = 0.0
+        self.totalDuration = 0.0
+        # The number of results in each percentage band.
+        self.scoreBands = [0] * ResultSummary.numberOfBands
+
+    def addResult(self, score: float, averageAnswerTime: float, totalDuration: float) -> None:
+        """Adds a single result to the totals."""
+        self.attempts += 1
+        self.totalScore += score
+        self.totalAnswerTime += averageAnswerTime or 0
+        self.totalDuration += totalDuration or 0
+        self.scoreBands[min(maths.floor(score * 10), ResultSummary.numberOfBands - 1)] += 1
+
+    def addSummary(self, other: 'ResultSummary', sign: int = 1) -> None:
+        """Adds the totals of another summary to these totals, or takes them away if sign is -1."""
+        self.attempts += sign * other.attempts
+        self.totalScore += sign * other.totalScore
+        self.totalAnswerTime += sign * other.totalAnswerTime
+        self.totalDuration += sign * other.totalDuration
+        for i in range(ResultSummary.numberOfBands):
+            self.scoreBands[i] += sign * other.scoreBands[i]
+
+    def addRow(self, row: tuple) -> None:
+        """Adds the totals from a UserStatistics row (Attempts, TotalScore, TotalAnswerTime, TotalDuration, ScoreBands) to these totals."""
+        self.attempts += row[0]
+        self.totalScore += row[1]
+        self.totalAnswerTime += row[2]
+        self.totalDuration += row[3]
+        bands = ResultSummary.decodeBands(row[4])
+        for i in range(ResultSummary.numberOfBands):
+            self.scoreBands[i] += bands[i]
+
+    def getAverageScore(self) -> float:
+        return self.totalScore / self.attempts if self.attempts else 0
+
+    def getAverageAnswerTime(self) -> float:
+        return self.totalAnswerTime / self.attempts if self.attempts else 0
+
+    def getAverageDuration(self) -> float:
+        return self.totalDuration / self.attempts if self.attempts else 0
+
+    def encodeBands(bands: list) -> str: # This is not called on an object, but the class itself.
+        """Turns a list of band counts into the comma-separated text stored in the database."""
+        return ",".join([str(i) for i in bands])
+
+    def decodeBands(text: str) -> list: # This is not called on an object, but the class itself.
+        """Turns the comma-separated text stored in the database back into a list of band counts."""
+        bands = [int(i) for i in text.split(",")] if text else []
+        return (bands + [0] * ResultSummary.numberOfBands)[:ResultSummary.numberOfBands]
+
+class StatisticsRollups(object):
+    # The value stored in place of a missing subject, exam board or difficulty.
+    noValue = -1
+    # Each user whose totals have been built has a row with this value as its subject, exam board and difficulty.
+    # This tells apart a user whose totals haven't been built from a user who has no results.
+    builtMarker = -2
+    # The number of recent scores kept for each quiz.
+    recentScoresKept = 3
+    # The statements that create the tables, using column types that both Access and SQLite understand.
+    schema = [
+        "CREATE TABLE `UserStatistics` (`UserID` INTEGER, `SubjectID` INTEGER, `ExamboardID` INTEGER, `Difficulty` INTEGER, `Attempts` INTEGER, " +
+                "`TotalScore` DOUBLE, `TotalAnswerTime` DOUBLE, `TotalDuration` DOUBLE, `ScoreBands` VARCHAR(100));",
+        "CREATE INDEX `UserStatisticsUserIndex` ON `UserStatistics` (`UserID`);",
+        "CREATE TABLE `UserQuizStatistics` (`UserID` INTEGER, `QuizID` INTEGER, `RecentScores` VARCHAR(100), `LastResultID` INTEGER);",
+        "CREATE INDEX `UserQuizStatisticsUserIndex` ON `UserQuizStatistics` (`UserID`, `QuizID`);",
+    ]
+
+    def __init__(self, database) -> None:
+        """database is the DatabaseManager object that the totals are stored in."""
+        self.database = database
+        self.ensureTables()
+
+    def ensureTables(self) -> None:
+        """Creates the tables if they aren't in the database yet, e.g. the first time an older database is opened."""
+        try:
+            self.database.execute("SELECT TOP 1 * FROM `UserStatistics`;")
+        except Exception:
+            with self.database.transaction():
+                for i in StatisticsRollups.schema:
+                    self.database.execute(i)
+
+    def getKey(subjectID: int, examBoardID: int, difficulty: int) -> tuple: # This is not called on an object, but the class itself.
+        """Returns the subject, exam board and difficulty as stored in the UserStatistics table, with missing values replaced."""
+        return tuple([float(i) if i != None and i != -1 else float(StatisticsRollups.noValue) for i in (subjectID, examBoardID, difficulty)])
+
+    def isBuilt(self, userID: int) -> bool:
+        """Returns whether the given user's totals have been built."""
+        marker = float(StatisticsRollups.builtMarker)
+        return len(self.database.execute("SELECT `UserID` FROM `UserStatistics` WHERE `UserID` = ? AND `SubjectID` = ? AND `ExamboardID` = ? AND `Difficulty` = ?;",
+                float(userID), marker, marker, marker)) > 0
+
+    def ensureBuilt(self, userID: int) -> None:
+        """Builds the given user's totals if they haven't been built."""
+        if(not self.isBuilt(userID)):
+            self.rebuildUser(userID)
+
+    def rebuildUser(self, userID: int) -> None:
+        """Works out the given user's totals from all of their results, replacing any totals already stored."""
+        rows = self.database.execute("SELECT `Results`.`ResultID`, `Results`.`QuizID`, `Results`.`Score`, `Results`.`AverageAnswerTime`, `Results`.`TotalDuration`, " +
+                "`Quizzes`.`SubjectID`, `Quizzes`.`ExamboardID`, `Quizzes`.`Difficulty` FROM `Results` LEFT JOIN `Quizzes` ON `Results`.`QuizID` = `Quizzes`.`QuizID` " +
+                "WHERE `Results`.`UserID` = ? ORDER BY `Results`.`ResultID` DESC;", float(userID))
+        summaries = {}
+        recentScores = {}
+        for i in rows:
+            key = StatisticsRollups.getKey(i[5], i[6], i[7])
+            if(key not in summaries):
+                summaries[key] = ResultSummary()
+            summaries[key].addResult(i[2], i[3], i[4])
+            # The results are newest first, so the first few results found for each quiz are its most recent.
+            if(i[1] not in recentScores):
+                recentScores[i[1]] = [i[0], []]
+            if(len(recentScores[i[1]][1]) < StatisticsRollups.recentScoresKept):
+                recentScores[i[1]][1].append(i[2])
+        marker = float(StatisticsRollups.builtMarker)
+        with self.database.transaction():
+            self.database.execute("DELETE FROM `UserStatistics` WHERE `UserID` = ?;", float(userID))
+            self.database.execute("DELETE FROM `UserQuizStatistics` WHERE `UserID` = ?;", float(userID))
+            statisticsRows = [[float(userID)] + list(k) + [v.attempts, v.totalScore, v.totalAnswerTime, v.totalDuration, ResultSummary.encodeBands(v.scoreBands)]
+                    for k, v in summaries.items()]
+            statisticsRows.append([float(userID), marker, marker, marker, 0, 0.0, 0.0, 0.0, ""])
+            self.database.executeMany("INSERT INTO `UserStatistics` (UserID, SubjectID, ExamboardID, Difficulty, Attempts, TotalScore, TotalAnswerTime, TotalDuration, ScoreBands) " +
+                    "VALUES (?,?,?,?,?,?,?,?,?);", statisticsRows)
+            if(recentScores):
+                self.database.executeMany("INSERT INTO `UserQuizStatistics` (UserID, QuizID, RecentScores, LastResultID) VALUES (?,?,?,?);",
+                        [[float(userID), float(k), ",".join([repr(j) for j in v[1]]), float(v[0])] for k, v in recentScores.items()])
+
+    def recordResult(self, userID: int, quiz: 'Quiz', resultID: int, score: float, averageAnswerTime: float, totalDuration: float) -> None:
+        """
+        Adds a newly saved result to the user's totals. This should be run in the same transaction as the INSERT into the Results table.
+        If the user's totals haven't been built, nothing is done, as the new result will be counted when they are built.
+        """
+        if(not self.isBuilt(userID)):
+            return
+        with self.database.transaction():
+            summary = ResultSummary()
+            summary.addResult(score, averageAnswerTime, totalDuration)
+            self.changeTotals(userID, StatisticsRollups.getKey(quiz.subject, quiz.examBoard, quiz.difficulty), summary)
+            # Then add the score to the front of the quiz's recent scores.
+            rows = self.database.execute("SELECT `RecentScores` FROM `UserQuizStatistics` WHERE `UserID` = ? AND `QuizID` = ?;", float(userID), float(quiz.id))
+            recentScores = ([repr(score)] + (rows[0][0].split(",") if rows and rows[0][0] else []))[:StatisticsRollups.recentScoresKept]
+            if(rows):
+                self.database.execute("UPDATE `UserQuizStatistics` SET `RecentScores` = ?, `LastResultID` = ? WHERE `UserID` = ? AND `QuizID` = ?;",
+                        ",".join(recentScores), float(resultID), float(userID), float(quiz.id))
+            else:
+                self.database.execute("INSERT INTO `UserQuizStatistics` (UserID, QuizID, RecentScores, LastResultID) VALUES (?,?,?,?);",
+                        float(userID), float(quiz.id), ",".join(recentScores), float(resultID))
+
+    def changeTotals(self, userID: int, key: tuple, summary: ResultSummary, sign: int = 1) -> None:
+        """
+        Adds a summary to the user's totals for the given key (from getKey), or takes it away if sign is -1.
+        The row is added if the user doesn't have one for the key, and removed if no attempts are left in it.
+        """
+        rows = self.database.execute("SELECT `Attempts`, `TotalScore`, `TotalAnswerTime`, `TotalDuration`, `ScoreBands` FROM `UserStatistics` " +
+                "WHERE `UserID` = ? AND `SubjectID` = ? AND `ExamboardID` = ? AND `Difficulty` = ?;", float(userID), *key)
+        total = ResultSummary()
+        if(rows):
+            total.addRow(rows[0])
+        total.addSummary(summary, sign)
+        values = [total.attempts, total.totalScore, total.totalAnswerTime, total.totalDuration, ResultSummary.encodeBands(total.scoreBands)]
+        if(rows and total.attempts <= 0):
+            self.database.execute("DELETE FROM `UserStatistics` WHERE `UserID` = ? AND `SubjectID` = ? AND `ExamboardID` = ? AND `Difficulty` = ?;", float(userID), *key)
+        elif(rows):
+            self.database.execute("UPDATE `UserStatistics` SET `Attempts` = ?, `TotalScore` = ?, `TotalAnswerTime` = ?, `TotalDuration` = ?, `ScoreBands` = ? " +
+                    "WHERE `UserID` = ? AND `SubjectID` = ? AND `ExamboardID` = ? AND `Difficulty` = ?;", *(values + [float(userID)] + list(key)))
+        elif(total.attempts > 0):
+            self.database.execute("INSERT INTO `UserStatistics` (UserID, SubjectID, ExamboardID, Difficulty, Attempts, TotalScore, TotalAnswerTime, TotalDuration, ScoreBands) " +
+                    "VALUES (?,?,?,?,?,?,?,?,?);", *([float(userID)] + list(key) + values))
+
+    def getQuizSummaries(self, quizID: int) -> dict:
+        """
+        Returns the totals of each built user's results on the given quiz, as a dictionary of the UserID mapped to a ResultSummary.
+        Users whose totals haven't been built are left out, as the quiz's results are counted as they are when their totals are built.
+        """
+        marker = float(StatisticsRollups.builtMarker)
+        builtUsers = set([i[0] for i in self.database.execute("SELECT DISTINCT `Results`.`UserID` FROM `Results` INNER JOIN `UserStatistics` ON `Results`.`UserID` = `UserStatistics`.`UserID` " +
+                "WHERE `Results`.`QuizID` = ? AND `UserStatistics`.`SubjectID` = ? AND `UserStatistics`.`ExamboardID` = ? AND `UserStatistics`.`Difficulty` = ?;",
+                float(quizID), marker, marker, marker)])
+        summaries = {}
+        if(builtUsers):
+            for i in self.database.execute("SELECT `UserID`, `Score`, `AverageAnswerTime`, `TotalDuration` FROM `Results` WHERE `QuizID` = ?;", float(quizID)):
+                if(i[0] in builtUsers):
+                    summaries.setdefault(i[0], ResultSummary()).addResult(i[1], i[2], i[3])
+        return summaries
+
+    def moveQuiz(self, quizID: int, oldValues: tuple, newValues: tuple) -> None:
+        """
+        Moves the given quiz's results from the totals of its old subject, exam board and difficulty to its new ones, e.g. after it has been edited.
+        oldValues and newValues are (SubjectID, ExamboardID, Difficulty) tuples. Only the quiz's own results are read, rather than each user's whole history.
+        """
+        oldKey = StatisticsRollups.getKey(*oldValues)
+        newKey = StatisticsRollups.getKey(*newValues)
+        if(oldKey == newKey):
+            return
+        with self.database.transaction():
+            for userID, summary in self.getQuizSummaries(quizID).items():
+                self.changeTotals(userID, oldKey, summary, -1)
+                self.changeTotals(userID, newKey, summary)
+
+    def removeQuiz(self, quizID: int) -> None:
+        """
+        Takes the given quiz's results off the totals of the users that have done it, and removes its recent scores, e.g. when it is being deleted.
+        This must be run before the quiz and its results are deleted, as they are read to find what to take off.
+        """
+        record = self.database.execute("SELECT `SubjectID`, `ExamboardID`, `Difficulty` FROM `Quizzes` WHERE `QuizID` = ?;", float(quizID))
+        # The results of a quiz that is missing from the Quizzes table are counted without a subject, exam board or difficulty, as they are when the totals are built.
+        key = StatisticsRollups.getKey(*record[0]) if record else StatisticsRollups.getKey(None, None, None)
+        with self.database.transaction():
+            for userID, summary in self.getQuizSummaries(quizID).items():
+                self.changeTotals(userID, key, summary, -1)
+            self.database.execute("DELETE FROM `UserQuizStatistics` WHERE `QuizID` = ?;", float(quizID))
+
+    def clearValue(self, column: str, value: int) -> None:
+        """
+        Moves the totals for the given subject or exam board into the totals without a subject or exam board, e.g. after it has been removed and its quizzes unbound.
+        column is "SubjectID" or "ExamboardID". The totals are grouped by it, so only the totals table is changed, and no results are read.
+        """
+        position = ["SubjectID", "ExamboardID"].index(column)
+        with self.database.transaction():
+            rows = self.database.execute("SELECT `UserID`, `SubjectID`, `ExamboardID`, `Difficulty`, `Attempts`, `TotalScore`, `TotalAnswerTime`, `TotalDuration`, `ScoreBands` " +
+                    "FROM `UserStatistics` WHERE `" + column + "` = ?;", float(value))
+            self.database.execute("DELETE FROM `UserStatistics` WHERE `" + column + "` = ?;", float(value))
+            for i in rows:
+                summary = ResultSummary()
+                summary.addRow(i[4:])
+                key = list(i[1:4])
+                key[position] = float(StatisticsRollups.noValue)
+                self.changeTotals(i[0], tuple(key), summary)
+
+    def getSummary(self, userID: int, subjectID: int = None, examBoardID: int = None, difficulty: int = None) -> ResultSummary:
+        """Returns the totals of the user's results on quizzes with the given subject, exam board and difficulty. Filters that are None are not applied."""
+        self.ensureBuilt(userID)
+        clauses = ["`UserID` = ?", "`Attempts` > 0"]
+        parameters = [float(userID)]
+        for column, value in (("SubjectID", subjectID), ("ExamboardID", examBoardID), ("Difficulty", difficulty)):
+            if(value != None):
+                clauses.append("`" + column + "` = ?")
+                parameters.append(float(value))
+        summary = ResultSummary()
+        for i in self.database.execute("SELECT `Attempts`, `TotalScore`, `TotalAnswerTime`, `TotalDuration`, `ScoreBands` FROM `UserStatistics` WHERE " +
+                " AND ".join(clauses) + ";", *parameters):
+            summary.addRow(i)
+        return summary
+
+    def getRecentQuizScores(self, userID: int) -> list:
+        """Returns a list of (QuizID, list of recent scores, newest first) for every quiz the user has done, with the most recently done quiz first."""
+        self.ensureBuilt(userID)
+        rows = self.database.execute("SELECT `QuizID`, `RecentScores` FROM `UserQuizStatistics` WHERE `UserID` = ? ORDER BY `LastResultID` DESC;", float(userID))
+        return [(i[0], [float(j) for j in i[1].split(",")]) for i in rows if i[1]]
+
+    def invalidateUsers(self, userIDs: list) -> None:
+        """
+        Throws away the given users' totals, e.g. when the users are deleted. If they are still needed, they are rebuilt the next time they are used.
+        The users are removed a few hundred at a time so the statements don't get too long.
+        """
+        userIDs = list(userIDs)
+        with self.database.transaction():
+            for i in range(0, len(userIDs), 500):
+                part = [float(j) for j in userIDs[i:i + 500]]
+                self.database.execute("DELETE FROM `UserStatistics` WHERE `UserID` IN (" + ",".join(["?"] * len(part)) + ");", *part)
+                self.database.execute("DELETE FROM `UserQuizStatistics` WHERE `UserID` IN (" + ",".join(["?"] * len(part)) + ");", *part)
@@ -0,0 +1,547 @@
+"""
+This file contains the search index used by the quiz browser's search bar.
+The index is an inverted index of character trigrams (groups of three letters) over each quiz's title and tags.
+It is used to quickly find the quizzes that are likely to match a search query, and only those quizzes are then scored exactly with difflib.
+This file also contains the SearchWorker, the background thread that runs the searches for the quiz browser.
+"""
+
+# Difflib is used to compare how alike two strings are, for the exact scoring of the best candidates.
+import difflib
+# Collections is used to count how many trigrams each quiz shares with the search query.
+import collections
+# The 'math' module is used for its power and logarithm functions.
+import math as maths
+# Heapq keeps the best scored quizzes in a heap, so only the top few are ever kept in order.
+import heapq
+# Threading is used to run searches in the background, and queue is used to pass the results back to the main thread.
+import threading
+import queue
+# Time and random are used by the typed search benchmark.
+import time
+import random
+
+class SearchCancelled(Exception):
+    """Raised inside a search when a newer search has been submitted, so the old one stops early."""
+    pass
+
+def getTrigrams(word: str, finished: bool = True) -> set:
+    """
+    Returns the set of trigrams in a word. The word is padded with spaces so that short words still have trigrams,
+    and so that the start and end of a word count as part of a trigram. If the word isn't finished (e.g. it is still being typed), its end isn't padded.
+    """
+    padded = "  " + word.lower() + (" " if finished else "")
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def scoreQuiz(searchWords: list, title: str, tags: str, ratios: dict = None) -> float:
+    """
+    Works out how well a quiz matches the search words, the higher the score the better the match.
+    title is the quiz title, and tags is the quiz's comma-separated tag list.
+    ratios is an optional dictionary of (search word, word) to difflib's similarity ratio, which is used and filled in so each pair of words is only compared once.
+    """
+    if(ratios == None):
+        ratios = {}
+    score = 0
+    titleWords = title.split(" ")
+    tagList = tags.split(",")
+    for k in searchWords:
+        # For each word in the search query:
+        for j in titleWords:
+            # For each word in the quiz title, work out how similar the words are and add it to the score.
+            if((k, j) not in ratios):
+                ratios[(k, j)] = difflib.SequenceMatcher(None, k, j).ratio()
+            score += 2 * maths.pow(ratios[(k, j)], 3)
+            # Also add the number of exact word matches to the score.
+            score += j.count(k)
+        for j in tagList:
+            # Then go through the tags, and work out how similar the words are and add it to the score.
+            if((k, j) not in ratios):
+                ratios[(k, j)] = difflib.SequenceMatcher(None, k, j).ratio()
+            score += 2 * maths.pow(ratios[(k, j)], 4)
+    # Divide the score to remove the advantage of having a large number of words in the title and a large amount of tags.
+    return score / (1 + title.count(" ") + tags.count(","))
+
+def getQueryTrigrams(searchQuery: str) -> set:
+    """
+    Returns the set of trigrams in all of the words of a search query. The last word is treated as unfinished unless the query ends with a space,
+    so typing more of a word only ever adds trigrams, and the end of a word isn't matched until it has been typed.
+    """
+    searchWords = searchQuery.split(" ")
+    trigrams = set()
+    for i in range(len(searchWords)):
+        if(searchWords[i]):
+            trigrams |= getTrigrams(searchWords[i], i < len(searchWords) - 1)
+    return trigrams
+
+def getQuickRatio(first: str, second: str) -> float:
+    """
+    Returns an upper bound on difflib's similarity ratio of two strings, using only their lengths. It is the same as SequenceMatcher.real_quick_ratio,
+    but without making a SequenceMatcher, so it is much quicker.
+    """
+    total = len(first) + len(second)
+    return 2 * min(len(first), len(second)) / total if total else 1.0
+
+def getTerms(title: str, tags: str) -> list:
+    """Returns the lowercase words in a quiz's title and tags, which are the terms counted by the BM25 scorer."""
+    return [i for i in title.lower().split(" ") + tags.lower().split(",") if i]
+
+class Scorer(object):
+    """
+    The base class of the scorers that rank the search results. A SearchIndex adds up the weighted scores from each of its scorers.
+    Each scorer gives a score for a quiz, and an upper bound which the score is never more than, which should be quicker to work out.
+    If the upper bound can't beat the quizzes already found, the score isn't worked out at all.
+    """
+    # Whether the upper bound is the score itself, in which case it isn't worked out twice.
+    exactBound = True
+
+    def __init__(self, weight: float = 1.0) -> None:
+        """weight is what the scorer's scores are multiplied by, so how much each scorer counts can be tuned."""
+        self.weight = weight
+
+    def score(self, index: 'SearchIndex', searchWords: list, quizID: int) -> float:
+        """Returns how well the quiz matches the search words, the higher the better. Each scorer replaces this, and by default no quiz scores anything."""
+        return 0.0
+
+    def upperBound(self, index: 'SearchIndex', searchWords: list, quizID: int) -> float:
+        """Returns a number that the quiz's score is never more than. By default this is the score itself."""
+        return self.score(index, searchWords, quizID)
+
+class DifflibScorer(Scorer):
+    """
+    Scores quizzes with scoreQuiz, the heuristic that compares each search word with each title word and tag using difflib.
+    The same words appear in lots of quizzes, so the similarity of each pair of words is remembered rather than worked out again.
+    """
+    exactBound = False
+    # The most pairs of words remembered, after which they are forgotten and remembered again from scratch.
+    maximumRememberedRatios = 100000
+
+    def __init__(self, weight: float = 1.0) -> None:
+        super().__init__(weight)
+        self.ratios = {}
+
+    def score(self, index: 'SearchIndex', searchWords: list, quizID: int) -> float:
+        if(len(self.ratios) > DifflibScorer.maximumRememberedRatios):
+            self.ratios = {}
+        return scoreQuiz(searchWords, *index.quizzes[quizID], self.ratios)
+
+    def upperBound(self, index: 'SearchIndex', searchWords: list, quizID: int) -> float:
+        """The same sum as scoreQuiz, but with the quick length-based ratio in place of difflib's ratio, which it is never less than."""
+        title, tags = index.quizzes[quizID]
+        score = 0
+        titleWords = title.split(" ")
+        tagList = tags.split(",")
+        for k in searchWords:
+            for j in titleWords:
+                score += 2 * maths.pow(getQuickRatio(k, j), 3) + j.count(k)
+            for j in tagList:
+                score += 2 * maths.pow(getQuickRatio(k, j), 4)
+        return score / (1 + title.count(" ") + tags.count(","))
+
+class BM25Scorer(Scorer):
+    """
+    Scores quizzes with BM25, which rewards quizzes whose title and tags contain the search words,
+    especially words that few other quizzes contain, and favours shorter titles and tag lists.
+    """
+    # How quickly repeating a word stops adding to the score, and how much the length of the title and tags counts.
+    k1 = 1.2
+    b = 0.75
+
+    def score(self, index: 'SearchIndex', searchWords: list, quizID: int) -> float:
+        terms = getTerms(*index.quizzes[quizID])
+        if(not terms or not index.quizzes):
+            return 0
+        averageLength = index.totalTerms / len(index.quizzes)
+        score = 0
+        for k in set(searchWords):
+            frequency = terms.count(k)
+            if(frequency):
+                # Words that fewer quizzes contain are worth more.
+                quizzesWithWord = index.termQuizCounts.get(k, 0)
+                inverseFrequency = maths.log(1 + (len(index.quizzes) - quizzesWithWord + 0.5) / (quizzesWithWord + 0.5))
+                score += inverseFrequency * frequency * (BM25Scorer.k1 + 1) / (frequency + BM25Scorer.k1 * (1 - BM25Scorer.b + BM25Scorer.b * len(terms) / averageLength))
+        return score
+
+class PrefixScorer(Scorer):
+    """Boosts quizzes whose title starts with the search query, and quizzes with title words that start with the search words (e.g. while a word is still being typed)."""
+    def score(self, index: 'SearchIndex', searchWords: list, quizID: int) -> float:
+        title = index.quizzes[quizID][0].lower()
+        if(title.startswith(" ".join(searchWords))):
+            # The whole query is the start of the title.
+            return 1.0
+        titleWords = title.split(" ")
+        # Otherwise the score is the fraction of the search words that start a title word.
+        return 0.5 * sum(1 for k in searchWords if any(j.startswith(k) for j in titleWords)) / len(searchWords)
+
+class SearchResults(object):
+    """
+    The IDs of the quizzes that match a search, in order of how well they match, which can be indexed, sliced and looped over like a list.
+    The best few are ranked by the search itself, and the rest are only put in order of their approximate scores as far down as they are looked at,
+    so showing the top of the quiz browser's list doesn't sort every quiz that shares a trigram with the query.
+    """
+    def __init__(self, best: list, shared: collections.Counter, candidates: list) -> None:
+        """
+        best is the ranked IDs of the best quizzes, shared is the Counter of every matching quiz's approximate score, which mustn't be changed afterwards,
+        and candidates is the IDs of the most common quizzes in shared, in order, which the best were picked from.
+        """
+        self.best = best
+        self.bestIDs = set(best)
+        self.shared = shared
+        # The IDs put in order so far, starting with the best, and how many of the most common candidates they were taken from.
+        self.ordered = best + [i for i in candidates if i not in self.bestIDs]
+        self.orderedCandidates = len(candidates)
+
+    def __len__(self) -> int:
+        return len(self.shared)
+
+    def extendOrder(self, length: int) -> None:
+        """Makes sure at least the first length IDs (or all of them) have been put in order."""
+        if(length <= len(self.ordered) or self.orderedCandidates >= len(self.shared)):
+            return
+        # At least twice as many as last time are ordered, so scrolling down a little at a time doesn't sort the top again for every step.
+        count = max(length + len(self.best), 2 * self.orderedCandidates)
+        # Counter.most_common only keeps a heap of the top few when given a count, and sorts everything when it isn't.
+        candidates = self.shared.most_common(count if count < len(self.shared) // 2 else None)
+        self.ordered = self.best + [i[0] for i in candidates if i[0] not in self.bestIDs]
+        self.orderedCandidates = len(candidates)
+
+    def __getitem__(self, key):
+        if(isinstance(key, slice)):
+            start, stop, step = key.indices(len(self))
+            self.extendOrder(len(self) if step < 0 else stop)
+            return self.ordered[key]
+        if(key < 0):
+            key += len(self)
+        if(key < 0 or key >= len(self)):
+            raise IndexError("search result index out of range")
+        self.extendOrder(key + 1)
+        return self.ordered[key]
+
+    def __iter__(self):
+        self.extendOrder(len(self))
+        return iter(self.ordered)
+
+    def index(self, quizID: int) -> int:
+        """Returns the position of the quiz in the results, raising ValueError if it didn't match."""
+        if(quizID not in self.shared):
+            raise ValueError(str(quizID) + " is not in the search results")
+        if(quizID not in self.ordered):
+            # The quiz is further down than has been put in order so far.
+            self.extendOrder(len(self))
+        return self.ordered.index(quizID)
+
+class SearchIndex(object):
+    # The number of best results that are ranked by the scorers, the rest of the results are ordered by their approximate scores.
+    # Only the top of the list is visible without scrolling, so this is where the exact ordering matters.
+    exactlyScoredCandidates = 50
+    # The most candidates that are looked at for the best results, in order of their approximate scores, so each keystroke takes a similar time.
+    maximumScoredCandidates = 400
+
+    def __init__(self, quizzes: list, scorers: list = None) -> None:
+        """
+        Builds the index from a list of (QuizID, title, tags) tuples (as given by QuizCatalog.getSearchEntries).
+        Each trigram maps to a list of the IDs of the quizzes that contain it.
+        scorers is the list of Scorer objects that rank the best results, by default the difflib heuristic with small boosts from BM25 and matching prefixes.
+        """
+        self.scorers = scorers if scorers != None else [DifflibScorer(), BM25Scorer(0.2), PrefixScorer(0.5)]
+        self.postings = collections.defaultdict(list)
+        # The QuizID maps to the quiz's (title, tags), which are used for the exact scoring.
+        self.quizzes = {}
+        # For the BM25 scorer: each term maps to the number of quizzes containing it, and the total number of terms in all the quizzes.
+        self.termQuizCounts = collections.Counter()
+        self.totalTerms = 0
+        # The number of times a quiz has been added or removed, so a remembered search can tell if the index has changed since it was run.
+        self.changeCount = 0
+        # The last search's (query, allowedIDs, changeCount, trigrams, candidates), so a query that carries on from it (e.g. while typing) can add on to its candidates.
+        self.lastSearch = None
+        for i in quizzes:
+            self.addQuiz(*i)
+
+    def addQuiz(self, quizID: int, title: str, tags: str) -> None:
+        """Adds a single quiz to the index."""
+        self.changeCount += 1
+        self.quizzes[quizID] = (title, tags or "")
+        terms = getTerms(title, tags or "")
+        self.termQuizCounts.update(set(terms))
+        self.totalTerms += len(terms)
+        # Find all the trigrams in the title and tags.
+        trigrams = set()
+        for word in title.split(" ") + (tags or "").split(","):
+            if(word):
+                trigrams |= getTrigrams(word)
+        for i in trigrams:
+            # Add the quiz to the list for each trigram it contains.
+            self.postings[i].append(quizID)
+
+    def removeQuiz(self, quizID: int) -> None:
+        """Removes a single quiz from the index, e.g. after it has been deleted, or before adding its edited title and tags."""
+        entry = self.quizzes.pop(quizID, None)
+        if(entry == None):
+            return
+        self.changeCount += 1
+        title, tags = entry
+        terms = getTerms(title, tags)
+        self.termQuizCounts.subtract(set(terms))
+        self.totalTerms -= len(terms)
+        # Only the posting lists of the quiz's own trigrams need to be changed.
+        trigrams = set()
+        for word in title.split(" ") + tags.split(","):
+            if(word):
+                trigrams |= getTrigrams(word)
+        for i in trigrams:
+            postings = self.postings.get(i, None)
+            if(postings != None and quizID in postings):
+                postings.remove(quizID)
+
+    def getCandidates(self, searchWords: list, allowedIDs: set = None, isCancelled = None, trigrams: set = None) -> collections.Counter:
+        """
+        Returns a Counter of QuizID to an approximate similarity score, which is the number of trigrams each quiz shares with the search words.
+        If allowedIDs is given, only quizzes with those IDs are included (e.g. the quizzes that pass the filters).
+        isCancelled is an optional function, and if it returns True part way through, SearchCancelled is raised.
+        trigrams is the set of trigrams to look for (see getQueryTrigrams), by default the trigrams of all the search words as finished words.
+        """
+        if(trigrams == None):
+            trigrams = set()
+            for word in searchWords:
+                trigrams |= getTrigrams(word)
+        shared = collections.Counter()
+        for i in trigrams:
+            if(isCancelled and isCancelled()):
+                raise SearchCancelled()
+            # Counter.update does the counting in C, which is much quicker than a Python loop over each posting.
+            shared.update(self.postings.get(i, ()))
+        if(allowedIDs != None):
+            # Remove the quizzes that have been filtered out, looping over whichever is smaller.
+            if(len(allowedIDs) < len(shared)):
+                shared = collections.Counter({i: shared[i] for i in allowedIDs if i in shared})
+            else:
+                shared = collections.Counter({k: v for k, v in shared.items() if k in allowedIDs})
+        return shared
+
+    def extendCandidates(self, searchQuery: str, trigrams: set, allowedIDs: set = None, isCancelled = None) -> collections.Counter:
+        """
+        If the search query carries on from the last search's query (e.g. "alg" after "al", or "algebra bio" after "algebra b"), with the same filters
+        and no quizzes changed since, this returns the candidates of the new query worked out from the last search's candidates, otherwise it returns None.
+        The query has only gained trigrams, so the posting lists of just those trigrams are counted and added on to the last search's counts.
+        This gives exactly the same candidates as a full search, however the query was entered, but the long posting lists of the trigrams
+        at the start of the query are never gone through again. The last search's Counter is copied rather than changed, as its results may still be on show.
+        """
+        if(self.lastSearch == None):
+            return None
+        lastQuery, lastAllowedIDs, lastChangeCount, lastTrigrams, lastShared = self.lastSearch
+        if(lastChangeCount != self.changeCount or not searchQuery.startswith(lastQuery)):
+            # The index has changed, or the text has been deleted or edited, so a full search is needed.
+            return None
+        if(lastAllowedIDs is not allowedIDs and (lastAllowedIDs == None or allowedIDs == None or lastAllowedIDs != allowedIDs)):
+            # The filters have changed.
+            return None
+        if(lastTrigrams - trigrams):
+            # The query has lost trigrams, so the last search's counts can't be added on to.
+            return None
+        shared = collections.Counter(lastShared)
+        for i in trigrams - lastTrigrams:
+            if(isCancelled and isCancelled()):
+                raise SearchCancelled()
+            postings = self.postings.get(i, ())
+            # Counting the quizzes in the posting list, and removing the ones that have been filtered out, are both done in C.
+            shared.update(postings if allowedIDs == None else allowedIDs.intersection(postings))
+        return shared
+
+    def search(self, searchQuery: str, allowedIDs: set = None, limit: int = 200, isCancelled = None) -> list:
+        """
+        Returns the IDs of up to limit quizzes that best match the search query, in order of how well they match.
+        If limit is None, every quiz that matches is returned as SearchResults, e.g. for the quiz browser's list which can scroll through all of them,
+        and they are only put in order as far down as the list shows.
+        The index finds the candidates, then only the best few by their approximate scores are scored exactly.
+        isCancelled is an optional function, and if it returns True part way through, SearchCancelled is raised.
+        """
+        # Split the query into a list of words, ignoring any empty words caused by repeated spaces.
+        searchWords = [i for i in searchQuery.split(" ") if i]
+        if(not searchWords):
+            return []
+        # Remember how many changes had been made to the index when the search started, in case a quiz is added or removed part way through.
+        changeCount = self.changeCount
+        trigrams = getQueryTrigrams(searchQuery)
+        shared = self.extendCandidates(searchQuery, trigrams, allowedIDs, isCancelled)
+        if(shared == None):
+            shared = self.getCandidates(searchWords, allowedIDs, isCancelled, trigrams)
+        self.lastSearch = (searchQuery, allowedIDs, changeCount, trigrams, shared)
+        # Rank the best candidates with the scorers, then the rest of the candidates stay in order of their approximate scores.
+        # Only the candidates the scorers look at are taken from the Counter, which keeps a heap of them rather than sorting all of the candidates.
+        candidates = [i[0] for i in shared.most_common(SearchIndex.maximumScoredCandidates)]
+        best = self.rank(searchWords, candidates, isCancelled)
+        results = SearchResults(best, shared, candidates)
+        return results if limit == None else results[:limit]
+
+    def rank(self, searchWords: list, candidates: list, isCancelled = None) -> list:
+        """
+        Returns the IDs of the best few candidates according to the scorers, best first. The candidates should be in order of their approximate scores.
+        The best are kept in a heap, and a candidate is only scored if its upper bound could beat the worst of them.
+        """
+        # The heap holds (score, -place in the candidates, QuizID), so the worst is at the top, and candidates with equal scores stay in their approximate order.
+        heap = []
+        for place, i in enumerate(candidates[:SearchIndex.maximumScoredCandidates]):
+            if(isCancelled and isCancelled()):
+                raise SearchCancelled()
+            try:
+                bounds = [j.upperBound(self, searchWords, i) for j in self.scorers]
+                if(len(heap) == SearchIndex.exactlyScoredCandidates and sum(j.weight * k for j, k in zip(self.scorers, bounds)) <= heap[0][0]):
+                    # The quiz can't beat any of the best found so far, so the slower scores aren't worked out.
+                    continue
+                score = sum(j.weight * (k if j.exactBound else j.score(self, searchWords, i)) for j, k in zip(self.scorers, bounds))
+            except KeyError:
+                # A quiz removed from the index while this search was running is left out of the best.
+                continue
+            if(len(heap) < SearchIndex.exactlyScoredCandidates):
+                heapq.heappush(heap, (score, -place, i))
+            elif(score > heap[0][0]):
+                heapq.heapreplace(heap, (score, -place, i))
+        return [i[2] for i in sorted(heap, reverse = True)]
+
+class SearchWorker(threading.Thread):
+    """
+    A single background thread that runs the quiz browser's searches.
+    Only the latest search matters: submitting a new search replaces any search that hasn't started,
+    and stops the one that is running. The finished results are put on a queue, which the main thread collects,
+    so the worker never touches any of the tkinter widgets itself.
+    """
+    def __init__(self) -> None:
+        # The worker is a daemon thread, so it doesn't stop the application from closing.
+        super().__init__(daemon = True)
+        # The condition is used to wake the worker up when a search is submitted.
+        self.condition = threading.Condition()
+        # The search waiting to be run, or None if there isn't one.
+        self.pending = None
+        # Each submitted search gets a new generation number, and a search is stale once its number isn't the latest.
+        self.generation = 0
+        # The finished searches, as (generation, results) tuples.
+        self.results = queue.Queue()
+        self.running = True
+
+    def submit(self, searchIndex: SearchIndex, searchQuery: str, allowedIDs: set = None, limit: int = 200) -> int:
+        """Queues a search to be run, replacing any search that is waiting or running. Returns the search's generation number."""
+        with self.condition:
+            self.generation += 1
+            self.pending = (self.generation, searchIndex, searchQuery, allowedIDs, limit)
+            # Wake the worker up.
+            self.condition.notify()
+            return self.generation
+
+    def cancel(self) -> None:
+        """Stops any waiting or running search, without starting another."""
+        with self.condition:
+            self.generation += 1
+            self.pending = None
+
+    def isStale(self, generation: int) -> bool:
+        """Returns whether a newer search has been submitted (or the searches cancelled) since the given search."""
+        return generation != self.generation
+
+    def getResult(self, generation: int) -> list:
+        """
+        Returns the results of the search with the given generation if it has finished, otherwise returns None.
+        Any older results on the queue are thrown away.
+        """
+        result = None
+        while not self.results.empty():
+            finishedGeneration, quizIDs = self.results.get()
+            if(finishedGeneration == generation):
+                result = quizIDs
+        return result
+
+    def stop(self) -> None:
+        """Stops the worker thread, usually when the application is closing."""
+        with self.condition:
+            self.running = False
+            self.pending = None
+            self.condition.notify()
+
+    def run(self) -> None:
+        """The worker's loop, which waits for a search, runs it, and then puts its results on the results queue."""
+        while True:
+            with self.condition:
+                while self.pending == None and self.running:
+                    # Sleep until a search is submitted.
+                    self.condition.wait()
+                if(not self.running):
+                    return
+                generation, searchIndex, searchQuery, allowedIDs, limit = self.pending
+                self.pending = None
+            try:
+                quizIDs = searchIndex.search(searchQuery, allowedIDs, limit, lambda: self.isStale(generation))
+            except SearchCancelled:
+                # A newer search has been submitted, so this one is no longer needed.
+                continue
+            if(not self.isStale(generation)):
+                self.results.put((generation, quizIDs))
+
+def checkTypedSearch(searchIndex: SearchIndex, searchQuery: str, allowedIDs: set = None) -> bool:
+    """
+    Checks that typing the search query one character at a time finds exactly the same candidates, with the same numbers of shared trigrams,
+    as searching for the whole query at once (e.g. when it is pasted into the search bar). Returns True if they are the same.
+    """
+    searchIndex.lastSearch = None
+    for i in range(1, len(searchQuery) + 1):
+        searchIndex.search(searchQuery[:i], allowedIDs, None)
+    typed = searchIndex.lastSearch[4] if searchIndex.lastSearch != None else collections.Counter()
+    searchIndex.lastSearch = None
+    searchIndex.search(searchQuery, allowedIDs, None)
+    pasted = searchIndex.lastSearch[4] if searchIndex.lastSearch != None else collections.Counter()
+    return typed == pasted
+
+def benchmarkTypedSearch(count: int, searchQueries: list, visibleRows: int = 10, seed: int = None) -> str:
+    """
+    Times typing each search query one character at a time into a search index of the given number of made-up quizzes,
+    once putting every result in order (as the searches used to) and once only ordering the rows the quiz browser shows, and returns a report comparing them.
+    """
+    generator = random.Random(seed)
+    words = ["algebra", "biology", "cells", "chemistry", "history", "tudors", "physics", "forces", "energy", "maths",
+             "geometry", "french", "verbs", "german", "poetry", "romans", "waves", "atoms", "graphs", "fractions"]
+    searchIndex = SearchIndex([(i, " ".join(generator.choice(words).capitalize() for j in range(generator.randint(1, 5))) + " " + str(i),
+                                ",".join(generator.sample(words, 3))) for i in range(1, count + 1)])
+    lines = [str(count) + " quizzes, average time for each character typed:"]
+    for searchQuery in searchQueries:
+        times = []
+        for orderEverything in (True, False):
+            # Each run starts without the last search or any remembered word ratios, so neither run is helped by the other.
+            searchIndex.lastSearch = None
+            for i in searchIndex.scorers:
+                if(isinstance(i, DifflibScorer)):
+                    i.ratios = {}
+            startTime = time.perf_counter()
+            for i in range(1, len(searchQuery) + 1):
+                results = searchIndex.search(searchQuery[:i], None, None)
+                # The quiz browser shows the first rows of the results.
+                if(orderEverything):
+                    list(results)[:visibleRows]
+                else:
+                    results[:visibleRows]
+            times.append((time.perf_counter() - startTime) / len(searchQuery))
+        lines.append("    \"{}\": {:.1f} ms ordering every result, {:.1f} ms ordering the shown rows ({:.1f}x quicker)".format(
+            searchQuery, times[0] * 1000, times[1] * 1000, times[0] / times[1]))
+    return "\n".join(lines)
+
+if(__name__ == "__main__"):
+    import argparse
+    import database
+    import catalog
+    parser = argparse.ArgumentParser(description = "Checks that typing each search query one character at a time finds the same quizzes as pasting it.")
+    parser.add_argument("queries", nargs = "*", default = ["algebra bio", "chemistry forces", "tud"], help = "the search queries to check")
+    parser.add_argument("--database", default = database.defaultDatabaseFilename(), help = "the database file (default: the application's database)")
+    parser.add_argument("--benchmark", type = int, default = None, metavar = "QUIZZES",
+            help = "instead of checking, time typing the queries into an index of this many made-up quizzes, e.g. 100000")
+    parser.add_argument("--seed", type = int, default = None, help = "the random seed for the benchmark's made-up quizzes")
+    arguments = parser.parse_args()
+    if(arguments.benchmark != None):
+        # The benchmark doesn't use the database.
+        print(benchmarkTypedSearch(arguments.benchmark, [i.lower() for i in arguments.queries], seed = arguments.seed))
+        raise SystemExit()
+    searchDatabase = database.DatabaseManager(arguments.database)
+    quizCatalog = catalog.QuizCatalog(searchDatabase)
+    quizCatalog.loadQuizzes()
+    index = SearchIndex(quizCatalog.getSearchEntries())
+    failed = 0
+    for i in arguments.queries:
+        same = checkTypedSearch(index, i.lower())
+        failed += not same
+        print("\"" + i + "\": " + ("typed and pasted searches match" if same else "typed and pasted searches DIFFER"))
+    searchDatabase.dispose(showReport = False)
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,280 @@
+"""
+This file contains the simulation harness, which runs lots of virtual students doing quizzes at the same time against the database layer.
+Each virtual student loads a quiz, answers it through a QuizSession (using a simulated clock, so no real time has to pass), and saves the result.
+The harness reports the throughput and the latency percentiles of each step, which is used to size the database and to catch slow result writes.
+Run it directly, e.g. "python simulation.py Simulation.db --students 2000 --threads 16".
+The simulation adds results (and, if needed, quizzes and users) to the given database, so it should not be run against a real database.
+"""
+
+# Random is used to decide how each virtual student answers.
+import random
+# Time is used to time each step.
+import time
+# Threading is used for the lock that protects the recorded timings.
+import threading
+# The thread pool runs the virtual students at the same time.
+import concurrent.futures
+# The database, quiz, user and session classes that are being tested.
+import database
+import quiz
+import user
+import rollups
+import quizCache
+import catalog
+# Tracemalloc measures the memory used by the catalog and questions in the memory measurement.
+import tracemalloc
+from quizSession import QuizSession, QuizStates
+from profiler import getPercentile
+
+class SimulatedClock(object):
+    """A clock that only moves forward when it is told to, so a virtual student can take minutes over a quiz without any real time passing."""
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Returns the current simulated time in seconds, so the clock can be used in place of time.monotonic."""
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        """Moves the clock forward by the given number of seconds."""
+        self.now += max(0, seconds)
+
+class VirtualStudent(object):
+    """A simulated user, who answers questions correctly some of the time and takes a random amount of time over each one."""
+    def __init__(self, studentUser: 'user.User', randomGenerator: random.Random) -> None:
+        self.user = studentUser
+        self.random = randomGenerator
+        # The chance of answering a question correctly, the chance of pausing, and the chance of opening the help.
+        self.accuracy = randomGenerator.uniform(0.3, 0.95)
+        self.pauseChance = 0.05
+        self.helpChance = 0.03
+        # The average number of seconds taken to answer a question.
+        self.averageAnswerTime = randomGenerator.uniform(2, 12)
+
+    def doQuiz(self, quizObject: 'quiz.Quiz') -> QuizSession:
+        """Answers every question in the quiz and returns the finished session."""
+        clock = SimulatedClock()
+        session = QuizSession(quizObject, self.user, clock)
+        session.start()
+        while session.state != QuizStates.finished:
+            if(self.random.random() < self.pauseChance):
+                # Take a break in the middle of the question.
+                session.pause()
+                clock.advance(self.random.uniform(5, 60))
+                session.resume()
+            clock.advance(self.random.expovariate(1 / self.averageAnswerTime))
+            if(not session.checkTime()):
+                # If the student hasn't run out of time, they answer the question.
+                if(self.random.random() < self.helpChance and session.getCurrentQuestion().help):
+                    session.useHelp()
+                elif(self.random.random() < self.accuracy):
+                    session.answer(session.correctAnswer)
+                else:
+                    # Pick one of the wrong answers.
+                    session.answer(self.random.choice([i for i in range(len(session.answers)) if i != session.correctAnswer]))
+            # Wait for the delay before the next question.
+            clock.advance(session.getTimeUntilNextQuestion())
+            session.nextQuestion()
+        return session
+
+class Simulation(object):
+    # The steps that are timed for each virtual student.
+    steps = ("load quiz", "answer quiz", "save result", "total")
+
+    def __init__(self, databaseManager, seed: int = None, useCache: bool = True) -> None:
+        """useCache is whether the students load their quizzes through a QuizCache, like the application does, or straight from the database."""
+        self.database = databaseManager
+        self.random = random.Random(seed)
+        # The questions added by the simulation are saved with their content hashes, which older databases don't have a column for.
+        quiz.Quiz.ensureQuestionHashes(databaseManager)
+        # The statistics totals, which are updated with each saved result just like in the application.
+        self.rollups = rollups.StatisticsRollups(databaseManager)
+        # The quiz cache, which is None if the quizzes are always loaded from the database.
+        self.quizCache = quizCache.QuizCache(databaseManager) if useCache else None
+        # The IDs of the quizzes that the students can do, and the virtual students.
+        self.quizIDs = []
+        self.students = []
+        # The step names map to the list of the times taken for that step, in seconds.
+        self.timings = {i: [] for i in Simulation.steps}
+        # The number of results saved, and the number of students whose quiz failed.
+        self.resultsSaved = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def prepare(self, quizzes: int, questionsPerQuiz: int, students: int) -> None:
+        """Makes sure the database has at least the given number of quizzes, and creates the virtual students' user records."""
+        self.quizIDs = [i[0] for i in self.database.execute("SELECT `QuizID` FROM `Quizzes` WHERE `AmountOfQuestions` > 0;")]
+        if(len(self.quizIDs) < quizzes):
+            print("Creating " + str(quizzes - len(self.quizIDs)) + " simulated quizzes...")
+            for i in range(len(self.quizIDs), quizzes):
+                self.quizIDs.append(self.createQuiz("Simulated Quiz " + str(i + 1), questionsPerQuiz))
+        # All the virtual students are added to the Users table in one batch.
+        timeConfigs = [self.random.randint(0, 2) for i in range(students)]
+        ids = self.database.executeMany("INSERT INTO `Users` (Username, TimeConfig) VALUES (?,?);",
+                [("Simulated Student " + str(i + 1), timeConfigs[i]) for i in range(students)])
+        for i in ids:
+            # Build the new students' (empty) statistics totals, so their results are added to the totals as they are saved.
+            self.rollups.rebuildUser(i)
+        self.students = [VirtualStudent(user.User(self.database, ids[i], "Simulated Student " + str(i + 1), timeConfigs[i], None),
+                random.Random(self.random.random())) for i in range(students)]
+
+    def createQuiz(self, title: str, numberOfQuestions: int) -> int:
+        """Adds a quiz of made-up questions to the database, with its content hash, and returns its ID."""
+        difficulty = self.random.randint(1, 5)
+        # The quiz's content hash is worked out as the questions are made, as the quiz importer does.
+        hasher = quiz.QuizHash(title, difficulty)
+        questions = []
+        for i in range(numberOfQuestions):
+            a, b = self.random.randint(1, 50), self.random.randint(1, 50)
+            wrongAnswers = [str(a + b + j) for j in self.random.sample([-3, -2, -1, 1, 2, 3], self.random.randint(1, 3))]
+            questions.append(quiz.Question(-1, "What is " + str(a) + " + " + str(b) + "?", str(a + b), wrongAnswers, -1, "", "Add the numbers together."))
+            hasher.addQuestion(questions[-1])
+        with self.database.transaction():
+            self.database.execute("INSERT INTO `Quizzes` (QuizName, AmountOfQuestions, TagList, Difficulty, Hash) VALUES (?,?,?,?,?);",
+                    title, float(numberOfQuestions), "simulated", float(difficulty), hasher.hexdigest())
+            quizID = self.database.execute("SELECT @@IDENTITY;")[0][0]
+            for i in questions:
+                # Give each question the quiz's ID.
+                i.quizID = quizID
+            quiz.Question.addManyToDatabase(questions, self.database)
+        return quizID
+
+    def runStudent(self, student: VirtualStudent) -> None:
+        """Runs one virtual student through a random quiz, timing each step."""
+        timings = {}
+        startTime = time.perf_counter()
+        try:
+            quizID = student.random.choice(self.quizIDs)
+            quizObject = self.quizCache.getQuiz(quizID) if self.quizCache != None else quiz.Quiz.getQuiz(quizID, self.database)
+            timings["load quiz"] = time.perf_counter() - startTime
+            stepStartTime = time.perf_counter()
+            session = student.doQuiz(quizObject)
+            timings["answer quiz"] = time.perf_counter() - stepStartTime
+            stepStartTime = time.perf_counter()
+            session.saveResult(self.database, self.rollups)
+            timings["save result"] = time.perf_counter() - stepStartTime
+        except Exception as e:
+            with self.lock:
+                self.errors += 1
+            print("Simulated student failed: " + repr(e))
+            return
+        timings["total"] = time.perf_counter() - startTime
+        with self.lock:
+            self.resultsSaved += 1
+            for k, v in timings.items():
+                self.timings[k].append(v)
+
+    def run(self, threads: int) -> float:
+        """Runs every virtual student, with the given number running at the same time, and returns how long it took in seconds."""
+        startTime = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers = threads) as executor:
+            # list() waits for every student to finish.
+            list(executor.map(self.runStudent, self.students))
+        return time.perf_counter() - startTime
+
+    def getReport(self, duration: float) -> str:
+        """Returns the throughput and the latency percentiles of each step as text, with times in milliseconds."""
+        lines = ["Simulated " + str(len(self.students)) + " students in {:.2f} s: {} results saved, {} errors".format(duration, self.resultsSaved, self.errors),
+                "Throughput: {:.1f} quizzes per second".format(self.resultsSaved / duration if duration else 0), ""]
+        lines.append("{:<12} {:>9} {:>9} {:>9} {:>9} {:>9}".format("Step", "Mean", "p50", "p95", "p99", "Max"))
+        for i in Simulation.steps:
+            values = self.timings[i]
+            if(values):
+                lines.append("{:<12} {:>9.2f} {:>9.2f} {:>9.2f} {:>9.2f} {:>9.2f}".format(i, sum(values) * 1000 / len(values), getPercentile(values, 50) * 1000,
+                        getPercentile(values, 95) * 1000, getPercentile(values, 99) * 1000, max(values) * 1000))
+        if(self.quizCache != None):
+            lines.append("")
+            lines.append(self.quizCache.getReport())
+        return "\n".join(lines)
+
+class PlainQuestion(object):
+    """A question with the same attributes as quiz.Question but without slots, so each object has its own attribute dictionary. It is only used to compare memory use."""
+    def __init__(self, quizID: int, question: str, correctAnswer: str, otherAnswers: list, id: int, hint: str, help: str, hash: str = None) -> None:
+        self.quizID = quizID
+        self.question = question
+        self.correctAnswer = correctAnswer
+        self.otherAnswers = otherAnswers
+        self.id = id
+        self.hint = hint
+        self.help = help
+        self.hash = hash
+
+def measureMemory(count: int, seed: int = None) -> list:
+    """
+    Measures the memory used by a catalog of the given number of made-up quizzes, and by the same number of questions, with tracemalloc,
+    compared with a list for each quiz record (the catalog's old layout) and with questions that don't have slots. Returns a list of (label, bytes).
+    The quiz records are made while each one is measured, as they would be when loaded from the database. The filter indexes are the same for both layouts, so they aren't included.
+    """
+    generator = random.Random(seed)
+    tagLists = ["maths,algebra", "physics", "chemistry,organic", ""]
+    # The made-up records, in the same order as the columns of the Quizzes table.
+    records = [(i, generator.randint(1, 20), generator.randint(1, 5), generator.choice(tagLists), generator.randint(1, 10)) for i in range(1, count + 1)]
+    def makeRecords():
+        return ((i[0], "Quiz number " + str(i[0]), i[1], i[2], 10, i[3], i[4], "%032x" % i[0]) for i in records)
+    def makeListCatalog():
+        # The old layout: a list for each quiz record, in a dictionary by QuizID.
+        return {i[0]: list(i) for i in makeRecords()}
+    def makeColumnCatalog():
+        quizCatalog = catalog.QuizCatalog(None)
+        for i in makeRecords():
+            quizCatalog.appendRecord(i)
+        return quizCatalog
+    def makeQuestions(questionClass):
+        return [questionClass(1, "Question text " + str(i) + "?", "right", ["wrong", "other"], i, "", "") for i in range(count)]
+    sizes = []
+    for label, function in (("Quiz records as lists", makeListCatalog), ("Column catalog", makeColumnCatalog),
+                            ("Questions without slots", lambda: makeQuestions(PlainQuestion)), ("Questions with slots", lambda: makeQuestions(quiz.Question))):
+        tracemalloc.start()
+        kept = function()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        sizes.append((label, size))
+    return sizes
+
+def checkMemory(count: int, seed: int = None) -> str:
+    """
+    Measures the memory with measureMemory, and returns the report as text.
+    Raises AssertionError if the column catalog doesn't use less memory than the lists, or the questions with slots don't use less than those without.
+    """
+    sizes = measureMemory(count, seed)
+    lines = [str(count) + " quizzes and questions:"] + ["    {:<26}{:>8.1f} MB".format(label, size / 1000000) for label, size in sizes]
+    lines.append("The column catalog uses {:.0%} less memory, and the questions use {:.0%} less.".format(1 - sizes[1][1] / sizes[0][1], 1 - sizes[3][1] / sizes[2][1]))
+    report = "\n".join(lines)
+    assert sizes[1][1] < sizes[0][1], "The column catalog doesn't use less memory than the lists.\n" + report
+    assert sizes[3][1] < sizes[2][1], "The questions with slots don't use less memory than those without.\n" + report
+    return report
+
+if(__name__ == "__main__"):
+    import argparse
+    parser = argparse.ArgumentParser(description = "Simulates virtual students doing quizzes against a database, and reports throughput and latency.")
+    parser.add_argument("database", nargs = "?", default = "Simulation.db", help = "the database file to use, which results are added to (default: Simulation.db)")
+    parser.add_argument("--students", type = int, default = 1000, help = "the number of virtual students (default: 1000)")
+    parser.add_argument("--threads", type = int, default = 16, help = "the number of students doing a quiz at the same time (default: 16)")
+    parser.add_argument("--quizzes", type = int, default = 20, help = "the minimum number of quizzes, made-up quizzes are added if there are fewer (default: 20)")
+    parser.add_argument("--questions", type = int, default = 10, help = "the number of questions in each made-up quiz (default: 10)")
+    parser.add_argument("--seed", type = int, default = None, help = "the random seed, to repeat a simulation")
+    parser.add_argument("--statements", action = "store_true", help = "also print the database statement report")
+    parser.add_argument("--no-cache", action = "store_true", help = "load each quiz from the database instead of through the quiz cache")
+    parser.add_argument("--memory", type = int, default = None, metavar = "QUIZZES",
+            help = "instead of simulating, measure the memory used by a catalog of this many made-up quizzes and this many questions, e.g. 100000, "
+                 + "and fail if the column catalog and the questions with slots don't use less than the old layouts")
+    arguments = parser.parse_args()
+    if(arguments.memory != None):
+        # The memory measurement doesn't use the database.
+        try:
+            print(checkMemory(arguments.memory, arguments.seed))
+        except AssertionError as error:
+            print(error)
+            raise SystemExit(1)
+        raise SystemExit()
+    simulationDatabase = database.DatabaseManager(arguments.database)
+    simulation = Simulation(simulationDatabase, arguments.seed, not arguments.no_cache)
+    simulation.prepare(arguments.quizzes, arguments.questions, arguments.students)
+    # Only time the simulation itself, not the preparation.
+    simulationDatabase.profiler.reset()
+    print(simulation.getReport(simulation.run(arguments.threads)))
+    if(arguments.statements):
+        print("")
+        print(simulationDatabase.getReport())
+    simulationDatabase.dispose(showReport = False)
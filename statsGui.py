@@ -31,6 +31,19 @@ class StatisticsDialog(object):
         self.currentState = 0
         # Load the main statistics view.
         self.loadMainStats()
+        # Keep the filter options up to date if subjects or exam boards are added or removed while the window is open.
+        self.parent.referenceData.listenWhileOpen(self.window, self.referenceDataChanged)
+    
+    def referenceDataChanged(self, referenceList, id: int, name: str, added: bool) -> None:
+        """This is run when a subject or exam board is added or removed, and updates the filter options if the main statistics view is showing."""
+        if(self.currentState != 0):
+            # The filters are made again with the current options when the main statistics view is next loaded.
+            return
+        combobox = self.filterBySubjectComboBox if referenceList == self.parent.referenceData.subjects else self.filterByExamBoardComboBox
+        combobox.config(values = ["No filter"] + list(referenceList.names.values()))
+        if(not added and combobox.get() == name):
+            # If the removed name was selected, it can't be filtered by any more.
+            combobox.set("No filter")
     
     def loadMainStats(self) -> None:
         """Configuring the grid configuration of the window, in which the elements/widgets on the window will fit into."""
@@ -106,9 +119,9 @@ class StatisticsDialog(object):
         # End of the frame.
         self.statsFrame.grid(row = 1, column = 0, columnspan = 4, sticky = tk.N+tk.S+tk.E+tk.W)
         
-        # Get all the results for the currently selected user, and the recent results.
+        # Get the totals of all the results for the currently selected user, and the recent results.
         self.currentRecentResults = self.parent.database.execute("SELECT TOP 15 * FROM `Results` WHERE `UserID` = ? ORDER BY `DateCompleted` DESC;", float(self.parent.currentUser.id))
-        self.currentResults = self.parent.database.execute("SELECT * FROM `Results` WHERE `UserID` = ? ORDER BY `DateCompleted` DESC;", float(self.parent.currentUser.id))
+        self.currentSummary = self.parent.rollups.getSummary(self.parent.currentUser.id)
         # Then list the user's latest results.
         self.listLatestResults()
         # And generate statistiscs on the results found above.
@@ -124,12 +137,8 @@ class StatisticsDialog(object):
         # Fetch the user's last 40 results.
         resultRows = self.parent.database.execute("SELECT TOP 40 * FROM `Results` WHERE `UserID` = ? ORDER BY `DateCompleted` DESC;", float(self.parent.currentUser.id))
         for i in resultRows:
-            # For each result, find the quiz name and then add it to the list.
-            quizName = "Unknown quiz"
-            # For loop that goes through all the quizzes to find the title of each quiz.
-            for j in range(len(self.parent.allQuizzes)):
-                if(self.parent.allQuizzes[j][0] == i[2]):
-                    quizName = self.parent.allQuizzes[j][1]
+            # For each result, look up the quiz name in the catalog and then add it to the list.
+            quizName = self.parent.catalog.getQuizName(i[2])
             # Add the score, time taken and name to the latest results list box.
             timeInSeconds = i[6]
             # Format the time taken to complete the quiz.
@@ -139,37 +148,26 @@ class StatisticsDialog(object):
     
     def listQuizzesToRedo(self):
         """This lists the quizzes which have less than a 60% average score over the last three attempts."""
-        quizAverages = {}
         self.reviewList = []
-        for i in self.currentResults:
-            # For each result that has been fetched from the database.
-            if(i[2] in quizAverages.keys()):
-                if(len(quizAverages[i[2]]) < 3):
-                    # Put the last three results in a two dimensional list.
-                    quizAverages[i[2]].append(i[3])
-            else:
-                # If the quiz hasn't been seen by this loop before, create a new list.
-                quizAverages[i[2]] = [i[3]]
-        for i in quizAverages.keys():
+        # The last three scores of each quiz are kept by the rollups, with the most recently done quiz first.
+        for quizID, scores in self.parent.rollups.getRecentQuizScores(self.parent.currentUser.id):
             # For each quiz that has results recorded
-            if(sum(quizAverages[i]) / len(quizAverages[i]) < 0.6):
+            if(sum(scores) / len(scores) < 0.6):
                 # If the average over the last three attempts at that quiz is less than 60%
-                for j in range(len(self.parent.allQuizzes)):
-                    # Find the name of that quiz.
-                    if(self.parent.allQuizzes[j][0] == i):
-                        quizName = self.parent.allQuizzes[j][1]
+                # Find the name of that quiz.
+                quizName = self.parent.catalog.getQuizName(quizID)
                 # Then add it to the list of quizzes needing redoing.
                 self.quizReviewList.insert(tk.END, quizName + " (Last 3 average: "
-                        + str(round(100 * sum(quizAverages[i]) / len(quizAverages[i]))) + "%)")
+                        + str(round(100 * sum(scores) / len(scores))) + "%)")
                 # Then add it to the internal list, used by the redo button that launches based on the selected list element's index.
-                self.reviewList.append(i)
+                self.reviewList.append(quizID)
     
     def generateStatistics(self):
         """This generates statistics on the current set of results."""
         # Remove any previously generated statistics
         self.statisticsList.delete(0, tk.END)
         
-        if(not len(self.currentResults)):
+        if(not self.currentSummary.attempts):
             # To prevent division by zero errors, if there isn't any results, don't generate statistics by returning.
             self.statisticsList.insert(tk.END, "No data.")
             return
@@ -201,23 +199,14 @@ class StatisticsDialog(object):
         # Adding all-time statistics for the user.
         # Adding the statistics to the end of the list in the GUI.
         self.statisticsList.insert(tk.END, "All time statistics.")
-        self.statisticsList.insert(tk.END, "No. of quiz attempts: " + str(len(self.currentResults)))
+        self.statisticsList.insert(tk.END, "No. of quiz attempts: " + str(self.currentSummary.attempts))
         self.statisticsList.insert(tk.END, "")
-        # Resetting the variables to be used to calculate all-time averages.
+        # The all-time averages are worked out from the totals kept by the rollups, rather than going through every result.
         # Average time isn't calculated for all-time, as it probably won't be any more interesting than the recent average time.
-        totalDuration = 0
-        totalAverageAnswerTime = 0
-        totalScore = 0
-        for i in self.currentResults:
-            # For each result, add its variables to the totals.
-            totalDuration += i[6]
-            totalAverageAnswerTime += i[5]
-            totalScore += i[3]
-        # Then add the all-time averages to the statistics list on the GUI.
         self.statisticsList.insert(tk.END, "All time averages.")
-        self.statisticsList.insert(tk.END, "Quiz duration: " + str(round(totalDuration / len(self.currentResults), 1)) + "s")
-        self.statisticsList.insert(tk.END, "Answer time: " + str(round(totalAverageAnswerTime / len(self.currentResults), 1)) + "s")
-        self.statisticsList.insert(tk.END, "Score: " + str(round(100 * totalScore / len(self.currentResults))) + "%")
+        self.statisticsList.insert(tk.END, "Quiz duration: " + str(round(self.currentSummary.getAverageDuration(), 1)) + "s")
+        self.statisticsList.insert(tk.END, "Answer time: " + str(round(self.currentSummary.getAverageAnswerTime(), 1)) + "s")
+        self.statisticsList.insert(tk.END, "Score: " + str(round(100 * self.currentSummary.getAverageScore())) + "%")
     
     def applyFilters(self) -> None:
         """
@@ -232,6 +221,9 @@ class StatisticsDialog(object):
         # It can't filter by all three filters all the time, most of the time only one or two of the filters will be set.
         sqlStatementClauses = []
         sqlStatementParameters = [float(self.parent.currentUser.id)]
+        subjectID = None
+        examBoardID = None
+        difficulty = None
         if(subjectFilter and subjectFilter != "No filter"):
             # If the subject filter has had a subject selected, find the subject ID
             # and then add it to the SQL statement in the WHERE clause.
@@ -250,12 +242,12 @@ class StatisticsDialog(object):
             sqlStatementParameters.append(float(difficulty))
         if(len(sqlStatementClauses)):
             # If a filter has been selected, generate the SQL statement.
-            self.currentResults = self.parent.database.execute("SELECT * FROM `Results` WHERE `UserID` = ? AND `QuizID` IN (SELECT `QuizID` FROM `Quizzes` WHERE " + " AND ".join(sqlStatementClauses) + ") ORDER BY `DateCompleted` DESC;", *sqlStatementParameters)
             self.currentRecentResults = self.parent.database.execute("SELECT TOP 15 * FROM `Results` WHERE `UserID` = ? AND `QuizID` IN (SELECT `QuizID` FROM `Quizzes` WHERE " + " AND ".join(sqlStatementClauses) + ") ORDER BY `DateCompleted` DESC;", *sqlStatementParameters)
         else:
             # If no filter has been selected, run the basic SQL statement.
-            self.currentResults = self.parent.database.execute("SELECT * FROM `Results` WHERE `UserID` = ? ORDER BY `DateCompleted` DESC;", float(self.parent.currentUser.id))
             self.currentRecentResults = self.parent.database.execute("SELECT TOP 15 * FROM `Results` WHERE `UserID` = ? ORDER BY `DateCompleted` DESC;", float(self.parent.currentUser.id))
+        # The all-time totals for the filters come from the rollups.
+        self.currentSummary = self.parent.rollups.getSummary(self.parent.currentUser.id, subjectID, examBoardID, difficulty)
         # Re-generate statistics based on the results from the last query.
         self.generateStatistics()
     
@@ -320,15 +312,9 @@ class StatisticsDialog(object):
         the first element is a list containing the number of results that fall in each percentage band from 0-9% to 90-99% and finally 100%
         The second element is the all-time score average.
         """
-        scoreBands = [0] * 11 # Create a list for each of the score bands.
-        totalScore = 0
-        for i in self.currentResults:
-            # For each result, add one to the scoreBands list to the element which corresponds to the result's percentage band.
-            scoreBands[maths.floor(i[3] * 10)] += 1
-            # Add the score to the total score.
-            totalScore += i[3]
-        # Then return the scoreBands list and the all-time average score.
-        return scoreBands, totalScore / len(self.currentResults)
+        # The number of results in each score band is kept by the rollups, so it doesn't need working out here.
+        # Return the scoreBands list and the all-time average score.
+        return self.currentSummary.scoreBands, self.currentSummary.getAverageScore()
     
     def linearlyInterpolateColours(colour1: list, colour2: list, ratio: float) -> list:
         """
@@ -347,7 +333,7 @@ class StatisticsDialog(object):
         """Draws the shapes required to draw charts on the charts view."""
         # Log to the console that charts are beginning to render.
         print("Rendering charts")
-        if(len(self.currentResults) == 0):
+        if(self.currentSummary.attempts == 0):
             # If there are no results, show a message and cancel method execution.
             self.chartCanvas.create_text(100, 10, text = "No data to generate charts with.")
             return
@@ -423,8 +409,8 @@ class StatisticsDialog(object):
         This is called when the user clicks the "Redo Quiz" button.
         It will open the quiz window with the currently selected quiz on this window.
         """
-        # Import the quiz and quizGui files from the application's base directory.
-        import quiz, quizGui
+        # Import the quizGui file from the application's base directory.
+        import quizGui
         if(not self.quizReviewList.curselection()):
             # If no quiz has been selected, show an error message.
             tkmb.showerror("Redo quiz", "No quiz selected, please select a quiz from the right-most list.", parent = self.window)
@@ -433,7 +419,7 @@ class StatisticsDialog(object):
         index = self.quizReviewList.curselection()[0]
         # Find the quiz ID for the selected list index.
         quizID = self.reviewList[index]
-        # This loads the quiz from the database, the method .getQuiz() returns a Quiz object.
-        quizObj = quiz.Quiz.getQuiz(quizID, self.parent.database)
+        # This loads the quiz from the quiz cache (or the database if it isn't cached), the method .getQuiz() returns a Quiz object.
+        quizObj = self.parent.quizCache.getQuiz(quizID)
         # This then launches the window, passing the loaded quiz as an argument.
         quizGui.ActiveQuizDialog(self.parent.tk, self.parent, quizObj, self.parent.currentUser)
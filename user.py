@@ -3,6 +3,9 @@ The User class holds the data on a user that has just been created or loaded fro
 The class handles saving/loading users from database, changing user settings, and creating new users.
 """
 
+# The statistics totals module, so the user's totals can be removed along with them.
+import rollups
+
 class User(object):
     def __init__(self, databaseManager, id: int, username: str, timeConfig: int, defaultExamBoard: int) -> None:
         """This is the function that instantiates the User object."""
@@ -56,5 +59,7 @@ class User(object):
             # Check if the user has been saved to the database.
             # First, delete the results that the user has.
             self.dbm.execute("DELETE FROM `Results` WHERE UserID = ?;", float(self.id))
+            # Remove the user's statistics totals.
+            rollups.StatisticsRollups(self.dbm).invalidateUsers([self.id])
             # Then remove the user record.
             self.dbm.execute("DELETE FROM `Users` WHERE UserID = ?;", float(self.id))
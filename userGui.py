@@ -62,12 +62,8 @@ class UserCreateDialog(object):
         self.defaultExamBoardLabel.grid(row = 2, column = 0)
         self.timerSettingsLabel.grid(row = 3, column = 0)
         
-        examboardList = ["No preference"]
-        # This queries the database to get the names of the examboards
-        examboardQueryResults = self.parent.database.execute("SELECT `EName` FROM `Examboards`;")
-        if(examboardQueryResults):
-            for i in examboardQueryResults:
-                examboardList.append(i[0])
+        # The names of the examboards, from the application's reference data.
+        examboardList = ["No preference"] + list(self.parent.examboardDictionary.values())
         
         # The actual entry fields for the user settings.
         self.usernameEntry = tk.Entry(self.window, width = 20)
@@ -139,8 +135,10 @@ class UserCreateDialog(object):
         defaultExamBoardID = -1
         # The following gets the default exam board setting.
         if(defaultExamBoard != "" and defaultExamBoard != "No preference"):
-            query = self.parent.database.execute("SELECT `ExamboardID` FROM `Examboards` WHERE `EName`=?;", defaultExamBoard)
-            defaultExamBoardID = query[0][0]
+            # The name is looked up ignoring case, as it can be typed in. If it isn't an exam board, no default exam board is set.
+            defaultExamBoardID = self.parent.referenceData.examBoards.find(defaultExamBoard)
+            if(defaultExamBoardID == None):
+                defaultExamBoardID = -1
         # This creates the user object, which automatically adds the user to the database.
         self.parent.currentUser = user.User(self.parent.database, -1, username, self.timeSetting, defaultExamBoardID)
         # Imports the mainmenu file from the base directory of the application.
@@ -195,17 +193,13 @@ class UserSettingsDialog(object):
         self.defaultExamBoardLabel.grid(row = 2, column = 0)
         self.timerSettingsLabel.grid(row = 3, column = 0)
         
-        # This queries the database to get the names of the examboards
-        examBoardQueryResults = self.parent.database.execute("SELECT * FROM `Examboards`;")
-        examBoardList = ["No preference"]
-        if(examBoardQueryResults):
-            # For each exam board in the database, add it to the list of selectable exam boards.
-            examBoardList += [i[1] for i in examBoardQueryResults]
+        # The list of selectable exam boards, from the application's reference data.
+        examBoardList = ["No preference"] + list(self.parent.examboardDictionary.values())
         # To set the user's current exam board as the default value in the field, this code must run
         self.currentExamBoard = tk.StringVar()
         if(self.parent.currentUser.defaultExamBoard != -1):
             # If there was a default exam board set, set the default value of the drop-down to the previous default exam board.
-            self.currentExamBoard.set(self.parent.examboardDictionary[self.parent.currentUser.defaultExamBoard])
+            self.currentExamBoard.set(self.parent.examboardDictionary.get(self.parent.currentUser.defaultExamBoard, "No preference"))
         else:
             # Otherwise, the default value should be 'No preference'.
             self.currentExamBoard.set("No preference")
@@ -261,8 +255,7 @@ class UserSettingsDialog(object):
         else:
             # Otherwise, update the default exam board.
             # Fetch the ID of the selected exam board.
-            query = self.parent.database.execute("SELECT `ExamboardID` FROM `Examboards` WHERE `EName` = ?;", defaultExamBoard)
-            defaultExamBoardID = query[0][0]
+            defaultExamBoardID = self.parent.referenceData.examBoards.find(defaultExamBoard)
             # Update the user's settings in the database with the new settings.
             self.parent.currentUser.savePreferences(timeConfig = self.timeSetting, defaultExamBoard = defaultExamBoardID)
         # Destroy the window if everything else has successfully completed.